@@ -1,4 +1,5 @@
 from act_mem.act_mem import ActionMemory
+from act_mem.settle_profile import SettleProfiles, SettleStats
 from act_mem.workflow import WorkGraph, Workflow
 from act_mem.worknode import WorkNode, WorkAction
 from act_mem.workrecorder import WorkflowRecorder
@@ -10,4 +11,6 @@ __all__ = [
     "WorkNode",
     "WorkAction",
     "WorkflowRecorder",
+    "SettleProfiles",
+    "SettleStats",
 ]
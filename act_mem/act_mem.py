@@ -5,6 +5,7 @@ import numpy as np
 from typing import List, Dict, Any
 from .worknode import WorkAction, WorkNode
 from .workflow import WorkGraph, Workflow, WorkTransition
+from .settle_profile import SettleProfiles
 from sentence_transformers import SentenceTransformer
 
 class ActionMemory:
@@ -16,6 +17,7 @@ class ActionMemory:
         workflow (Workflow): Current runtime workflow.
         historical_workgraphs (List[WorkGraph]): Historical work graphs loaded from JSON files.
         historical_workflows (List[Workflow]): Historical workflows loaded from JSON files.
+        settle_profiles (SettleProfiles): Learned post-action settle times, persisted with the memory.
     """
     
     def __init__(self, memory_dir: str) -> None:
@@ -30,6 +32,8 @@ class ActionMemory:
         self.historical_workgraphs: List[WorkGraph] = []
         self.historical_workflows: List[Workflow] = []
 
+        # 学习到的动作后界面稳定时间
+        self.settle_profiles = SettleProfiles(memory_dir)
         
     def add_work_graph(self, app_name: str) -> WorkGraph:
         """
@@ -158,6 +162,7 @@ class ActionMemory:
         self._ensure_directories()
         self._save_work_graphs()
         self._save_workflows()
+        self.settle_profiles.save()
         self.workgraphs = []
         self.workflow = None
     
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Iterator
+
+# resource_id used for the per-(package, action) aggregate
+ANY_TARGET = "*"
+
+
+@dataclass
+class SettleStats:
+    """Observed settle times of one (package, action, target) key, in seconds."""
+    package: str
+    action: str
+    resource_id: str
+    count: int
+    p50: float
+    p99: float
+    deadline_rate: float  # Share of samples where the UI did not settle before the deadline
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # Nearest-rank percentile of a sorted list
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _key(package: str, action: str, resource_id: str) -> str:
+    return f"{package}|{action}|{resource_id}"
+
+
+class SettleProfiles:
+    """
+    Learned post-action settle times per (app package, action type, target resourceId).
+
+    Every key keeps the most recent settle samples as [seconds, stable] pairs,
+    where stable is False if the deadline passed before the UI settled (the
+    real settle time is then longer). Each sample is also recorded under the
+    (package, action, "*") aggregate, used for targets without enough samples.
+
+    Profiles are stored in <memory_dir>/settle/profiles.json next to the work
+    graphs and workflows.
+
+    Attributes:
+        path (str): JSON file the profiles are loaded from and saved to.
+        max_samples (int): Samples kept per key, older samples are dropped.
+    """
+
+    def __init__(self, memory_dir: str, max_samples: int = 50) -> None:
+        self.path = os.path.join(memory_dir, "settle", "profiles.json")
+        self.max_samples = max_samples
+        self.profiles: Dict[str, Dict[str, Any]] = self._load(self.path)
+        # Samples recorded since the last save, merged into the file on save
+        self._pending: Dict[str, List[List[Any]]] = {}
+
+    def record(self, package: str, action: str, resource_id: str | None, elapsed: float, stable: bool) -> None:
+        """
+        Record the settle time observed after an action.
+
+        Args:
+            package (str): Foreground app package (or app name) the action ran in.
+            action (str): Action type, e.g. "Tap".
+            resource_id (str | None): resourceId of the target element, if any.
+            elapsed (float): Seconds waited for the UI to settle.
+            stable (bool): Whether the UI settled before the deadline.
+        """
+        sample = [round(elapsed, 3), bool(stable)]
+        targets = [ANY_TARGET]
+        if resource_id:
+            targets.append(resource_id)
+        for target in targets:
+            key = _key(package, action, target)
+            profile = self.profiles.setdefault(
+                key, {"package": package, "action": action, "resource_id": target, "samples": []}
+            )
+            profile["samples"] = (profile["samples"] + [sample])[-self.max_samples:]
+            profile["updated"] = time.time()
+            self._pending.setdefault(key, []).append(sample)
+
+    def stats(self, package: str, action: str, resource_id: str | None = None, min_samples: int = 1) -> SettleStats | None:
+        """
+        Get the settle statistics for an action.
+
+        Uses the target's own samples when there are at least min_samples,
+        otherwise the (package, action) aggregate.
+
+        Returns:
+            SettleStats | None: Statistics, or None if too few samples were recorded.
+        """
+        for target in ([resource_id] if resource_id else []) + [ANY_TARGET]:
+            profile = self.profiles.get(_key(package, action, target))
+            if profile and len(profile["samples"]) >= min_samples:
+                return self._stats(profile)
+        return None
+
+    def __iter__(self) -> Iterator[SettleStats]:
+        for profile in self.profiles.values():
+            if profile["samples"]:
+                yield self._stats(profile)
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    @staticmethod
+    def _stats(profile: Dict[str, Any]) -> SettleStats:
+        samples: List[Tuple[float, bool]] = profile["samples"]
+        ordered = sorted(elapsed for elapsed, _ in samples)
+        return SettleStats(
+            package=profile["package"],
+            action=profile["action"],
+            resource_id=profile["resource_id"],
+            count=len(samples),
+            p50=_percentile(ordered, 0.5),
+            p99=_percentile(ordered, 0.99),
+            deadline_rate=sum(1 for _, stable in samples if not stable) / len(samples),
+        )
+
+    def save(self) -> None:
+        """
+        Save the profiles, merging the samples recorded since the last save
+        into the file (other runs may have saved in the meantime).
+        """
+        if not self._pending:
+            return
+        merged = self._load(self.path)
+        for key, samples in self._pending.items():
+            profile = self.profiles[key]
+            existing = merged.setdefault(key, {**profile, "samples": []})
+            existing["samples"] = (existing["samples"] + samples)[-self.max_samples:]
+            existing["updated"] = profile.get("updated")
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"profiles": merged}, f, ensure_ascii=False, indent=2)
+        self.profiles = merged
+        self._pending = {}
+        print(f"Saved {len(merged)} settle profiles to {self.path}")
+
+    @staticmethod
+    def _load(path: str) -> Dict[str, Dict[str, Any]]:
+        """Load profiles from file, with error handling."""
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                profiles = json.load(f)["profiles"]
+            if not isinstance(profiles, dict):
+                raise ValueError("profiles is not an object")
+            return profiles
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError):
+            print(f"Warning: Corrupted settle profile file {path}, will reset.")
+            return {}
@@ -6,13 +6,15 @@ Demonstrates how to use Phone Agent for phone automation tasks via Python API.
 演示如何通过 Python API 使用 Phone Agent 进行手机自动化任务。
 """
 
+import asyncio
+
 from phone_agent import PhoneAgent
 from phone_agent.agent import AgentConfig
 from phone_agent.config import get_messages
 from phone_agent.model import ModelConfig
 
 
-def example_basic_task(lang: str = "cn"):
+async def example_basic_task(lang: str = "cn"):
     """Basic task example / 基础任务示例"""
     msgs = get_messages(lang)
 
@@ -37,11 +39,14 @@ def example_basic_task(lang: str = "cn"):
     )
 
     # Execute task
-    result = agent.run("打开小红书搜索美食攻略")
-    print(f"{msgs['task_result']}: {result}")
+    try:
+        result = await agent.run("打开小红书搜索美食攻略")
+        print(f"{msgs['task_result']}: {result}")
+    finally:
+        await agent.close()
 
 
-def example_with_callbacks(lang: str = "cn"):
+async def example_with_callbacks(lang: str = "cn"):
     """Task example with callbacks / 带回调的任务示例"""
     msgs = get_messages(lang)
 
@@ -66,31 +71,37 @@ def example_with_callbacks(lang: str = "cn"):
     )
 
     # Execute task that may require confirmation
-    result = agent.run("打开淘宝搜索无线耳机并加入购物车")
-    print(f"{msgs['task_result']}: {result}")
+    try:
+        result = await agent.run("打开淘宝搜索无线耳机并加入购物车")
+        print(f"{msgs['task_result']}: {result}")
+    finally:
+        await agent.close()
 
 
-def example_step_by_step(lang: str = "cn"):
+async def example_step_by_step(lang: str = "cn"):
     """Step-by-step execution example (for debugging) / 单步执行示例（用于调试）"""
     msgs = get_messages(lang)
 
     agent_config = AgentConfig(lang=lang)
     agent = PhoneAgent(agent_config=agent_config)
 
-    # Initialize task
-    result = agent.step("打开美团搜索附近的火锅店")
-    print(f"{msgs['step']} 1: {result.action}")
+    try:
+        # Initialize task
+        result = await agent.step("打开美团搜索附近的火锅店")
+        print(f"{msgs['step']} 1: {result.action}")
 
-    # Continue if not finished
-    while not result.finished and agent.step_count < 10:
-        result = agent.step()
-        print(f"{msgs['step']} {agent.step_count}: {result.action}")
-        print(f"  {msgs['thinking']}: {result.thinking[:100]}...")
+        # Continue if not finished
+        while not result.finished and agent.step_count < 10:
+            result = await agent.step()
+            print(f"{msgs['step']} {agent.step_count}: {result.action}")
+            print(f"  {msgs['thinking']}: {result.thinking[:100]}...")
 
-    print(f"\n{msgs['final_result']}: {result.message}")
+        print(f"\n{msgs['final_result']}: {result.message}")
+    finally:
+        await agent.close()
 
 
-def example_multiple_tasks(lang: str = "cn"):
+async def example_multiple_tasks(lang: str = "cn"):
     """Batch task example / 批量任务示例"""
     msgs = get_messages(lang)
 
@@ -103,19 +114,22 @@ def example_multiple_tasks(lang: str = "cn"):
         "打开bilibili搜索Python教程",
     ]
 
-    for task in tasks:
-        print(f"\n{'=' * 50}")
-        print(f"{msgs['task']}: {task}")
-        print("=" * 50)
+    try:
+        for task in tasks:
+            print(f"\n{'=' * 50}")
+            print(f"{msgs['task']}: {task}")
+            print("=" * 50)
 
-        result = agent.run(task)
-        print(f"{msgs['result']}: {result}")
+            result = await agent.run(task)
+            print(f"{msgs['result']}: {result}")
 
-        # Reset Agent state
-        agent.reset()
+            # Reset Agent state
+            agent.reset()
+    finally:
+        await agent.close()
 
 
-def example_remote_device(lang: str = "cn"):
+async def example_remote_device(lang: str = "cn"):
     """Remote device example / 远程设备示例"""
     from phone_agent.adb import ADBConnection
 
@@ -125,7 +139,7 @@ def example_remote_device(lang: str = "cn"):
     conn = ADBConnection()
 
     # Connect to remote device
-    success, message = conn.connect("192.168.1.100:5555")
+    success, message = await conn.connect("192.168.1.100:5555")
     if not success:
         print(f"{msgs['connection_failed']}: {message}")
         return
@@ -142,11 +156,13 @@ def example_remote_device(lang: str = "cn"):
     agent = PhoneAgent(agent_config=agent_config)
 
     # Execute task
-    result = agent.run("打开微信查看消息")
-    print(f"{msgs['task_result']}: {result}")
-
-    # Disconnect
-    conn.disconnect("192.168.1.100:5555")
+    try:
+        result = await agent.run("打开微信查看消息")
+        print(f"{msgs['task_result']}: {result}")
+    finally:
+        await agent.close()
+        # Disconnect
+        await conn.disconnect("192.168.1.100:5555")
 
 
 if __name__ == "__main__":
@@ -170,21 +186,21 @@ if __name__ == "__main__":
     # Run basic example
     print(f"\n1. Basic Task Example")
     print("-" * 30)
-    example_basic_task(args.lang)
+    asyncio.run(example_basic_task(args.lang))
 
     # Uncomment to run other examples
     # print(f"\n2. Task Example with Callbacks")
     # print("-" * 30)
-    # example_with_callbacks(args.lang)
+    # asyncio.run(example_with_callbacks(args.lang))
 
     # print(f"\n3. Step-by-step Example")
     # print("-" * 30)
-    # example_step_by_step(args.lang)
+    # asyncio.run(example_step_by_step(args.lang))
 
     # print(f"\n4. Batch Task Example")
     # print("-" * 30)
-    # example_multiple_tasks(args.lang)
+    # asyncio.run(example_multiple_tasks(args.lang))
 
     # print(f"\n5. Remote Device Example")
     # print("-" * 30)
-    # example_remote_device(args.lang)
+    # asyncio.run(example_remote_device(args.lang))
@@ -6,13 +6,15 @@ This script demonstrates how the Agent outputs both thinking process and actions
 这个脚本展示了在 verbose 模式下，Agent 会同时输出思考过程和执行动作。
 """
 
+import asyncio
+
 from phone_agent import PhoneAgent
 from phone_agent.agent import AgentConfig
 from phone_agent.config import get_messages
 from phone_agent.model import ModelConfig
 
 
-def main(lang: str = "cn"):
+async def main(lang: str = "cn"):
     msgs = get_messages(lang)
 
     print("=" * 60)
@@ -41,7 +43,10 @@ def main(lang: str = "cn"):
 
     # Execute task
     print(f"\n📱 {msgs['starting_task']}...\n")
-    result = agent.run("打开小红书搜索美食攻略")
+    try:
+        result = await agent.run("打开小红书搜索美食攻略")
+    finally:
+        await agent.close()
 
     print("\n" + "=" * 60)
     print(f"📊 {msgs['final_result']}: {result}")
@@ -61,4 +66,4 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    main(lang=args.lang)
+    asyncio.run(main(lang=args.lang))
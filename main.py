@@ -777,7 +777,7 @@ async def handle_device_commands(args) -> bool:
     # Handle --connect
     if args.connect:
         print(f"Connecting to {args.connect}...")
-        success, message = conn.connect(args.connect)
+        success, message = await conn.connect(args.connect)
         print(f"{'✓' if success else '✗'} {message}")
         if success:
             # Set as default device
@@ -788,10 +788,10 @@ async def handle_device_commands(args) -> bool:
     if args.disconnect:
         if args.disconnect == "all":
             print("Disconnecting all remote devices...")
-            success, message = conn.disconnect()
+            success, message = await conn.disconnect()
         else:
             print(f"Disconnecting from {args.disconnect}...")
-            success, message = conn.disconnect(args.disconnect)
+            success, message = await conn.disconnect(args.disconnect)
         print(f"{'✓' if success else '✗'} {message}")
         return True
 
@@ -800,12 +800,12 @@ async def handle_device_commands(args) -> bool:
         port = args.enable_tcpip
         print(f"Enabling TCP/IP debugging on port {port}...")
 
-        success, message = conn.enable_tcpip(port, args.device_id)
+        success, message = await conn.enable_tcpip(port, args.device_id)
         print(f"{'✓' if success else '✗'} {message}")
 
         if success:
             # Try to get device IP
-            ip = conn.get_device_ip(args.device_id)
+            ip = await conn.get_device_ip(args.device_id)
             if ip:
                 print(f"\nYou can now connect remotely using:")
                 print(f"  python main.py --connect {ip}:{port}")
@@ -1080,43 +1080,48 @@ async def main():
             
         return
     
-    # Run with provided task or enter interactive mode
-    if args.task:
-        print(f"\nTask: {args.task}\n")
+    try:
+        # Run with provided task or enter interactive mode
+        if args.task:
+            print(f"\nTask: {args.task}\n")
         
-        # start_time = time.time()
-        result = await agent.run(args.task)
-        # end_time = time.time()
-        # print(f"\nTime taken: {end_time - start_time:.2f} seconds")
-        # print(f"\nResult: {result}")
-    else:
-        # Interactive mode
-        print("\nEntering interactive mode. Type 'quit' to exit.\n")
-
-        while True:
-            try:
-                task = input("Enter your task: ").strip()
-
-                if task.lower() in ("quit", "exit", "q"):
-                    print("Goodbye!")
+            # start_time = time.time()
+            result = await agent.run(args.task)
+            # end_time = time.time()
+            # print(f"\nTime taken: {end_time - start_time:.2f} seconds")
+            # print(f"\nResult: {result}")
+        else:
+            # Interactive mode
+            print("\nEntering interactive mode. Type 'quit' to exit.\n")
+
+            while True:
+                try:
+                    task = input("Enter your task: ").strip()
+
+                    if task.lower() in ("quit", "exit", "q"):
+                        print("Goodbye!")
+                        break
+
+                    if not task:
+                        continue
+
+                    print()
+                    # start_time = time.time()
+                    result = await agent.run(task)
+                    # end_time = time.time()
+                    # print(f"Time taken: {end_time - start_time:.2f} seconds")
+                    # print(f"\nResult: {result}\n")
+                    agent.reset()
+
+                except KeyboardInterrupt:
+                    print("\n\nInterrupted. Goodbye!")
                     break
+                except Exception as e:
+                    print(f"\nError: {e}\n")
 
-                if not task:
-                    continue
-
-                print()
-                # start_time = time.time()
-                result = await agent.run(task)
-                # end_time = time.time()
-                # print(f"Time taken: {end_time - start_time:.2f} seconds")
-                # print(f"\nResult: {result}\n")
-                agent.reset()
-
-            except KeyboardInterrupt:
-                print("\n\nInterrupted. Goodbye!")
-                break
-            except Exception as e:
-                print(f"\nError: {e}\n")
+    finally:
+        if isinstance(agent, PhoneAgent):
+            await agent.close()
 
 
 if __name__ == "__main__":
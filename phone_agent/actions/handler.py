@@ -3,13 +3,25 @@
 import ast
 import asyncio
 import re
-import subprocess
 import time
 from dataclasses import dataclass
 from typing import Any, Callable, List, Dict, Tuple
 
-from phone_agent.config.timing import TIMING_CONFIG
-from phone_agent.device_factory import get_device_factory
+from phone_agent.device_factory import DeviceType, get_device_factory
+from phone_agent.model.image import PreparedImage
+from phone_agent.settle import get_last_settle
+
+
+# Actions after which the screen may show other elements, or the same ones
+# elsewhere: targets of later actions must be looked up on a fresh screen
+SCREEN_CHANGING_ACTIONS = frozenset(
+    {"Launch", "Back", "Home", "Tap", "Double Tap", "Long Press", "Swipe"}
+)
+
+# Actions ActionHandler.execute_batch can run within one device round-trip
+BATCHABLE_ACTIONS = frozenset(
+    {"Launch", "Tap", "Type", "Type_Name", "Swipe", "Back", "Home", "Double Tap", "Long Press", "Wait"}
+)
 
 
 @dataclass
@@ -20,6 +32,8 @@ class ActionResult:
     should_finish: bool
     message: str | None = None
     requires_confirmation: bool = False
+    settle_time: float | None = None  # Seconds spent waiting for the UI after the action
+    settle_stable: bool | None = None  # False if the settle deadline passed first
 
 
 class ActionHandler:
@@ -85,12 +99,134 @@ class ActionHandler:
             )
 
         try:
-            return await handler_method(action, screen_width, screen_height)
+            started = time.time()
+            result = await handler_method(action, screen_width, screen_height)
+            settle = get_last_settle(self.device_id)
+            if settle is not None and settle.finished_at >= started:
+                result.settle_time = settle.elapsed
+                result.settle_stable = settle.stable
+            return result
         except Exception as e:
             return ActionResult(
                 success=False, should_finish=False, message=f"Action failed: {e}"
             )
 
+    async def execute_batch(
+        self, actions: List[dict[str, Any]], screen_width: int, screen_height: int
+    ) -> List[ActionResult]:
+        """
+        Execute a sequence of actions whose targets are known up front.
+
+        On ADB devices, consecutive device actions (see BATCHABLE_ACTIONS) run
+        as one shell script with a short wait between them and one settle wait
+        at the end. Other actions, and taps that need confirmation, run on
+        their own through execute(). The screen is not read between actions.
+
+        Args:
+            actions: Action dictionaries, as for execute().
+            screen_width: Current screen width in pixels.
+            screen_height: Current screen height in pixels.
+
+        Returns:
+            One ActionResult per action. Execution stops at the first failed or
+            finishing action, the actions after it are not run.
+        """
+        device_factory = await get_device_factory()
+        results: List[ActionResult] = []
+        group: List[dict[str, Any]] = []
+
+        for action in actions + [None]:
+            if action is not None and device_factory.device_type == DeviceType.ADB and self._batchable(action):
+                group.append(action)
+                continue
+            if group:
+                results += await self._run_batch(group, screen_width, screen_height)
+                group = []
+                if not results[-1].success:
+                    break
+            if action is None:
+                break
+            result = await self.execute(action, screen_width, screen_height)
+            results.append(result)
+            if not result.success or result.should_finish:
+                break
+
+        skipped = ActionResult(False, False, "Not executed, an earlier action failed")
+        return results + [skipped] * (len(actions) - len(results))
+
+    @staticmethod
+    def _batchable(action: dict[str, Any]) -> bool:
+        # Sensitive taps ask for confirmation first
+        return (
+            action.get("_metadata") == "do"
+            and action.get("action") in BATCHABLE_ACTIONS
+            and not (action.get("action") == "Tap" and "message" in action)
+        )
+
+    async def _run_batch(
+        self, actions: List[dict[str, Any]], width: int, height: int
+    ) -> List[ActionResult]:
+        """Run device actions as one ShellBatch, stopping before an invalid action."""
+        from phone_agent.adb.batch import ShellBatch
+
+        batch = ShellBatch(self.device_id)
+        error = None
+        for action in actions:
+            error = await self._add_to_batch(batch, action, width, height)
+            if error is not None:
+                break
+
+        started = time.time()
+        oks = await batch.run() if len(batch) else []
+        results = [
+            ActionResult(ok, False, None if ok else f"{action.get('action')} failed")
+            for action, ok in zip(actions, oks)
+        ]
+        settle = batch.settle_result
+        if results and results[-1].success and settle is not None and settle.finished_at >= started:
+            results[-1].settle_time = settle.elapsed
+            results[-1].settle_stable = settle.stable
+        if error is not None and all(oks):
+            results.append(error)
+        return results
+
+    async def _add_to_batch(self, batch, action: dict[str, Any], width: int, height: int) -> ActionResult | None:
+        """Add an action to a ShellBatch, or return the failed result of an invalid action."""
+        name = action.get("action")
+        if name == "Launch":
+            app_name = action.get("app")
+            if not app_name:
+                return ActionResult(False, False, "No app name specified")
+            if not batch.launch_app(app_name):
+                return ActionResult(False, False, f"App not found: {app_name}")
+        elif name == "Back":
+            batch.back()
+        elif name == "Home":
+            batch.home()
+        elif name == "Wait":
+            batch.wait(self._wait_seconds(action))
+        elif name == "Swipe":
+            points = self._swipe_points(action, width) if action.get("element") else None
+            if points is None:
+                return ActionResult(False, False, "Invalid swipe direction")
+            batch.swipe(*points)
+        else:
+            element = action.get("element")
+            if not element:
+                return ActionResult(False, False, "No element coordinates")
+            x, y = self._convert_relative_to_absolute(element, width, height)
+            if name in ("Type", "Type_Name"):
+                await batch.input_text(
+                    action.get("text", ""), clear=True, enter=bool(action.get("enter", False)), tap=(x, y)
+                )
+            elif name == "Double Tap":
+                batch.double_tap(x, y)
+            elif name == "Long Press":
+                batch.long_press(x, y)
+            else:
+                batch.tap(x, y)
+        return None
+
     def _get_handler(self, action_name: str) -> Callable | None:
         """Get the handler method for an action."""
         handlers = {
@@ -146,7 +282,8 @@ class ActionHandler:
 
         # Check for sensitive operation
         if "message" in action:
-            if not self.confirmation_callback(action["message"]):
+            # Callbacks wait for the user (console input by default), not on the event loop
+            if not await asyncio.to_thread(self.confirmation_callback, action["message"]):
                 return ActionResult(
                     success=False,
                     should_finish=True,
@@ -169,21 +306,10 @@ class ActionHandler:
         device_factory = await get_device_factory()
         await device_factory.tap(x, y, self.device_id)
 
-        # Switch to ADB keyboard
-        original_ime = await device_factory.detect_and_set_adb_keyboard(self.device_id)
-        await asyncio.sleep(TIMING_CONFIG.action.keyboard_switch_delay)
-
-        # Clear existing text and type new text
-        await device_factory.clear_text(self.device_id)
-        await asyncio.sleep(TIMING_CONFIG.action.text_clear_delay)
-
-        # Handle multiline text by splitting on newlines
-        await device_factory.type_text(text, self.device_id)
-        await asyncio.sleep(TIMING_CONFIG.action.text_input_delay)
-
-        # Restore original keyboard
-        await device_factory.restore_keyboard(original_ime, self.device_id)
-        await asyncio.sleep(TIMING_CONFIG.action.keyboard_restore_delay)
+        # Clear and type in one go, the input keyboard stays active for the session
+        await device_factory.input_text(
+            text, self.device_id, clear=True, enter=bool(action.get("enter", False))
+        )
 
         return ActionResult(True, False)
 
@@ -204,6 +330,16 @@ class ActionHandler:
     
     async def _handle_swipe(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle swipe action."""
+        points = self._swipe_points(action, width)
+        if points is None:
+            return ActionResult(False, False, "Invalid swipe direction")
+        device_factory = await get_device_factory()
+        await device_factory.swipe(*points, device_id=self.device_id)
+        return ActionResult(True, False)
+
+    @staticmethod
+    def _swipe_points(action: dict, width: int) -> tuple[int, int, int, int] | None:
+        """Start and end point of a swipe action, None if the direction is invalid."""
         dist = action.get("distance", "medium")
         direction = action.get("direction")
         unit_dist = int(width / 10)
@@ -222,11 +358,9 @@ class ActionHandler:
         elif direction == "right":
             offset = unit_dist, 0
         else:
-            return ActionResult(False, False, "Invalid swipe direction")
+            return None
         start_x, start_y = action.get("element")
-        device_factory = await get_device_factory()
-        await device_factory.swipe(start_x, start_y, start_x+offset[0], start_y+offset[1], device_id=self.device_id)
-        return ActionResult(True, False)
+        return start_x, start_y, start_x + offset[0], start_y + offset[1]
 
     async def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle back button action."""
@@ -264,19 +398,21 @@ class ActionHandler:
 
     async def _handle_wait(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle wait action."""
+        await asyncio.sleep(self._wait_seconds(action))
+        return ActionResult(True, False)
+
+    @staticmethod
+    def _wait_seconds(action: dict) -> float:
         duration_str = action.get("duration", "1 seconds")
         try:
-            duration = float(duration_str.replace("seconds", "").strip())
+            return float(duration_str.replace("seconds", "").strip())
         except ValueError:
-            duration = 1.0
-
-        await asyncio.sleep(duration)
-        return ActionResult(True, False)
+            return 1.0
 
     async def _handle_takeover(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle takeover request (login, captcha, etc.)."""
         message = action.get("message", "User intervention required")
-        self.takeover_callback(message)
+        await asyncio.to_thread(self.takeover_callback, message)
         return ActionResult(True, False)
 
     async def _handle_note(self, action: dict, width: int, height: int) -> ActionResult:
@@ -304,65 +440,38 @@ class ActionHandler:
 
     async def _send_keyevent(self, keycode: str) -> None:
         """Send a keyevent to the device."""
-        from phone_agent.device_factory import DeviceType, get_device_factory
-        from phone_agent.hdc.connection import _run_hdc_command
-
         device_factory = await get_device_factory()
 
         # Handle HDC devices with HarmonyOS-specific keyEvent command
         if device_factory.device_type == DeviceType.HDC:
+            from phone_agent.hdc.connection import _run_hdc_command_async
+
             hdc_prefix = ["hdc", "-t", self.device_id] if self.device_id else ["hdc"]
-            
+            # ADB-style command, for keys without a HarmonyOS keyEvent mapping
+            fallback = hdc_prefix + ["shell", "input", "keyevent", keycode]
+
             # Map common keycodes to HarmonyOS keyEvent codes
             # KEYCODE_ENTER (66) -> 2054 (HarmonyOS Enter key code)
-            if keycode == "KEYCODE_ENTER" or keycode == "66":
-                _run_hdc_command(
-                    hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "2054"],
-                    capture_output=True,
-                    text=True,
-                )
+            if keycode == "66" or (keycode.startswith("KEYCODE_") and "ENTER" in keycode):
+                cmd = hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "2054"]
+            elif keycode.startswith("KEYCODE_"):
+                # For now, only handle ENTER, other keys may need mapping
+                cmd = fallback
             else:
-                # For other keys, try to use the numeric code directly
-                # If keycode is a string like "KEYCODE_ENTER", convert it
-                try:
-                    # Try to extract numeric code from string or use as-is
-                    if keycode.startswith("KEYCODE_"):
-                        # For now, only handle ENTER, other keys may need mapping
-                        if "ENTER" in keycode:
-                            _run_hdc_command(
-                                hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "2054"],
-                                capture_output=True,
-                                text=True,
-                            )
-                        else:
-                            # Fallback to ADB-style command for unsupported keys
-                            subprocess.run(
-                                hdc_prefix + ["shell", "input", "keyevent", keycode],
-                                capture_output=True,
-                                text=True,
-                            )
-                    else:
-                        # Assume it's a numeric code
-                        _run_hdc_command(
-                            hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", str(keycode)],
-                            capture_output=True,
-                            text=True,
-                        )
-                except Exception:
-                    # Fallback to ADB-style command
-                    subprocess.run(
-                        hdc_prefix + ["shell", "input", "keyevent", keycode],
-                        capture_output=True,
-                        text=True,
-                    )
+                # Assume it's a numeric code
+                cmd = hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", str(keycode)]
+
+            try:
+                await _run_hdc_command_async(cmd, capture_output=True, text=True)
+            except Exception:
+                if cmd is fallback:
+                    raise
+                await _run_hdc_command_async(fallback, capture_output=True, text=True)
         else:
             # ADB devices use standard input keyevent command
-            cmd_prefix = ["adb", "-s", self.device_id] if self.device_id else ["adb"]
-            subprocess.run(
-                cmd_prefix + ["shell", "input", "keyevent", keycode],
-                capture_output=True,
-                text=True,
-            )
+            from phone_agent.adb.transport import adb_shell
+
+            await adb_shell(["input", "keyevent", keycode], self.device_id)
 
     @staticmethod
     def _default_confirmation(message: str) -> bool:
@@ -376,12 +485,16 @@ class ActionHandler:
         input(f"{message}\nPress Enter after completing manual operation...")
 
 
-def parse_action(action_code: str, elements_info: List[Dict[str, str]], is_portal: bool = True) -> Tuple[dict[str, Any], str]:
+def parse_action(action_code: str, elements_info: List[Dict[str, str]], is_portal: bool = True, image: PreparedImage | None = None) -> Tuple[dict[str, Any], str]:
     """
     Parse action from model response.
 
     Args:
         action_code: The raw action string from the model.
+        elements_info: Elements the model can reference by id, bbox in device pixels.
+        is_portal: Whether elements come from the DroidRun Portal.
+        image: The image the model saw. Raw coordinates from the model are in its
+            pixel space and are mapped back to device pixels.
 
     Returns:
         Parsed action dictionary.
@@ -419,6 +532,13 @@ def parse_action(action_code: str, elements_info: List[Dict[str, str]], is_porta
                     key = keyword.arg
                     value = ast.literal_eval(keyword.value)
                     action[key] = value
+
+                # Coordinates given directly are in the model image space
+                if image is not None and image.is_scaled:
+                    for key in ("element", "start", "end"):
+                        point = action.get(key)
+                        if isinstance(point, (list, tuple)) and len(point) == 2:
+                            action[key] = list(image.to_device(*point))
                 
                 # Convert element ID to actual coordinates if needed
                 if "element" in action and isinstance(action["element"], str):
@@ -20,19 +20,28 @@ from phone_agent.adb.device import (
 from phone_agent.adb.input import (
     clear_text,
     detect_and_set_adb_keyboard,
+    input_text,
     restore_keyboard,
     type_text,
 )
+from phone_agent.adb.keyboard import restore_keyboards
+from phone_agent.adb.frame_stream import get_frame_server, stop_frame_servers
+from phone_agent.adb.observation import get_observation
 from phone_agent.adb.screenshot import get_screenshot
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "get_observation",
+    "get_frame_server",
+    "stop_frame_servers",
     # Input
     "type_text",
     "clear_text",
     "detect_and_set_adb_keyboard",
     "restore_keyboard",
+    "input_text",
+    "restore_keyboards",
     # Device control
     "get_current_app",
     "tap",
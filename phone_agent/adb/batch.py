@@ -0,0 +1,212 @@
+"""Run a sequence of actions in one device round-trip.
+
+ShellBatch collects the shell commands of several actions and runs them as one
+script in the device's shell session, with a short wait between actions and a
+single settle wait at the end, instead of a shell call and a settle wait per
+action. Steps that cannot be shell commands (text input through the Portal
+keyboard) run between script segments.
+"""
+
+import asyncio
+import base64
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Tuple
+
+from phone_agent.adb.keyboard import get_keyboard_session
+from phone_agent.adb.settle import settle
+from phone_agent.adb.transport import adb_shell
+from phone_agent.config.apps import APP_PACKAGES, get_app_name
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.settle import SettleResult
+
+logger = logging.getLogger("adb_batch")
+
+_MARKER = "__batch_step"
+
+
+@dataclass
+class _Step:
+    action: str
+    delay: float  # Settle deadline if the batch ended with this step
+    commands: List[str] | None = None  # Shell commands, run in the script
+    call: Callable[[], Awaitable[bool]] | None = None  # Or a device call outside the script
+    duration: float = 0.0  # Seconds the commands sleep or hold on purpose
+
+
+class ShellBatch:
+    """
+    Collects actions for one device and runs them together.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        step_wait: Seconds to wait between actions, defaults to
+            TIMING_CONFIG.action.batch_step_wait.
+    """
+
+    def __init__(self, device_id: str | None = None, step_wait: float | None = None):
+        self.device_id = device_id
+        self.step_wait = TIMING_CONFIG.action.batch_step_wait if step_wait is None else step_wait
+        self.settle_result: SettleResult | None = None
+        self._steps: List[_Step] = []
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def tap(self, x: int, y: int) -> None:
+        self._add("tap", TIMING_CONFIG.device.default_tap_delay, f"input tap {x} {y}")
+
+    def double_tap(self, x: int, y: int) -> None:
+        self._add(
+            "double_tap",
+            TIMING_CONFIG.device.default_double_tap_delay,
+            f"input tap {x} {y}",
+            f"sleep {TIMING_CONFIG.device.double_tap_interval}",
+            f"input tap {x} {y}",
+            duration=TIMING_CONFIG.device.double_tap_interval,
+        )
+
+    def long_press(self, x: int, y: int, duration_ms: int = 3000) -> None:
+        self._add(
+            "long_press",
+            TIMING_CONFIG.device.default_long_press_delay,
+            f"input swipe {x} {y} {x} {y} {duration_ms}",
+            duration=duration_ms / 1000,
+        )
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration_ms: int | None = None) -> None:
+        if duration_ms is None:
+            # Same duration as phone_agent.adb.device.swipe
+            dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+            duration_ms = max(100, min(int(dist_sq / 100), 500))
+        self._add(
+            "swipe",
+            TIMING_CONFIG.device.default_swipe_delay,
+            f"input swipe {start_x} {start_y} {end_x} {end_y} {duration_ms}",
+            duration=duration_ms / 1000,
+        )
+
+    def back(self) -> None:
+        self._add("back", TIMING_CONFIG.device.default_back_delay, "input keyevent 4")
+
+    def home(self) -> None:
+        self._add("home", TIMING_CONFIG.device.default_home_delay, "input keyevent KEYCODE_HOME")
+
+    def launch_app(self, app_name: str) -> bool:
+        """Add an app launch, False if the app is unknown (nothing is added)."""
+        app_name = get_app_name(app_name) or app_name
+        if app_name not in APP_PACKAGES:
+            return False
+        self._add(
+            "launch_app",
+            TIMING_CONFIG.device.default_launch_delay,
+            f"monkey -p {APP_PACKAGES[app_name]} -c android.intent.category.LAUNCHER 1",
+        )
+        return True
+
+    def wait(self, seconds: float) -> None:
+        self._add("wait", 0.0, f"sleep {seconds}", duration=seconds)
+
+    async def input_text(
+        self, text: str, clear: bool = True, enter: bool = False, tap: Tuple[int, int] | None = None
+    ) -> None:
+        """
+        Add text input through the session keyboard (see phone_agent.adb.keyboard).
+
+        Args:
+            text: The text to type.
+            clear: Clear the field first.
+            enter: Press enter after typing.
+            tap: Point to tap first to focus the field, part of the same step.
+        """
+        session = get_keyboard_session(self.device_id)
+        await session.start()
+        delay = TIMING_CONFIG.action.text_input_delay
+        commands = [f"input tap {tap[0]} {tap[1]}", f"sleep {self.step_wait}"] if tap else []
+
+        if session.uses_portal:
+
+            async def portal_input() -> bool:
+                if commands:
+                    await adb_shell(" && ".join(commands), self.device_id)
+                await session.input_text(text, clear=clear, enter=enter)
+                return True
+
+            self._steps.append(_Step("type", delay, call=portal_input))
+            return
+
+        encoded = base64.b64encode(text.encode("utf-8")).decode("utf-8")
+        if clear:
+            commands.append("am broadcast -a ADB_CLEAR_TEXT")
+        commands.append(f"am broadcast -a ADB_INPUT_B64 --es msg {encoded}")
+        if enter:
+            commands.append("input keyevent KEYCODE_ENTER")
+        self._add("type", delay, *commands)
+
+    async def run(self) -> List[bool]:
+        """
+        Run the collected actions, stopping at the first one that fails.
+
+        Returns:
+            Per-action success, False for failed and skipped actions.
+        """
+        results: List[bool] = []
+        segment: List[_Step] = []
+        for step in self._steps:
+            if step.commands is not None:
+                segment.append(step)
+                continue
+            results += await self._run_script(segment, first=not results)
+            segment = []
+            if not all(results):
+                break
+            if results:
+                await asyncio.sleep(self.step_wait)
+            try:
+                ok = await step.call()
+            except Exception as e:
+                logger.warning(f"Batched {step.action} failed: {e}")
+                ok = False
+            results.append(ok)
+            if not ok:
+                break
+        else:
+            results += await self._run_script(segment, first=not results)
+
+        executed = [step for step, ok in zip(self._steps, results) if ok]
+        results += [False] * (len(self._steps) - len(results))
+        if executed:
+            self.settle_result = await settle(
+                "batch", self.device_id, max(step.delay for step in executed)
+            )
+        return results
+
+    async def _run_script(self, steps: List[_Step], first: bool) -> List[bool]:
+        """Run shell steps as one script, each step reports completion with a marker line."""
+        if not steps:
+            return []
+        parts = [] if first else [f"sleep {self.step_wait}"]
+        for i, step in enumerate(steps):
+            if i:
+                parts.append(f"sleep {self.step_wait}")
+            parts += step.commands
+            parts.append(f"echo {_MARKER} {i}")
+
+        # The shell command timeout plus the time the script sleeps on purpose
+        timeout = TIMING_CONFIG.connection.shell_command_timeout + sum(
+            self.step_wait + step.duration for step in steps
+        )
+        try:
+            output = await adb_shell(" && ".join(parts), self.device_id, timeout=timeout, stderr=True)
+        except (asyncio.TimeoutError, ConnectionResetError) as e:
+            # How far the script got is unknown, count none of its steps as done
+            reason = f"timed out after {timeout:.1f}s" if isinstance(e, asyncio.TimeoutError) else f"interrupted: {e}"
+            logger.warning(f"Batched {steps[0].action} {reason}")
+            return [False] * len(steps)
+        done = sum(1 for line in output.splitlines() if line.startswith(_MARKER))
+        if done < len(steps):
+            logger.warning(f"Batched {steps[done].action} failed: {output.strip()[-200:]}")
+        return [i < done for i in range(len(steps))]
+
+    def _add(self, action: str, delay: float, *commands: str, duration: float = 0.0) -> None:
+        self._steps.append(_Step(action, delay, commands=list(commands), duration=duration))
@@ -2,7 +2,6 @@
 
 import asyncio
 import subprocess
-import time
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
@@ -29,6 +28,37 @@ class DeviceInfo:
     android_version: str | None = None
 
 
+async def _run_adb_command(cmd: list[str], timeout: float) -> tuple[int, str, str]:
+    """
+    Run an adb command without blocking the event loop.
+
+    Args:
+        cmd: Command list to execute.
+        timeout: Timeout in seconds, raises subprocess.TimeoutExpired when exceeded.
+
+    Returns:
+        Tuple of (returncode, stdout, stderr).
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    return (
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
 class ADBConnection:
     """
     Manages ADB connections to Android devices.
@@ -38,11 +68,11 @@ class ADBConnection:
     Example:
         >>> conn = ADBConnection()
         >>> # Connect to remote device
-        >>> conn.connect("192.168.1.100:5555")
+        >>> await conn.connect("192.168.1.100:5555")
         >>> # List devices
-        >>> devices = conn.list_devices()
+        >>> devices = await conn.list_devices()
         >>> # Disconnect
-        >>> conn.disconnect("192.168.1.100:5555")
+        >>> await conn.disconnect("192.168.1.100:5555")
     """
 
     def __init__(self, adb_path: str = "adb"):
@@ -54,7 +84,7 @@ class ADBConnection:
         """
         self.adb_path = adb_path
 
-    def connect(self, address: str, timeout: int = 10) -> tuple[bool, str]:
+    async def connect(self, address: str, timeout: int = 10) -> tuple[bool, str]:
         """
         Connect to a remote device via TCP/IP.
 
@@ -74,14 +104,11 @@ class ADBConnection:
             address = f"{address}:5555"  # Default ADB port
 
         try:
-            result = subprocess.run(
-                [self.adb_path, "connect", address],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
+            _, stdout, stderr = await _run_adb_command(
+                [self.adb_path, "connect", address], timeout
             )
 
-            output = result.stdout + result.stderr
+            output = stdout + stderr
 
             if "connected" in output.lower():
                 return True, f"Connected to {address}"
@@ -95,7 +122,7 @@ class ADBConnection:
         except Exception as e:
             return False, f"Connection error: {e}"
 
-    def disconnect(self, address: str | None = None) -> tuple[bool, str]:
+    async def disconnect(self, address: str | None = None) -> tuple[bool, str]:
         """
         Disconnect from a remote device.
 
@@ -110,9 +137,9 @@ class ADBConnection:
             if address:
                 cmd.append(address)
 
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", timeout=5)
+            _, stdout, stderr = await _run_adb_command(cmd, 5)
 
-            output = result.stdout + result.stderr
+            output = stdout + stderr
             return True, output.strip() or "Disconnected"
 
         except Exception as e:
@@ -126,22 +153,7 @@ class ADBConnection:
             List of DeviceInfo objects.
         """
         try:
-            process = await asyncio.create_subprocess_exec(
-                self.adb_path,
-                "devices",
-                "-l",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=5)
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
-                raise subprocess.TimeoutExpired([self.adb_path, "devices", "-l"], 5)
-            
-            result_stdout = stdout.decode()
+            _, result_stdout, _ = await _run_adb_command([self.adb_path, "devices", "-l"], 5)
 
             devices = []
             for line in result_stdout.strip().split("\n")[1:]:  # Skip header
@@ -227,7 +239,7 @@ class ADBConnection:
 
         return any(d.device_id == device_id and d.status == "device" for d in devices)
 
-    def enable_tcpip(
+    async def enable_tcpip(
         self, port: int = 5555, device_id: str | None = None
     ) -> tuple[bool, str]:
         """
@@ -252,12 +264,12 @@ class ADBConnection:
                 cmd.extend(["-s", device_id])
             cmd.extend(["tcpip", str(port)])
 
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", timeout=10)
+            returncode, stdout, stderr = await _run_adb_command(cmd, 10)
 
-            output = result.stdout + result.stderr
+            output = stdout + stderr
 
-            if "restarting" in output.lower() or result.returncode == 0:
-                time.sleep(TIMING_CONFIG.connection.adb_restart_delay)
+            if "restarting" in output.lower() or returncode == 0:
+                await asyncio.sleep(TIMING_CONFIG.connection.adb_restart_delay)
                 return True, f"TCP/IP mode enabled on port {port}"
             else:
                 return False, output.strip()
@@ -265,7 +277,7 @@ class ADBConnection:
         except Exception as e:
             return False, f"Error enabling TCP/IP: {e}"
 
-    def get_device_ip(self, device_id: str | None = None) -> str | None:
+    async def get_device_ip(self, device_id: str | None = None) -> str | None:
         """
         Get the IP address of a connected device.
 
@@ -281,10 +293,10 @@ class ADBConnection:
                 cmd.extend(["-s", device_id])
             cmd.extend(["shell", "ip", "route"])
 
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", timeout=5)
+            _, stdout, _ = await _run_adb_command(cmd, 5)
 
             # Parse IP from route output
-            for line in result.stdout.split("\n"):
+            for line in stdout.split("\n"):
                 if "src" in line:
                     parts = line.split()
                     for i, part in enumerate(parts):
@@ -293,15 +305,11 @@ class ADBConnection:
 
             # Alternative: try wlan0 interface
             cmd[-1] = "ip addr show wlan0"
-            result = subprocess.run(
-                cmd[:-1] + ["shell", "ip", "addr", "show", "wlan0"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                timeout=5,
+            _, stdout, _ = await _run_adb_command(
+                cmd[:-1] + ["shell", "ip", "addr", "show", "wlan0"], 5
             )
 
-            for line in result.stdout.split("\n"):
+            for line in stdout.split("\n"):
                 if "inet " in line:
                     parts = line.strip().split()
                     if len(parts) >= 2:
@@ -313,7 +321,7 @@ class ADBConnection:
             print(f"Error getting device IP: {e}")
             return None
 
-    def restart_server(self) -> tuple[bool, str]:
+    async def restart_server(self) -> tuple[bool, str]:
         """
         Restart the ADB server.
 
@@ -322,16 +330,12 @@ class ADBConnection:
         """
         try:
             # Kill server
-            subprocess.run(
-                [self.adb_path, "kill-server"], capture_output=True, timeout=5
-            )
+            await _run_adb_command([self.adb_path, "kill-server"], 5)
 
-            time.sleep(TIMING_CONFIG.connection.server_restart_delay)
+            await asyncio.sleep(TIMING_CONFIG.connection.server_restart_delay)
 
             # Start server
-            subprocess.run(
-                [self.adb_path, "start-server"], capture_output=True, timeout=5
-            )
+            await _run_adb_command([self.adb_path, "start-server"], 5)
 
             return True, "ADB server restarted"
 
@@ -339,7 +343,7 @@ class ADBConnection:
             return False, f"Error restarting server: {e}"
 
 
-def quick_connect(address: str) -> tuple[bool, str]:
+async def quick_connect(address: str) -> tuple[bool, str]:
     """
     Quick helper to connect to a remote device.
 
@@ -350,7 +354,7 @@ def quick_connect(address: str) -> tuple[bool, str]:
         Tuple of (success, message).
     """
     conn = ADBConnection()
-    return conn.connect(address)
+    return await conn.connect(address)
 
 
 async def list_devices() -> list[DeviceInfo]:
@@ -2,11 +2,14 @@
 
 import asyncio
 import os
+import re
 import subprocess
 import time
 from typing import List, Optional, Tuple
 
-from phone_agent.config.apps import APP_PACKAGES
+from phone_agent.adb.settle import settle
+from phone_agent.adb.transport import adb_shell
+from phone_agent.config.apps import APP_PACKAGES, get_app_name
 from phone_agent.config.timing import TIMING_CONFIG
 
 
@@ -14,36 +17,52 @@ async def get_current_app(device_id: str | None = None) -> str:
     """
     Get the currently focused app name.
 
+    Prefer current_app_from_state when a portal state is at hand, this
+    queries the window manager.
+
     Args:
         device_id: Optional ADB device ID for multi-device setups.
 
     Returns:
         The app name if recognized, otherwise "System Home".
     """
-    adb_prefix = await _get_adb_prefix(device_id)
-    # print(f"adb_prefix: {adb_prefix}")
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "dumpsys", "window",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+    # Only the display section, filtered on device: a few lines instead of
+    # the full multi-hundred-KB `dumpsys window` output
+    output = await adb_shell(
+        "dumpsys window displays | grep -E 'mCurrentFocus|mFocusedApp'",
+        device_id,
     )
-    stdout, stderr = await process.communicate()
-    output = stdout.decode("utf-8")
-    
+
     if not output:
         raise ValueError("No output from dumpsys window")
 
-    # Parse window focus info
-    for line in output.split("\n"):
-        if "mCurrentFocus" in line or "mFocusedApp" in line:
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+    # e.g. mCurrentFocus=Window{1a2b u0 com.tencent.mm/com.tencent.mm.ui.LauncherUI}
+    for package in _FOCUS_PACKAGE_RE.findall(output):
+        app_name = get_app_name(package)
+        if app_name:
+            return app_name
 
     return "System Home"
 
 
+def current_app_from_state(state: dict) -> str | None:
+    """
+    Get the focused app name from a portal state, without a device call.
+
+    Args:
+        state: Combined portal state (see utils.ui_filter.fetch_state_portal).
+
+    Returns:
+        The app name if recognized, "System Home" for other packages, or
+        None if the state carries no package name.
+    """
+    phone_state = state.get("phone_state") or {}
+    package = phone_state.get("packageName") if isinstance(phone_state, dict) else None
+    if not package:
+        return None
+    return get_app_name(package) or "System Home"
+
+
 async def tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
 ) -> None:
@@ -54,20 +73,14 @@ async def tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after tap. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after tap. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_tap_delay
 
-    adb_prefix = await _get_adb_prefix(device_id)
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "input", "tap", str(x), str(y),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    await process.communicate()
-    await asyncio.sleep(delay)
+    await adb_shell(["input", "tap", str(x), str(y)], device_id)
+    await settle("tap", device_id, delay)
 
 
 async def double_tap(
@@ -80,28 +93,17 @@ async def double_tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after double tap. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after double tap. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_double_tap_delay
 
-    adb_prefix = await _get_adb_prefix(device_id)
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "input", "tap", str(x), str(y),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    await process.communicate()
+    await adb_shell(["input", "tap", str(x), str(y)], device_id)
     await asyncio.sleep(TIMING_CONFIG.device.double_tap_interval)
     
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "input", "tap", str(x), str(y),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    await process.communicate()
-    await asyncio.sleep(delay)
+    await adb_shell(["input", "tap", str(x), str(y)], device_id)
+    await settle("double_tap", device_id, delay)
 
 
 async def long_press(
@@ -119,20 +121,16 @@ async def long_press(
         y: Y coordinate.
         duration_ms: Duration of press in milliseconds.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after long press. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after long press. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_long_press_delay
 
-    adb_prefix = await _get_adb_prefix(device_id)
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+    await adb_shell(
+        ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)], device_id
     )
-    await process.communicate()
-    await asyncio.sleep(delay)
+    await settle("long_press", device_id, delay)
 
 
 async def swipe(
@@ -154,13 +152,12 @@ async def swipe(
         end_y: Ending Y coordinate.
         duration_ms: Duration of swipe in milliseconds (auto-calculated if None).
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after swipe. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after swipe. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_swipe_delay
 
-    adb_prefix = await _get_adb_prefix(device_id)
-
     if duration_ms is None:
         # Calculate duration based on distance
         dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
@@ -169,14 +166,11 @@ async def swipe(
     
     # print(f"swipe: {start_x}, {start_y} -> {end_x}, {end_y}")
 
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "input", "swipe",
-        str(start_x), str(start_y), str(end_x), str(end_y), str(duration_ms),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+    await adb_shell(
+        ["input", "swipe", str(start_x), str(start_y), str(end_x), str(end_y), str(duration_ms)],
+        device_id,
     )
-    await process.communicate()
-    await asyncio.sleep(delay)
+    await settle("swipe", device_id, delay)
 
 
 async def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -185,20 +179,14 @@ async def back(device_id: str | None = None, delay: float | None = None) -> None
 
     Args:
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after pressing back. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after pressing back. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_back_delay
 
-    adb_prefix = await _get_adb_prefix(device_id)
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "input", "keyevent", "4",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    await process.communicate()
-    await asyncio.sleep(delay)
+    await adb_shell(["input", "keyevent", "4"], device_id)
+    await settle("back", device_id, delay)
 
 
 async def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -207,20 +195,14 @@ async def home(device_id: str | None = None, delay: float | None = None) -> None
 
     Args:
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after pressing home. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after pressing home. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_home_delay
 
-    adb_prefix = await _get_adb_prefix(device_id)
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "input", "keyevent", "KEYCODE_HOME",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    await process.communicate()
-    await asyncio.sleep(delay)
+    await adb_shell(["input", "keyevent", "KEYCODE_HOME"], device_id)
+    await settle("home", device_id, delay)
 
 
 async def launch_app(
@@ -232,7 +214,8 @@ async def launch_app(
     Args:
         app_name: The app name (must be in APP_PACKAGES).
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after launching. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after launching. If None,
+            uses configured default.
 
     Returns:
         True if app was launched, False if app not found.
@@ -241,32 +224,19 @@ async def launch_app(
     if delay is None:
         delay = TIMING_CONFIG.device.default_launch_delay
 
-    for name, package in APP_PACKAGES.items():
-        if app_name == package:
-            app_name = name
-            break
+    app_name = get_app_name(app_name) or app_name
 
     if app_name not in APP_PACKAGES:
         return False
 
-    adb_prefix = await _get_adb_prefix(device_id)
-    
     package = APP_PACKAGES[app_name]
     # print(f"package: {package}")
 
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix, "shell", "monkey", "-p", package,
-        "-c", "android.intent.category.LAUNCHER", "1",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+    await adb_shell(
+        ["monkey", "-p", package, "-c", "android.intent.category.LAUNCHER", "1"], device_id
     )
-    await process.communicate()
-    await asyncio.sleep(delay)
+    await settle("launch_app", device_id, delay)
     return True
 
 
-async def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
+_FOCUS_PACKAGE_RE = re.compile(r"\s([\w.]+)/")
@@ -0,0 +1,478 @@
+"""Persistent per-device frame server backed by a continuous screen stream.
+
+A FrameServer keeps one producer process open (by default
+`adb exec-out screenrecord --output-format=h264 -`), decodes its output in a
+worker thread and holds the most recent frames in a small ring buffer, so a
+screenshot is a buffer lookup instead of a process spawn plus full framebuffer
+encode.
+"""
+
+import asyncio
+import atexit
+import logging
+import queue
+import struct
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Callable, Deque, Dict, List, Optional
+
+from PIL import Image
+
+logger = logging.getLogger("frame_stream")
+
+# Pixel formats written by `screencap` without -p (android PixelFormat values)
+# mapped to (PIL image mode, PIL raw mode, bytes per pixel).
+RAW_PIXEL_FORMATS = {
+    1: ("RGBA", "RGBA", 4),  # RGBA_8888
+    2: ("RGB", "RGBX", 4),   # RGBX_8888
+    3: ("RGB", "RGB", 3),    # RGB_888
+    5: ("RGBA", "BGRA", 4),  # BGRA_8888
+}
+
+
+@dataclass
+class Frame:
+    """A decoded screen frame."""
+
+    width: int
+    height: int
+    mode: str  # PIL image mode of data ("RGB" or "RGBA")
+    data: bytes
+    raw_mode: str = ""  # PIL raw mode of data if it differs from mode
+    timestamp: float = field(default_factory=time.time)
+    index: int = 0
+    _png: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    def to_image(self) -> Image.Image:
+        """Wrap the frame pixels in a PIL image."""
+        raw_mode = self.raw_mode or self.mode
+        return Image.frombuffer(
+            self.mode, (self.width, self.height), self.data, "raw", raw_mode, 0, 1
+        )
+
+    def to_png(self) -> bytes:
+        """Encode the frame as PNG (fast compression), cached per frame."""
+        if self._png is None:
+            buffered = BytesIO()
+            self.to_image().convert("RGB").save(buffered, format="PNG", compress_level=1)
+            self._png = buffered.getvalue()
+        return self._png
+
+
+class RawFrameDecoder:
+    """
+    Decoder for a stream of concatenated `screencap` raw frames.
+
+    A new decoder is created for every producer run, so partial data from a
+    previous run never leaks into the next one.
+
+    Each frame is a header of little-endian uint32 width, height, pixel format
+    (and a color space word on Android 12+, see header_size) followed by the
+    pixels. This is what `while true; do screencap; done` produces, and what
+    test producers can write without an H.264 encoder.
+
+    Args:
+        header_size: 12 for Android 11 and older, 16 for Android 12+.
+    """
+
+    def __init__(self, header_size: int = 16):
+        if header_size not in (12, 16):
+            raise ValueError("header_size must be 12 or 16")
+        self.header_size = header_size
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[Frame]:
+        """Consume a chunk of stream data and return the frames it completed."""
+        self._buffer.extend(chunk)
+        frames = []
+        while len(self._buffer) >= self.header_size:
+            width, height, pixel_format = struct.unpack_from("<III", self._buffer, 0)
+            if pixel_format not in RAW_PIXEL_FORMATS:
+                raise ValueError(f"Unsupported screencap pixel format: {pixel_format}")
+            mode, raw_mode, bpp = RAW_PIXEL_FORMATS[pixel_format]
+            end = self.header_size + width * height * bpp
+            if len(self._buffer) < end:
+                break
+            data = bytes(self._buffer[self.header_size:end])
+            del self._buffer[:end]
+            frames.append(Frame(width, height, mode, data, raw_mode=raw_mode))
+        return frames
+
+    def flush(self) -> List[Frame]:
+        """Raw frames are complete as soon as their bytes are read."""
+        return []
+
+
+# NAL unit types that open a new access unit once the current one has a coded
+# slice: SEI, SPS, PPS, access unit delimiter and reserved types 14-18
+# (H.264 7.4.1.2.3)
+AU_START_NAL_TYPES = frozenset((6, 7, 8, 9, 14, 15, 16, 17, 18))
+# Coded slice NAL unit types (non-IDR, IDR)
+VCL_NAL_TYPES = frozenset((1, 5))
+
+
+class H264Decoder:
+    """
+    Decoder for an Annex B H.264 elementary stream, using PyAV.
+
+    The stream is split into access units here instead of with the libav
+    parser, which only closes a frame when the next frame's start code
+    arrives. An access unit is decoded as soon as the start of the next one
+    is in the data read, and flush() decodes the last one when the producer
+    has been quiet for a while (see FrameServer.flush_delay), so the newest
+    frame does not wait for the next screen change. An access unit that
+    fails to decode is dropped.
+
+    PyAV is an optional dependency (pip install av); it is only imported when
+    an H264Decoder is created.
+    """
+
+    def __init__(self):
+        try:
+            import av
+        except ImportError:
+            raise ImportError(
+                "H.264 frame streaming requires PyAV. Install: pip install av"
+            )
+        self._av = av
+        self._codec = av.CodecContext.create("h264", "r")
+        self._buffer = bytearray()
+        self._scan = 0  # buffer offset to search the next start code from
+        self._has_slice = False  # the buffered access unit has a coded slice
+
+    def feed(self, chunk: bytes) -> List[Frame]:
+        """Consume a chunk of stream data and return the frames it completed."""
+        self._buffer.extend(chunk)
+        frames = []
+        for unit in self._split_access_units():
+            frames.extend(self._decode(unit))
+        return frames
+
+    def flush(self) -> List[Frame]:
+        """Decode the buffered access unit, treating the data read so far as complete."""
+        frames = []
+        for unit in self._split_access_units():
+            frames.extend(self._decode(unit))
+        if not self._has_slice:
+            return frames
+        unit = bytes(self._buffer)
+        self._buffer.clear()
+        self._scan = 0
+        self._has_slice = False
+        frames.extend(self._decode(unit))
+        return frames
+
+    def _split_access_units(self) -> List[bytes]:
+        """Cut the complete access units off the front of the buffer."""
+        buffer = self._buffer
+        units = []
+        start = 0
+        pos = self._scan
+        while True:
+            nal = buffer.find(b"\x00\x00\x01", pos)
+            if nal < 0:
+                # Keep the last bytes, they may begin a start code
+                pos = max(pos, len(buffer) - 2)
+                break
+            if nal + 5 > len(buffer):
+                # NAL header or first slice header byte not read yet
+                pos = nal
+                break
+            nal_type = buffer[nal + 3] & 0x1F
+            is_slice = nal_type in VCL_NAL_TYPES
+            # first_mb_in_slice == 0 (ue(v) "1" bit) marks the first slice of a picture
+            if self._has_slice and (
+                nal_type in AU_START_NAL_TYPES or (is_slice and buffer[nal + 4] & 0x80)
+            ):
+                units.append(bytes(buffer[start:nal]))
+                start = nal
+                self._has_slice = False
+            self._has_slice = self._has_slice or is_slice
+            pos = nal + 3
+        if start:
+            del buffer[:start]
+            pos -= start
+        self._scan = pos
+        return units
+
+    def _decode(self, unit: bytes) -> List[Frame]:
+        try:
+            av_frames = self._codec.decode(self._av.Packet(unit))
+        except self._av.error.FFmpegError as e:
+            # A broken frame must not end the stream, the next one may decode
+            logger.debug(f"Dropped an H.264 frame that failed to decode: {e}")
+            return []
+        frames = []
+        for av_frame in av_frames:
+            rgb = av_frame.to_ndarray(format="rgb24")
+            height, width = rgb.shape[:2]
+            frames.append(Frame(width, height, "RGB", rgb.tobytes()))
+        return frames
+
+
+def screenrecord_command(
+    device_id: str | None = None, bit_rate: int = 8_000_000, size: str | None = None
+) -> List[str]:
+    """Command streaming the screen as raw H.264 over adb exec-out."""
+    cmd = ["adb", "-s", device_id] if device_id else ["adb"]
+    cmd += ["exec-out", "screenrecord", "--output-format=h264", f"--bit-rate={bit_rate}"]
+    if size:
+        cmd.append(f"--size={size}")
+    cmd.append("-")
+    return cmd
+
+
+def screencap_loop_command(device_id: str | None = None) -> List[str]:
+    """Command streaming back-to-back raw screencap frames, for devices without H.264."""
+    cmd = ["adb", "-s", device_id] if device_id else ["adb"]
+    return cmd + ["exec-out", "sh", "-c", "while true; do screencap; done"]
+
+
+class FrameServer:
+    """
+    Keeps a frame producer running and buffers its latest decoded frames.
+
+    The producer is restarted whenever it exits (screenrecord stops after its
+    3 minute time limit) until stop() is called.
+
+    Args:
+        command: Producer command line, its stdout is the frame stream.
+        decoder_factory: Creates the decoder for the stream (H264Decoder, RawFrameDecoder).
+        buffer_size: Number of recent frames kept in the ring buffer.
+        restart_delay: Seconds to wait before restarting an exited producer.
+        read_size: Maximum bytes read from the producer per call.
+        flush_delay: Seconds without new stream data after which the decoder's
+            buffered frame is taken as complete. A frame is normally closed by
+            the start of the next one; this only matters for the last frame
+            before the screen goes static, and must be well above the gaps
+            between the chunks of one large frame over adb.
+    """
+
+    def __init__(
+        self,
+        command: List[str],
+        decoder_factory: Callable[[], object] = H264Decoder,
+        buffer_size: int = 3,
+        restart_delay: float = 0.5,
+        read_size: int = 1 << 16,
+        flush_delay: float = 0.25,
+    ):
+        self.command = command
+        self.decoder_factory = decoder_factory
+        self.restart_delay = restart_delay
+        self.read_size = read_size
+        self.flush_delay = flush_delay
+
+        self._frames: Deque[Frame] = deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._process: subprocess.Popen | None = None
+        self._frame_count = 0
+        self.restarts = 0
+        self.last_error: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "FrameServer":
+        """Start the worker thread (no-op if already running)."""
+        if not self.is_running:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="frame-server", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the producer and the worker thread."""
+        self._stop_event.set()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._condition:
+            self._condition.notify_all()
+
+    def latest(self) -> Frame | None:
+        """Return the most recent frame without waiting."""
+        with self._condition:
+            return self._frames[-1] if self._frames else None
+
+    def frames(self) -> List[Frame]:
+        """Return a snapshot of the ring buffer, oldest first."""
+        with self._condition:
+            return list(self._frames)
+
+    def wait_for_frame(
+        self, newer_than: int = 0, timeout: float | None = None
+    ) -> Frame | None:
+        """
+        Block until a frame with index > newer_than is available.
+
+        Args:
+            newer_than: Frame index to wait past, 0 accepts any frame.
+            timeout: Seconds to wait, None waits until stop().
+
+        Returns:
+            The latest frame, or None on timeout/stop.
+        """
+        def ready() -> bool:
+            return self._stop_event.is_set() or (
+                bool(self._frames) and self._frames[-1].index > newer_than
+            )
+
+        with self._condition:
+            self._condition.wait_for(ready, timeout)
+            if self._frames and self._frames[-1].index > newer_than:
+                return self._frames[-1]
+            return None
+
+    async def get_frame(self, max_wait: float = 2.0) -> Frame | None:
+        """Return the latest frame, waiting up to max_wait for the first one."""
+        frame = self.latest()
+        if frame is not None:
+            return frame
+        return await asyncio.to_thread(self.wait_for_frame, 0, max_wait)
+
+    def _run(self) -> None:
+        """Worker loop: run the producer, decode its stream, restart on exit."""
+        while not self._stop_event.is_set():
+            try:
+                decoder = self.decoder_factory()
+                self._process = subprocess.Popen(
+                    self.command,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+                self._pump(self._process, decoder)
+            except Exception as e:
+                self.last_error = str(e)
+            finally:
+                self._terminate_process()
+
+            if self._stop_event.wait(self.restart_delay):
+                break
+            self.restarts += 1
+
+    def _pump(self, process: subprocess.Popen, decoder) -> None:
+        """Read the producer's stdout until EOF and publish decoded frames."""
+        # Read in a helper thread so a quiet producer can be noticed with a
+        # timeout (select() does not work on pipes on Windows)
+        chunks: "queue.Queue[bytes | None]" = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_stream, args=(process.stdout, chunks),
+            name="frame-server-reader", daemon=True,
+        )
+        reader.start()
+        while not self._stop_event.is_set():
+            try:
+                chunk = chunks.get(timeout=self.flush_delay)
+            except queue.Empty:
+                # Nothing more is coming for now: the buffered frame is complete
+                self._publish(decoder.flush())
+                continue
+            if chunk is None:
+                self._publish(decoder.flush())
+                break
+            self._publish(decoder.feed(chunk))
+
+    def _read_stream(self, stream, chunks: "queue.Queue[bytes | None]") -> None:
+        """Reader thread: queue the producer's output, None at EOF."""
+        try:
+            while True:
+                chunk = stream.read1(self.read_size)
+                if not chunk:
+                    break
+                chunks.put(chunk)
+        except (OSError, ValueError):
+            pass  # stream closed by _terminate_process
+        finally:
+            chunks.put(None)
+
+    def _publish(self, frames: List[Frame]) -> None:
+        if not frames:
+            return
+        now = time.time()
+        with self._condition:
+            for frame in frames:
+                self._frame_count += 1
+                frame.index = self._frame_count
+                frame.timestamp = now
+                self._frames.append(frame)
+            self._condition.notify_all()
+
+    def _terminate_process(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if process.stdout is not None:
+            process.stdout.close()
+
+
+# One frame server per device
+_frame_servers: Dict[str | None, FrameServer] = {}
+_frame_servers_lock = threading.Lock()
+
+
+def get_frame_server(device_id: str | None = None, codec: str = "h264") -> FrameServer:
+    """
+    Get the running frame server for a device, starting it on first use.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        codec: "h264" for screenrecord, "raw" for a screencap loop.
+
+    Returns:
+        The device's FrameServer.
+    """
+    with _frame_servers_lock:
+        server = _frame_servers.get(device_id)
+        if server is None or not server.is_running:
+            if codec == "h264":
+                H264Decoder()  # fail fast with ImportError when PyAV is missing
+                server = FrameServer(screenrecord_command(device_id), H264Decoder)
+            elif codec == "raw":
+                server = FrameServer(screencap_loop_command(device_id), RawFrameDecoder)
+            else:
+                raise ValueError(f"Unknown frame stream codec: {codec}")
+            _frame_servers[device_id] = server.start()
+        return server
+
+
+def find_frame_server(device_id: str | None = None) -> FrameServer | None:
+    """Return the device's frame server if one is running, without starting it."""
+    with _frame_servers_lock:
+        server = _frame_servers.get(device_id)
+    if server is not None and server.is_running:
+        return server
+    return None
+
+
+def stop_frame_servers() -> None:
+    """Stop all frame servers (call on shutdown)."""
+    with _frame_servers_lock:
+        servers = list(_frame_servers.values())
+        _frame_servers.clear()
+    for server in servers:
+        server.stop()
+
+
+atexit.register(stop_frame_servers)
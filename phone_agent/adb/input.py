@@ -1,10 +1,40 @@
 """Input utilities for Android device text input."""
 
-import asyncio
 import base64
-import subprocess
 from typing import Optional
 
+from phone_agent.adb.keyboard import get_keyboard_session
+from phone_agent.adb.settle import settle
+from phone_agent.adb.transport import adb_shell
+from phone_agent.config.timing import TIMING_CONFIG
+
+
+async def input_text(
+    text: str,
+    device_id: str | None = None,
+    clear: bool = True,
+    enter: bool = False,
+    delay: float | None = None,
+) -> None:
+    """
+    Replace the text of the focused input field, using the session keyboard.
+
+    The input IME stays active for the rest of the session, see
+    phone_agent.adb.keyboard.
+
+    Args:
+        text: The text to type.
+        device_id: Optional ADB device ID for multi-device setups.
+        clear: Clear the field first.
+        enter: Press enter after typing.
+        delay: Maximum seconds to wait for the UI to settle after typing. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.action.text_input_delay
+
+    await get_keyboard_session(device_id).input_text(text, clear=clear, enter=enter)
+    await settle("type", device_id, delay)
+
 
 async def type_text(text: str, device_id: str | None = None) -> None:
     """
@@ -18,23 +48,12 @@ async def type_text(text: str, device_id: str | None = None) -> None:
         Requires ADB Keyboard to be installed on the device.
         See: https://github.com/nicnocquee/AdbKeyboard
     """
-    adb_prefix = await _get_adb_prefix(device_id)
     encoded_text = base64.b64encode(text.encode("utf-8")).decode("utf-8")
 
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix,
-        "shell",
-        "am",
-        "broadcast",
-        "-a",
-        "ADB_INPUT_B64",
-        "--es",
-        "msg",
-        encoded_text,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+    await adb_shell(
+        ["am", "broadcast", "-a", "ADB_INPUT_B64", "--es", "msg", encoded_text],
+        device_id,
     )
-    await process.wait()
 
 
 async def clear_text(device_id: str | None = None) -> None:
@@ -44,19 +63,7 @@ async def clear_text(device_id: str | None = None) -> None:
     Args:
         device_id: Optional ADB device ID for multi-device setups.
     """
-    adb_prefix = await _get_adb_prefix(device_id)
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix,
-        "shell",
-        "am",
-        "broadcast",
-        "-a",
-        "ADB_CLEAR_TEXT",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    await process.wait()
+    await adb_shell(["am", "broadcast", "-a", "ADB_CLEAR_TEXT"], device_id)
 
 
 async def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
@@ -69,34 +76,14 @@ async def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
     Returns:
         The original keyboard IME identifier for later restoration.
     """
-    adb_prefix = await _get_adb_prefix(device_id)
-
     # Get current IME
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix,
-        "shell",
-        "settings",
-        "get",
-        "secure",
-        "default_input_method",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await process.communicate()
-    current_ime = (stdout.decode() + stderr.decode()).strip()
+    current_ime = (
+        await adb_shell(["settings", "get", "secure", "default_input_method"], device_id)
+    ).strip()
 
     # Switch to ADB Keyboard if not already set
     if "com.android.adbkeyboard/.AdbIME" not in current_ime:
-        process = await asyncio.create_subprocess_exec(
-            *adb_prefix,
-            "shell",
-            "ime",
-            "set",
-            "com.android.adbkeyboard/.AdbIME",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        await process.wait()
+        await adb_shell(["ime", "set", "com.android.adbkeyboard/.AdbIME"], device_id)
 
     # Warm up the keyboard
     await type_text("", device_id)
@@ -112,22 +99,4 @@ async def restore_keyboard(ime: str, device_id: str | None = None) -> None:
         ime: The IME identifier to restore.
         device_id: Optional ADB device ID for multi-device setups.
     """
-    adb_prefix = await _get_adb_prefix(device_id)
-
-    process = await asyncio.create_subprocess_exec(
-        *adb_prefix,
-        "shell",
-        "ime",
-        "set",
-        ime,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    await process.wait()
-
-
-async def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
+    await adb_shell(["ime", "set", ime], device_id)
@@ -0,0 +1,147 @@
+"""Session-scoped text input for Android devices.
+
+Typing used to switch to the ADB keyboard, clear, type and switch back to the
+user's IME on every Type action. A KeyboardSession switches once, on the first
+text input, and restores the original IME when the agent shuts down
+(restore_keyboards).
+
+When the DroidRun Portal is reachable its keyboard is used, and clearing and
+typing are one /keyboard/input request. Otherwise the ADB keyboard is used, and
+clear, type and enter run as one shell script.
+
+Set PHONE_AGENT_PORTAL_KEYBOARD=0 to always use the ADB keyboard.
+"""
+
+import asyncio
+import base64
+import logging
+import os
+from typing import Dict, List
+
+from phone_agent.adb.transport import adb_shell
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.portal_cli.portal_client import PortalClient, get_portal_client
+
+logger = logging.getLogger("keyboard")
+
+ADB_KEYBOARD_IME = "com.android.adbkeyboard/.AdbIME"
+PORTAL_KEYBOARD_IME = "com.droidrun.portal/.input.DroidrunKeyboardIME"
+
+USE_PORTAL_KEYBOARD = os.getenv("PHONE_AGENT_PORTAL_KEYBOARD", "1") != "0"
+
+
+class KeyboardSession:
+    """
+    Keeps a text input IME active on one device until restore() is called.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+    """
+
+    def __init__(self, device_id: str | None = None):
+        self.device_id = device_id
+        self.original_ime: str | None = None  # IME to restore, None before start()
+        self.ime: str | None = None  # IME active for this session
+        self._portal: PortalClient | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.ime is not None
+
+    @property
+    def uses_portal(self) -> bool:
+        """Whether text goes through the Portal keyboard (valid after start())."""
+        return self._portal is not None
+
+    async def start(self) -> str:
+        """Switch to the input IME if not done yet and return it."""
+        async with self._lock:
+            if self.ime is None:
+                current = (
+                    await adb_shell(["settings", "get", "secure", "default_input_method"], self.device_id)
+                ).strip()
+                self._portal = await self._find_portal()
+                ime = PORTAL_KEYBOARD_IME if self._portal is not None else ADB_KEYBOARD_IME
+                await self._switch(ime, current)
+                self.original_ime = current
+            return self.ime
+
+    async def input_text(self, text: str, clear: bool = True, enter: bool = False) -> None:
+        """
+        Type text into the focused input field.
+
+        Args:
+            text: The text to type.
+            clear: Clear the field first.
+            enter: Press enter after typing.
+        """
+        await self.start()
+
+        if self._portal is not None:
+            if await self._portal.input_text(text, clear=clear):
+                if enter:
+                    await adb_shell(["input", "keyevent", "KEYCODE_ENTER"], self.device_id)
+                return
+            logger.warning("Portal keyboard input failed, switching to ADB keyboard")
+            async with self._lock:
+                self._portal = None
+                await self._switch(ADB_KEYBOARD_IME, self.ime or "")
+
+        encoded = base64.b64encode(text.encode("utf-8")).decode("utf-8")
+        script: List[str] = []
+        if clear:
+            script.append("am broadcast -a ADB_CLEAR_TEXT")
+        script.append(f"am broadcast -a ADB_INPUT_B64 --es msg {encoded}")
+        if enter:
+            script.append("input keyevent KEYCODE_ENTER")
+        await adb_shell("; ".join(script), self.device_id)
+
+    async def restore(self) -> None:
+        """Switch back to the IME that was active before start()."""
+        async with self._lock:
+            original, ime = self.original_ime, self.ime
+            self.original_ime = self.ime = self._portal = None
+            if ime is None or not original or original == "null" or original == ime:
+                return
+            await adb_shell(["ime", "set", original], self.device_id)
+            logger.debug(f"Restored IME {original}")
+
+    async def _find_portal(self) -> PortalClient | None:
+        if not USE_PORTAL_KEYBOARD:
+            return None
+        try:
+            client = await get_portal_client(self.device_id)
+            if (await client.ping()).get("status") == "success":
+                return client
+        except Exception as e:
+            logger.debug(f"Portal keyboard unavailable: {e}")
+        return None
+
+    async def _switch(self, ime: str, current: str) -> None:
+        if ime not in current:
+            await adb_shell(f"ime enable {ime}; ime set {ime}", self.device_id)
+            # Once per session instead of once per Type action
+            await asyncio.sleep(TIMING_CONFIG.action.keyboard_switch_delay)
+        self.ime = ime
+
+
+# One session per device
+_sessions: Dict[str | None, KeyboardSession] = {}
+
+
+def get_keyboard_session(device_id: str | None = None) -> KeyboardSession:
+    """Get the keyboard session for a device."""
+    session = _sessions.get(device_id)
+    if session is None:
+        session = _sessions[device_id] = KeyboardSession(device_id)
+    return session
+
+
+async def restore_keyboards() -> None:
+    """Restore the original IME on every device that typed text (call on shutdown)."""
+    for session in list(_sessions.values()):
+        try:
+            await session.restore()
+        except Exception as e:
+            logger.warning(f"Failed to restore IME on {session.device_id or 'default device'}: {e}")
@@ -0,0 +1,78 @@
+"""Concurrent observation capture for Android devices."""
+
+import asyncio
+import time
+from typing import Dict
+
+from phone_agent.adb.device import current_app_from_state, get_current_app
+from phone_agent.adb.screenshot import (
+    CaptureMode,
+    build_screenshot,
+    capture_screen,
+    load_ui_elements,
+    portal_ui_loader,
+)
+from phone_agent.observation import Observation, timed
+from utils.ui_filter import fetch_state_portal
+
+
+async def get_observation(
+    device_id: str | None = None,
+    timeout: int = 10,
+    is_portal: bool = True,
+    mode: CaptureMode | None = None,
+) -> Observation:
+    """
+    Capture screenshot, UI tree and foreground app concurrently.
+
+    The parts are independent device round-trips, so they are issued
+    together with asyncio.gather instead of one after the other. With the
+    portal, the foreground app is read from the fetched phone_state and the
+    window manager is only queried when the portal state is unavailable.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds for the screen capture.
+        is_portal: Use DroidRun Portal for UI elements instead of uiautomator2.
+        mode: How pixels are transferred, defaults to DEFAULT_CAPTURE_MODE.
+
+    Returns:
+        Observation with per-part timings ("screenshot", "ui_tree",
+        "current_app" and "total").
+
+    Raises:
+        Exception: If the foreground app cannot be determined. Screenshot and
+            UI tree failures produce a fallback screenshot, as in get_screenshot.
+    """
+    timings: Dict[str, float] = {}
+    timestamp = time.time()
+    start = time.perf_counter()
+
+    capture = timed("screenshot", timings, capture_screen(device_id, timeout=timeout, mode=mode))
+    if is_portal:
+        capture_result, state_result = await asyncio.gather(
+            capture,
+            timed("ui_tree", timings, fetch_state_portal(device_id)),
+            return_exceptions=True,
+        )
+        app_result = None
+        if isinstance(state_result, BaseException):
+            ui_result = state_result
+        else:
+            ui_result = portal_ui_loader(state_result)
+            app_result = current_app_from_state(state_result)
+        if app_result is None:
+            app_result = await timed("current_app", timings, get_current_app(device_id))
+    else:
+        capture_result, ui_result, app_result = await asyncio.gather(
+            capture,
+            timed("ui_tree", timings, load_ui_elements(device_id, is_portal=False)),
+            timed("current_app", timings, get_current_app(device_id)),
+            return_exceptions=True,
+        )
+        if isinstance(app_result, BaseException):
+            raise app_result
+
+    screenshot = build_screenshot(capture_result, ui_result)
+    timings["total"] = time.perf_counter() - start
+    return Observation(screenshot, app_result, timings, timestamp)
@@ -4,41 +4,208 @@ import asyncio
 import base64
 import os
 import shutil
+import struct
 import subprocess
 import tempfile
 import uuid
 from PIL import Image
+from enum import Enum
+from functools import lru_cache
 from io import BytesIO
-from typing import List
-from dataclasses import dataclass
-from utils.ui_xml import get_emulator_ui_xml
-from utils.ui_filter import AndroidElement, ui_filter, ui_portal, AndroidPortalElement
+from typing import Callable, List, Tuple
+from phone_agent.adb.frame_stream import RAW_PIXEL_FORMATS, get_frame_server
+from phone_agent.adb.transport import adb_exec_out, adb_shell
+from phone_agent.fingerprint import fingerprint_png
+from phone_agent.portal_cli.portal_client import get_portal_client
+from utils.ui_xml import dump_emulator_ui_xml
+from utils.ui_filter import (
+    AndroidElement,
+    AndroidPortalElement,
+    fetch_state_portal,
+    portal_elements_from_state,
+    ui_filter_xml,
+)
+from utils.element_table import ElementTable
 # from utils.draw_bbox import draw_bbox_multi
 from utils.crop_ui_elements import crop_ui_elements
 
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class CaptureMode(Enum):
+    """How screen pixels are transferred from the device."""
+
+    EXEC_OUT = "adb-exec-out"  # `exec-out screencap -p`, PNG streamed over stdout
+    EXEC_OUT_RAW = "adb-exec-out-raw"  # `exec-out screencap`, raw pixels over stdout
+    SCREENCAP = "adb-screencap"  # legacy: write on device, then `adb pull`
+    FRAME_STREAM = "frame-stream"  # latest frame of a persistent screenrecord stream
+    PORTAL_TCP = "portal-tcp"  # Portal /screenshot over the forwarded keep-alive port
+
+
+DEFAULT_CAPTURE_MODE = CaptureMode(
+    os.getenv("PHONE_AGENT_CAPTURE_MODE", CaptureMode.EXEC_OUT.value)
+)
+
+# Perceptual fingerprint computed on capture: "dhash", "phash" or "none"
+FINGERPRINT_METHOD = os.getenv("PHONE_AGENT_FINGERPRINT", "dhash")
+
+
+# Portal elements come as an ElementTable (rows expose the AndroidPortalElement attributes)
+Elements = List[AndroidElement] | ElementTable | List[AndroidPortalElement]
+# Zero-argument callable producing (formatted_text, elements) on first use
+UILoader = Callable[[], Tuple[str | None, Elements]]
+
 
-@dataclass
 class Screenshot:
-    """Represents a captured screenshot."""
+    """
+    Represents a captured screenshot.
+
+    Expensive representations are materialized on first access and cached:
+    base64_data (from the PNG bytes), image (decoded PIL image), array (numpy
+    view of the pixels) and elements/formatted_text (filtered and formatted
+    from the raw UI state by ui_loader). A caller that only needs element
+    bounds never pays for base64 or pixel decoding, and vice versa.
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "crop_base64_data",
+        "is_sensitive",
+        "path",
+        "fingerprint",
+        "_png_data",
+        "_base64_data",
+        "_image",
+        "_array",
+        "_elements",
+        "_formatted_text",
+        "_ui_loader",
+    )
+
+    def __init__(
+        self,
+        elements: Elements | None = None,
+        base64_data: str | None = None,
+        crop_base64_data: List[str] | None = None,
+        width: int = 0,
+        height: int = 0,
+        formatted_text: str | None = None,
+        is_sensitive: bool = False,
+        path: str | None = None,
+        fingerprint: int | None = None,
+        png_data: bytes | None = None,
+        ui_loader: UILoader | None = None,
+    ):
+        if base64_data is None and png_data is None:
+            raise ValueError("Screenshot needs base64_data or png_data")
+        self.width = width
+        self.height = height
+        self.crop_base64_data = crop_base64_data if crop_base64_data is not None else []
+        self.is_sensitive = is_sensitive
+        self.path = path
+        self.fingerprint = fingerprint  # perceptual hash, see phone_agent.fingerprint
+        self._png_data = png_data
+        self._base64_data = base64_data
+        self._image = None
+        self._array = None
+        self._elements = elements
+        self._formatted_text = formatted_text
+        self._ui_loader = ui_loader if elements is None else None
+
+    def __repr__(self) -> str:
+        return (
+            f"<Screenshot {self.width}x{self.height}"
+            f"{' sensitive' if self.is_sensitive else ''}"
+            f"{' path=' + self.path if self.path else ''}>"
+        )
+
+    @property
+    def png_data(self) -> bytes:
+        """Encoded image bytes as captured from the device."""
+        if self._png_data is None:
+            self._png_data = base64.b64decode(self._base64_data)
+        return self._png_data
+
+    @property
+    def base64_data(self) -> str:
+        """Base64 of the captured image bytes, encoded on first access."""
+        if self._base64_data is None:
+            self._base64_data = base64.b64encode(self._png_data).decode("utf-8")
+        return self._base64_data
 
-    elements: List[AndroidElement] | List[AndroidPortalElement]
-    base64_data: str
-    crop_base64_data: List[str]
-    width: int
-    height: int
-    formatted_text: str | None = None
-    is_sensitive: bool = False
-    path: str | None = None
+    @property
+    def image(self) -> Image.Image:
+        """Decoded PIL image, decoded on first access."""
+        if self._image is None:
+            img = Image.open(BytesIO(self.png_data))
+            img.load()
+            self._image = img
+        return self._image
 
+    @property
+    def array(self):
+        """Pixels as a numpy array (H, W, C), requires numpy."""
+        if self._array is None:
+            import numpy as np
 
-async def get_screenshot(prefix: str | None = None, save_dir: str | None = None, device_id: str | None = None, timeout: int = 10, is_portal: bool = True) -> Screenshot:
+            self._array = np.asarray(self.image)
+        return self._array
+
+    @property
+    def elements(self) -> Elements:
+        """Actionable UI elements, built from the raw UI state on first access."""
+        if self._ui_loader is not None:
+            self._load_ui()
+        return self._elements
+
+    @property
+    def formatted_text(self) -> str | None:
+        """Portal formatted UI description, built together with elements."""
+        if self._ui_loader is not None:
+            self._load_ui()
+        return self._formatted_text
+
+    def to_image(self) -> Image.Image:
+        """Decode the screenshot pixels. Only call this when pixels are needed."""
+        return self.image
+
+    def _load_ui(self) -> None:
+        loader, self._ui_loader = self._ui_loader, None
+        try:
+            self._formatted_text, self._elements = loader()
+        except Exception as e:
+            print(f"UI elements error: {e}")
+            self._formatted_text, self._elements = None, []
+
+
+class ScreencapError(Exception):
+    """Raised when the device refuses or fails to capture the screen."""
+
+    def __init__(self, message: str, is_sensitive: bool = False):
+        super().__init__(message)
+        self.is_sensitive = is_sensitive
+
+
+async def get_screenshot(
+    prefix: str | None = None,
+    save_dir: str | None = None,
+    device_id: str | None = None,
+    timeout: int = 10,
+    is_portal: bool = True,
+    mode: CaptureMode | None = None,
+) -> Screenshot:
     """
     Capture a screenshot from the connected Android device.
 
     Args:
+        prefix: File prefix used when the screenshot is saved to save_dir.
+        save_dir: Directory to save the screenshot (and UI XML) to.
         device_id: Optional ADB device ID for multi-device setups.
         timeout: Timeout in seconds for screenshot operations.
+        is_portal: Use DroidRun Portal for UI elements instead of uiautomator2.
+        mode: How pixels are transferred, defaults to DEFAULT_CAPTURE_MODE.
 
     Returns:
         Screenshot object containing base64 data and dimensions.
@@ -47,143 +214,319 @@ async def get_screenshot(prefix: str | None = None, save_dir: str | None = None,
         If the screenshot fails (e.g., on sensitive screens like payment pages),
         a black fallback image is returned with is_sensitive=True.
     """
-    if not prefix and not save_dir:
-        temp_id = str(uuid.uuid4())
-        temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{temp_id}.png")
-        # temp_bbox_path = os.path.join(os.path.dirname(temp_path), f"screenshot_bbox_{temp_id}.png")
-        # temp_crop_dir = os.path.join(tempfile.gettempdir(), f"screenshot_crops_{temp_id}")
-    elif not prefix or not save_dir:
+    if bool(prefix) != bool(save_dir):
         raise ValueError("Both prefix and save_dir must be provided together.")
-    else:
+
+    # Pixels and UI tree are independent device round-trips
+    capture_result, ui_result = await asyncio.gather(
+        capture_screen(device_id, timeout=timeout, mode=mode),
+        load_ui_elements(device_id, is_portal=is_portal, save_dir=save_dir),
+        return_exceptions=True,
+    )
+    return build_screenshot(capture_result, ui_result, prefix=prefix, save_dir=save_dir)
+
+
+async def load_ui_elements(
+    device_id: str | None = None, is_portal: bool = True, save_dir: str | None = None
+) -> UILoader:
+    """
+    Fetch the UI state of the current screen.
+
+    The device round-trip happens here. For the portal, filtering and
+    formatting the tree is deferred to the returned loader, so it only runs
+    when a consumer reads Screenshot.elements or formatted_text.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        is_portal: Use DroidRun Portal instead of a uiautomator2 XML dump.
+        save_dir: Keep the uiautomator2 XML in this directory.
+
+    Returns:
+        Loader returning (formatted_text, elements). formatted_text is None without portal.
+    """
+    if is_portal:
+        return portal_ui_loader(await fetch_state_portal(device_id))
+
+    elements = await asyncio.to_thread(_load_u2_elements, device_id, save_dir)
+    return lambda: (None, elements)
+
+
+def portal_ui_loader(combined_data: dict) -> UILoader:
+    """Loader building (formatted_text, elements) from a fetched portal state."""
+    return lambda: portal_elements_from_state(combined_data)
+
+
+def _load_u2_elements(device_id: str | None, save_dir: str | None) -> List[AndroidElement]:
+    """Dump the uiautomator2 hierarchy and filter it in memory (blocking)."""
+    ui_xml = dump_emulator_ui_xml(device_id)
+    if save_dir:
+        # Runs concurrently with the capture, before build_screenshot creates save_dir
         os.makedirs(save_dir, exist_ok=True)
-        temp_path = os.path.join(save_dir, f"{prefix}_screenshot.png")
-        # temp_bbox_path = os.path.join(os.path.dirname(temp_path), f"{prefix}_screenshot_bbox.png")
-        # temp_crop_dir = os.path.join(save_dir, f"{prefix}_crops")
-    
-    adb_prefix = await _get_adb_prefix(device_id)
+        with open(os.path.join(save_dir, "tmp_ui.xml"), "w", encoding="utf-8") as f:
+            f.write(ui_xml)
+    elements = ui_filter_xml(ui_xml)
+
+    # draw_bbox_multi(img_path=save_path, output_path=temp_bbox_path, elem_list=elements)
+    # crop_list = crop_ui_elements(
+    #     img_path=save_path,
+    #     output_dir=temp_crop_dir,
+    #     elem_list=elements
+    # )
+    return elements
+
+
+def build_screenshot(
+    capture_result: Tuple[bytes, int | None] | BaseException,
+    ui_result: UILoader | BaseException,
+    prefix: str | None = None,
+    save_dir: str | None = None,
+) -> Screenshot:
+    """
+    Assemble a Screenshot from the results of capture_screen and load_ui_elements.
+
+    Either result may be the exception raised by its task (asyncio.gather with
+    return_exceptions=True), in which case a fallback screenshot is returned.
+    """
+    if isinstance(capture_result, ScreencapError):
+        return _create_fallback_screenshot(is_sensitive=capture_result.is_sensitive)
 
     try:
-        # Execute screenshot command
-        process = await asyncio.create_subprocess_exec(
-            *adb_prefix, "shell", "screencap", "-p", "/sdcard/tmp.png",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+        for result in (capture_result, ui_result):
+            if isinstance(result, BaseException):
+                raise result
+        png_data, fingerprint = capture_result
+
+        save_path = None
+        if prefix and save_dir:
+            # Only touch the disk when the caller asked for a saved copy
+            os.makedirs(save_dir, exist_ok=True)
+            save_path = os.path.join(save_dir, f"{prefix}_screenshot.png")
+            with open(save_path, "wb") as f:
+                f.write(png_data)
+
+        # The device already produced a PNG: take the size from its header
+        # and pass the bytes through unchanged instead of decoding/re-encoding
+        width, height = read_png_size(png_data)
+
+        crop_base64_data = []
+        # for crop in crop_list:
+            # print(f"crop: {crop}")
+            # crop_img = Image.open(crop)
+            # buffered_crop = BytesIO()
+            # crop_img.save(buffered_crop, format="PNG")
+            # crop_base64 = base64.b64encode(buffered_crop.getvalue()).decode("utf-8")
+            # crop_base64_data.append(crop_base64)
+
+        return Screenshot(
+            png_data=png_data,
+            crop_base64_data=crop_base64_data,
+            width=width,
+            height=height,
+            ui_loader=ui_result,
+            is_sensitive=False,
+            path=save_path,
+            fingerprint=fingerprint,
         )
-        
+
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return _create_fallback_screenshot(is_sensitive=False)
+
+
+async def capture_screen(
+    device_id: str | None = None, timeout: float = 10, mode: CaptureMode | None = None
+) -> Tuple[bytes, int | None]:
+    """
+    Capture the screen as PNG bytes together with its perceptual fingerprint.
+
+    The fingerprint is computed in a worker thread (FINGERPRINT_METHOD), None
+    if disabled or if the image could not be decoded.
+
+    Returns:
+        Tuple of (png_bytes, fingerprint).
+    """
+    png_data = await capture_png(device_id, timeout=timeout, mode=mode)
+    if FINGERPRINT_METHOD == "none":
+        return png_data, None
+    try:
+        fingerprint = await asyncio.to_thread(fingerprint_png, png_data, FINGERPRINT_METHOD)
+    except Exception as e:
+        print(f"Screenshot fingerprint failed: {e}")
+        fingerprint = None
+    return png_data, fingerprint
+
+
+async def capture_png(
+    device_id: str | None = None, timeout: float = 10, mode: CaptureMode | None = None
+) -> bytes:
+    """
+    Capture the screen and return it as PNG bytes, without touching local disk.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds for the capture.
+        mode: Transfer mode, defaults to DEFAULT_CAPTURE_MODE.
+
+    Returns:
+        PNG encoded screen image.
+
+    Raises:
+        ScreencapError: If the capture failed or the screen is protected.
+    """
+    mode = mode or DEFAULT_CAPTURE_MODE
+
+    if mode == CaptureMode.FRAME_STREAM:
         try:
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            frame = await get_frame_server(device_id).get_frame(max_wait=min(timeout, 2.0))
+        except ImportError as e:
+            print(f"Frame stream unavailable, using exec-out: {e}")
+            frame = None
+        if frame is not None:
+            return frame.to_png()
+        # No frame yet (stream starting, or protected screen): capture directly
+        mode = CaptureMode.EXEC_OUT
+
+    if mode == CaptureMode.PORTAL_TCP:
+        # Shares the keep-alive connection the UI state is fetched over, so
+        # with is_portal both halves of an observation cost one round-trip
+        client = await get_portal_client(device_id)
+        if client.tcp_available:
+            try:
+                data = await asyncio.wait_for(client.take_screenshot(), timeout)
+            except asyncio.TimeoutError:
+                data = b""
+            if data.startswith(PNG_SIGNATURE):
+                return data
+        mode = CaptureMode.EXEC_OUT
+
+    if mode == CaptureMode.EXEC_OUT:
+        data = await _exec_capture(["screencap", "-p"], device_id, timeout)
+        if not data.startswith(PNG_SIGNATURE):
+            raise _screencap_error(data)
+        return data
+
+    if mode == CaptureMode.EXEC_OUT_RAW:
+        data = await _exec_capture(["screencap"], device_id, timeout)
+        try:
+            width, height, pixel_format, pixels = parse_raw_screencap(data)
+        except ValueError:
+            raise _screencap_error(data)
+        img_mode, raw_mode, _ = RAW_PIXEL_FORMATS[pixel_format]
+        img = Image.frombuffer(img_mode, (width, height), pixels, "raw", raw_mode, 0, 1)
+        buffered = BytesIO()
+        img.convert("RGB").save(buffered, format="PNG", compress_level=1)
+        return buffered.getvalue()
+
+    return await _capture_via_pull(device_id, timeout)
+
+
+def read_png_size(data: bytes) -> Tuple[int, int]:
+    """
+    Read width and height from the IHDR chunk of PNG data without decoding it.
+
+    Raises:
+        ValueError: If data is not a PNG image.
+    """
+    # 8 byte signature, then the IHDR chunk: length, type, width, height
+    if len(data) < 24 or not data.startswith(PNG_SIGNATURE) or data[12:16] != b"IHDR":
+        raise ValueError("Data is not a PNG image")
+    width, height = struct.unpack(">II", data[16:24])
+    return width, height
+
+
+def parse_raw_screencap(data: bytes) -> Tuple[int, int, int, memoryview]:
+    """
+    Parse the output of `screencap` without -p.
+
+    The header is width, height and pixel format as little-endian uint32,
+    followed on Android 12+ by a uint32 color space.
+
+    Returns:
+        Tuple of (width, height, pixel format, pixel buffer view).
+
+    Raises:
+        ValueError: If the data is not a complete raw frame.
+    """
+    if len(data) < 12:
+        raise ValueError("Raw screencap output is too short")
+
+    width, height, pixel_format = struct.unpack_from("<III", data, 0)
+    if pixel_format not in RAW_PIXEL_FORMATS:
+        raise ValueError(f"Unsupported screencap pixel format: {pixel_format}")
+
+    bpp = RAW_PIXEL_FORMATS[pixel_format][2]
+    frame_size = width * height * bpp
+    for header_size in (16, 12):
+        if len(data) >= header_size + frame_size and (
+            len(data) - header_size - frame_size < 4
+        ):
+            view = memoryview(data)[header_size : header_size + frame_size]
+            return width, height, pixel_format, view
+
+    raise ValueError(
+        f"Raw screencap size mismatch: {len(data)} bytes for {width}x{height}"
+    )
+
+
+async def _exec_capture(command: list, device_id: str | None, timeout: float) -> bytes:
+    """Run a capture command with exec-out and return its output."""
+    try:
+        output = await adb_exec_out(command, device_id, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise ScreencapError("Screenshot timed out")
+
+    if not output:
+        raise ScreencapError("Empty screencap output")
+    return output
+
+
+async def _capture_via_pull(device_id: str | None, timeout: float) -> bytes:
+    """Legacy capture: screencap to a per-call device file, then adb pull."""
+    adb_prefix = await _get_adb_prefix(device_id)
+    capture_id = uuid.uuid4().hex
+    device_path = f"/data/local/tmp/screenshot_{capture_id}.png"
+    local_path = os.path.join(tempfile.gettempdir(), f"screenshot_{capture_id}.png")
+
+    try:
+        try:
+            output = await adb_shell(
+                ["screencap", "-p", device_path], device_id, timeout=timeout, stderr=True
+            )
         except asyncio.TimeoutError:
-            process.kill()
-            await process.wait()
-            return _create_fallback_screenshot(is_sensitive=False)
-        
-        output = stdout.decode('utf-8') + stderr.decode('utf-8')
+            raise ScreencapError("Screenshot timed out")
 
-        # Check for screenshot failure (sensitive screen)
         if "Status: -1" in output or "Failed" in output:
-            return _create_fallback_screenshot(is_sensitive=True)
+            raise ScreencapError(output.strip(), is_sensitive=True)
 
-        # Pull screenshot to local temp path
+        # The file sync protocol is not implemented by the socket transport
         pull_process = await asyncio.create_subprocess_exec(
-            *adb_prefix, "pull", "/sdcard/tmp.png", temp_path,
+            *adb_prefix, "pull", device_path, local_path,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
-        
         try:
             await asyncio.wait_for(pull_process.communicate(), timeout=5)
         except asyncio.TimeoutError:
             pull_process.kill()
             await pull_process.wait()
-            return _create_fallback_screenshot(is_sensitive=False)
-
-        if not os.path.exists(temp_path):
-            return _create_fallback_screenshot(is_sensitive=False)
-
-        if not is_portal:
-            # Get XML corresponding to the screenshot
-            xml_file = get_emulator_ui_xml("tmp", os.path.dirname(temp_path), emulator_device=device_id)
-            elements = ui_filter(xml_file)
-        
-            # draw_bbox_multi(img_path=temp_path, output_path=temp_bbox_path, elem_list=elements)
-            # crop_list = crop_ui_elements(
-            #     img_path=temp_path, 
-            #     output_dir=temp_crop_dir, 
-            #     elem_list=elements
-            # )
-        else:
-            formatted_text, elements = (
-                await ui_portal()
-            )
-        
-        # Read and encode image
-        img = Image.open(temp_path)
-        width, height = img.size
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            raise ScreencapError("Screenshot pull timed out")
 
-        crop_base64_data = []
-        # for crop in crop_list:
-            # print(f"crop: {crop}")
-            # crop_img = Image.open(crop)
-            # buffered_crop = BytesIO()
-            # crop_img.save(buffered_crop, format="PNG")
-            # crop_base64 = base64.b64encode(buffered_crop.getvalue()).decode("utf-8")
-            # crop_base64_data.append(crop_base64)
+        if not os.path.exists(local_path):
+            raise ScreencapError("Screenshot pull failed")
+        with open(local_path, "rb") as f:
+            return f.read()
+    finally:
+        if os.path.exists(local_path):
+            os.remove(local_path)
+        await adb_shell(["rm", "-f", device_path], device_id)
 
-        # Cleanup
-        if not (prefix and save_dir):
-            os.remove(temp_path)
-            # os.remove(temp_bbox_path)
-            # shutil.rmtree(temp_crop_dir)
-            if is_portal:
-                return Screenshot(
-                    base64_data=base64_data, 
-                    crop_base64_data=crop_base64_data,
-                    width=width, 
-                    height=height, 
-                    elements=elements,
-                    formatted_text=formatted_text,
-                    is_sensitive=False
-                )
-            else:
-                os.remove(xml_file)
-                return Screenshot(
-                    base64_data=base64_data, 
-                    crop_base64_data=crop_base64_data,
-                    width=width, 
-                    height=height, 
-                    elements=elements,
-                    is_sensitive=False
-                )
-        else:
-            if is_portal:
-                return Screenshot(
-                    base64_data=base64_data,
-                    crop_base64_data=crop_base64_data,
-                    width=width,
-                    height=height,
-                    elements=elements,
-                    formatted_text=formatted_text,
-                    is_sensitive=False,
-                    path=temp_path
-                )
-            else:
-                return Screenshot(
-                    base64_data=base64_data,
-                    crop_base64_data=crop_base64_data,
-                    width=width,
-                    height=height,
-                    elements=elements,
-                    is_sensitive=False,
-                    path=temp_path
-                )
 
-    except Exception as e:
-        print(f"Screenshot error: {e}")
-        return _create_fallback_screenshot(is_sensitive=False)
+def _screencap_error(output: bytes) -> ScreencapError:
+    """Build a ScreencapError from unexpected screencap output."""
+    text = output[:256].decode("utf-8", errors="ignore").strip()
+    # Secure windows (FLAG_SECURE) make screencap fail with a status message
+    is_sensitive = "Status: -1" in text or "Failed" in text
+    return ScreencapError(text or "Empty screencap output", is_sensitive=is_sensitive)
 
 
 async def _get_adb_prefix(device_id: str | None) -> list:
@@ -197,16 +540,20 @@ def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     """Create a black fallback image when screenshot fails."""
     default_width, default_height = 1080, 2400
 
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
     return Screenshot(
-        base64_data=base64_data,
+        base64_data=_black_png_base64(default_width, default_height),
         crop_base64_data=[],
         width=default_width,
         height=default_height,
         elements=[],
         is_sensitive=is_sensitive,
     )
+
+
+@lru_cache(maxsize=4)
+def _black_png_base64(width: int, height: int) -> str:
+    """Encode a black PNG once per size, fallbacks reuse it."""
+    black_img = Image.new("RGB", (width, height), color="black")
+    buffered = BytesIO()
+    black_img.save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
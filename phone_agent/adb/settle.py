@@ -0,0 +1,68 @@
+"""UI settle detection for Android devices."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Tuple
+
+from phone_agent.adb.frame_stream import find_frame_server
+from phone_agent.adb.transport import adb_shell
+from phone_agent.fingerprint import dhash, fingerprints_match
+from phone_agent.portal_cli.portal_client import get_portal_client
+from phone_agent.settle import SettleResult, wait_until_stable
+
+
+async def settle(action: str, device_id: str | None = None, max_wait: float = 1.0) -> SettleResult:
+    """
+    Wait after an action until the screen is stable, at most max_wait seconds.
+
+    Args:
+        action: Action name, for reporting.
+        device_id: Optional ADB device ID for multi-device setups.
+        max_wait: Deadline in seconds (the configured action delay).
+
+    Returns:
+        SettleResult with the settle time.
+    """
+    probe, same = await select_probe(device_id)
+    return await wait_until_stable(probe, max_wait, action, device_id, same)
+
+
+async def select_probe(
+    device_id: str | None = None,
+) -> Tuple[Callable[[], Awaitable[Any]], Callable[[Any, Any], bool]]:
+    """
+    Pick the cheapest screen-state probe available for a device.
+
+    In order: the fingerprint of the latest frame of a running frame server
+    that has produced frames, the hash of the portal state over TCP, then the
+    focused window. The frame server publishes a frame as soon as its stream
+    goes quiet, so its latest frame is the current screen.
+
+    Returns:
+        Tuple of (probe, same) for wait_until_stable.
+    """
+    server = find_frame_server(device_id)
+    if server is not None and server.latest() is not None:
+
+        async def frame_probe():
+            frame = server.latest()
+            if frame is None:
+                return None
+            return await asyncio.to_thread(lambda: dhash(frame.to_image()))
+
+        return frame_probe, fingerprints_match
+
+    try:
+        client = await get_portal_client(device_id)
+    except Exception:
+        client = None
+    if client is not None and client.tcp_available:
+        return client.get_state_digest, _equal
+
+    async def focus_probe():
+        return await adb_shell("dumpsys window displays | grep mCurrentFocus", device_id)
+
+    return focus_probe, _equal
+
+
+def _equal(a: Any, b: Any) -> bool:
+    return a is not None and a == b
@@ -0,0 +1,185 @@
+"""Long-lived device shell sessions with sentinel-framed command output.
+
+Instead of opening a new shell per command, a ShellSession keeps one `sh`
+running on the device and writes each command to its stdin, followed by a
+printf of a unique end marker and the exit status. Output is read up to the
+marker, so a command costs one write and one read on an open stream.
+
+A ShellSessionPool runs commands from concurrent callers on up to
+max_sessions sessions; further callers wait for a session to become free.
+
+Sessions are transport-agnostic: they are created by a connect callable
+returning a (reader, writer) stream pair connected to a shell's stdin and
+stdout. Closing the writer must end the shell.
+"""
+
+import asyncio
+import itertools
+import logging
+import uuid
+from typing import Awaitable, Callable, List, Tuple
+
+logger = logging.getLogger("shell_session")
+
+Connector = Callable[[], Awaitable[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]]
+
+
+class ShellSessionError(Exception):
+    """The shell session could not be opened."""
+
+
+class ShellSession:
+    """
+    One persistent shell, running one command at a time.
+
+    The shell is (re)opened on first use and after it was closed by a timeout
+    or an error, so a broken session recovers on the next command. A command
+    that was interrupted is never re-sent, since input commands are not
+    idempotent.
+
+    Args:
+        connect: Opens the shell stream pair.
+        read_size: Maximum bytes read per call.
+    """
+
+    def __init__(self, connect: Connector, read_size: int = 1 << 16):
+        self.connect = connect
+        self.read_size = read_size
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._token = uuid.uuid4().hex[:12]
+        self._seq = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the shell stream is open."""
+        return self._writer is not None and not self._reader.at_eof()
+
+    async def run(
+        self, command: str, timeout: float | None = None, stderr: bool = True
+    ) -> Tuple[str, int]:
+        """
+        Run a command in the session.
+
+        Args:
+            command: Shell command line. Its stdin is /dev/null.
+            timeout: Seconds to wait for the command. On timeout the session
+                is closed (the command may still be running on the device).
+            stderr: Merge the command's stderr into the output, otherwise
+                discard it.
+
+        Returns:
+            Tuple of (output, exit_status).
+
+        Raises:
+            asyncio.TimeoutError: If the command did not finish in time.
+            ShellSessionError: If the shell could not be opened (the command
+                was not sent).
+            ConnectionResetError: If the shell ended during the command.
+        """
+        async with self._lock:
+            if not self.is_open:
+                await self._open()
+            try:
+                return await asyncio.wait_for(self._run(command, stderr), timeout)
+            except BaseException:
+                # Output framing is lost after a timeout or a broken stream
+                self._close()
+                raise
+
+    async def close(self) -> None:
+        """Close the shell stream."""
+        async with self._lock:
+            self._close()
+
+    async def _open(self) -> None:
+        self._close()
+        try:
+            self._reader, self._writer = await self.connect()
+        except Exception as e:
+            raise ShellSessionError(f"Failed to open shell session: {e}") from e
+
+    def _close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+
+    async def _run(self, command: str, stderr: bool) -> Tuple[str, int]:
+        marker = f"__PA_{self._token}_{next(self._seq)}__".encode()
+        # Braces group multi-part command lines; the leading newline of the
+        # printf puts the marker on its own line after unterminated output
+        redirect = "2>&1" if stderr else "2>/dev/null"
+        script = (
+            f"{{ {command}\n}} </dev/null {redirect}; printf '\\n%s %d\\n' {marker.decode()} $?\n"
+        )
+        self._writer.write(script.encode("utf-8"))
+        await self._writer.drain()
+
+        end = b"\n" + marker + b" "
+        buffer = bytearray()
+        search_from = 0
+        while True:
+            index = buffer.find(end, search_from)
+            if index >= 0:
+                newline = buffer.find(b"\n", index + len(end))
+                if newline >= 0:
+                    status = int(buffer[index + len(end):newline])
+                    return buffer[:index].decode("utf-8", errors="replace"), status
+            else:
+                search_from = max(0, len(buffer) - len(end))
+
+            chunk = await self._reader.read(self.read_size)
+            if not chunk:
+                raise ConnectionResetError("Shell session ended during command")
+            buffer.extend(chunk)
+
+
+class ShellSessionPool:
+    """
+    Runs commands from concurrent callers on a bounded set of shell sessions.
+
+    Args:
+        connect: Opens a shell stream pair, see ShellSession.
+        max_sessions: Maximum number of sessions open at once.
+    """
+
+    def __init__(self, connect: Connector, max_sessions: int = 2):
+        self.connect = connect
+        self.max_sessions = max_sessions
+        self._sessions: List[ShellSession] = []
+        self._idle: List[ShellSession] = []
+        self._available = asyncio.Condition()
+
+    async def run(
+        self, command: str, timeout: float | None = None, stderr: bool = True
+    ) -> Tuple[str, int]:
+        """Run a command on a free session, see ShellSession.run."""
+        session = await self._acquire()
+        try:
+            return await session.run(command, timeout, stderr)
+        finally:
+            await self._release(session)
+
+    async def close(self) -> None:
+        """Close all sessions."""
+        for session in self._sessions:
+            await session.close()
+
+    async def _acquire(self) -> ShellSession:
+        async with self._available:
+            while True:
+                if self._idle:
+                    # Prefer a session whose shell is already running
+                    self._idle.sort(key=lambda s: s.is_open)
+                    return self._idle.pop()
+                if len(self._sessions) < self.max_sessions:
+                    session = ShellSession(self.connect)
+                    self._sessions.append(session)
+                    return session
+                await self._available.wait()
+
+    async def _release(self, session: ShellSession) -> None:
+        async with self._available:
+            self._idle.append(session)
+            self._available.notify()
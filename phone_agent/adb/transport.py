@@ -0,0 +1,336 @@
+"""Direct adb server socket transport.
+
+Every `adb shell ...` invocation forks an adb client process that connects to
+the adb server, selects the device and runs one service. The transport here
+speaks the adb server protocol itself: it opens a TCP connection to the server,
+sends `host:transport:<serial>` and then `shell:<command>` or `exec:<command>`,
+and reads the output until the device closes the stream.
+
+A service consumes its connection, so the per-device pool holds connections
+that have already completed the transport handshake and are ready for the next
+command. It is refilled in the background after every command.
+
+adb_shell additionally runs commands in a persistent per-device shell (see
+phone_agent.adb.shell_session), so an input command is one write and one read
+on an open stream.
+
+Set PHONE_AGENT_ADB_TRANSPORT=subprocess to use the adb client instead, and
+PHONE_AGENT_ADB_SHELL_SESSION=0 to run every shell command as its own service.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from phone_agent.adb.shell_session import ShellSessionError, ShellSessionPool
+from phone_agent.config.timing import TIMING_CONFIG
+
+logger = logging.getLogger("adb_transport")
+
+ADB_SERVER_HOST = os.getenv("ANDROID_ADB_SERVER_ADDRESS", "127.0.0.1")
+ADB_SERVER_PORT = int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037"))
+
+USE_SOCKET_TRANSPORT = os.getenv("PHONE_AGENT_ADB_TRANSPORT", "socket") != "subprocess"
+USE_SHELL_SESSION = os.getenv("PHONE_AGENT_ADB_SHELL_SESSION", "1") != "0"
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AdbTransportError(Exception):
+    """The adb server rejected a request (FAIL response) or the protocol broke."""
+
+
+class AdbTransport:
+    """
+    Runs shell and exec services on one device over adb server sockets.
+
+    Args:
+        serial: Device serial, None for the only connected device (or ANDROID_SERIAL).
+        host: adb server host.
+        port: adb server port.
+        pool_size: Number of pre-handshaken connections kept ready.
+        max_idle: Seconds after which a pooled connection is not reused.
+    """
+
+    def __init__(
+        self,
+        serial: str | None = None,
+        host: str = ADB_SERVER_HOST,
+        port: int = ADB_SERVER_PORT,
+        pool_size: int = 2,
+        max_idle: float = 30.0,
+    ):
+        self.serial = serial or os.getenv("ANDROID_SERIAL") or None
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.max_idle = max_idle
+
+        self._pool: Deque[Tuple[float, Connection]] = deque()
+        self._refill_task: asyncio.Task | None = None
+        self._closed = False
+
+    async def shell(self, command: str | Sequence[str], timeout: float | None = None) -> bytes:
+        """
+        Run a shell command and return its output (stdout and stderr merged).
+
+        Args:
+            command: Command line, or arguments joined with spaces like `adb shell`.
+            timeout: Seconds to wait for the command to finish.
+        """
+        return await self._run_service(f"shell:{_join(command)}", timeout)
+
+    async def exec_out(self, command: str | Sequence[str], timeout: float | None = None) -> bytes:
+        """Run a command without a pty and return its raw binary output, like `adb exec-out`."""
+        return await self._run_service(f"exec:{_join(command)}", timeout)
+
+    async def open_service(self, service: str) -> Connection:
+        """Start a service and return its open stream, e.g. "shell:sh" for an interactive shell."""
+        reader, writer = await self._acquire()
+        self._schedule_refill()
+        try:
+            await _send_request(reader, writer, service)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        self._closed = True
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+        while self._pool:
+            _, (_, writer) = self._pool.popleft()
+            writer.close()
+
+    async def _run_service(self, service: str, timeout: float | None) -> bytes:
+        reader, writer = await self.open_service(service)
+        try:
+            return await asyncio.wait_for(reader.read(), timeout)
+        finally:
+            writer.close()
+
+    async def _acquire(self) -> Connection:
+        """Take a ready connection from the pool, or open a new one."""
+        now = time.monotonic()
+        while self._pool:
+            created, (reader, writer) = self._pool.popleft()
+            if now - created < self.max_idle and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return await self._connect()
+
+    async def _connect(self) -> Connection:
+        """Open a server connection and select the device."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.serial:
+                await _send_request(reader, writer, f"host:transport:{self.serial}")
+            else:
+                await _send_request(reader, writer, "host:transport-any")
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    def _schedule_refill(self) -> None:
+        if self._closed or self.pool_size <= 0:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.get_running_loop().create_task(self._refill())
+
+    async def _refill(self) -> None:
+        while not self._closed and len(self._pool) < self.pool_size:
+            try:
+                connection = await self._connect()
+            except Exception as e:
+                logger.debug(f"Pool refill failed: {e}")
+                return
+            self._pool.append((time.monotonic(), connection))
+
+
+async def _send_request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: str
+) -> None:
+    """Send a length-prefixed request and wait for OKAY."""
+    payload = request.encode("utf-8")
+    writer.write(b"%04x" % len(payload) + payload)
+    await writer.drain()
+
+    status = await reader.readexactly(4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        length = int(await reader.readexactly(4), 16)
+        message = (await reader.readexactly(length)).decode("utf-8", errors="replace")
+        raise AdbTransportError(message)
+    raise AdbTransportError(f"Unexpected adb server response: {status!r}")
+
+
+def _join(command: str | Sequence[str]) -> str:
+    # The adb client joins shell arguments with spaces, without quoting
+    if isinstance(command, str):
+        return command
+    return " ".join(str(arg) for arg in command)
+
+
+# One transport and one shell pool per device, bound to the event loop that
+# created them. Loops are weak keys, and the entries of closed loops are dropped
+# on the next lookup, so a new loop never gets connections of a dead one.
+_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Optional[str], AdbTransport]]" = (
+    weakref.WeakKeyDictionary()
+)
+_shells: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Optional[str], ShellSessionPool]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_entries(cache: weakref.WeakKeyDictionary) -> Dict[Optional[str], Any]:
+    """Per-device entries of the running event loop, dropping those of closed loops."""
+    for loop in [loop for loop in cache.keys() if loop.is_closed()]:
+        del cache[loop]
+    return cache.setdefault(asyncio.get_running_loop(), {})
+
+
+def get_transport(device_id: str | None = None) -> AdbTransport:
+    """Get the shared transport for a device in the running event loop."""
+    transports = _loop_entries(_transports)
+    transport = transports.get(device_id)
+    if transport is None:
+        transport = transports[device_id] = AdbTransport(device_id)
+    return transport
+
+
+def get_shell(device_id: str | None = None) -> ShellSessionPool:
+    """Get the shared persistent shell sessions for a device in the running event loop."""
+    shells = _loop_entries(_shells)
+    shell = shells.get(device_id)
+    if shell is None:
+        shell = shells[device_id] = ShellSessionPool(lambda: _open_shell(device_id))
+    return shell
+
+
+async def close_transports() -> None:
+    """Close the transports and shells of the running event loop (call on shutdown)."""
+    loop = asyncio.get_running_loop()
+    for shell in _shells.pop(loop, {}).values():
+        await shell.close()
+    for transport in _transports.pop(loop, {}).values():
+        await transport.close()
+
+
+async def _open_shell(device_id: str | None) -> Connection:
+    """Open an interactive shell stream, over the server socket or an adb client."""
+    if USE_SOCKET_TRANSPORT:
+        try:
+            return await get_transport(device_id).open_service("shell:sh")
+        except (OSError, asyncio.IncompleteReadError, AdbTransportError) as e:
+            logger.debug(f"adb socket transport unavailable ({e}), using adb client")
+
+    args = ["adb", "-s", device_id] if device_id else ["adb"]
+    process = await asyncio.create_subprocess_exec(
+        *args, "shell", "sh",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    return process.stdout, process.stdin
+
+
+async def adb_shell(
+    command: str | Sequence[str],
+    device_id: str | None = None,
+    timeout: float | None = None,
+    stderr: bool = False,
+) -> str:
+    """
+    Run `adb shell <command>` and return its decoded output.
+
+    Runs in the device's persistent shell session, or as a one-off shell
+    service over the adb server socket, falling back to the adb client when
+    the server cannot be reached or rejects the request (the client then
+    starts the server or reports the error as before).
+
+    Args:
+        command: Command line, or arguments joined with spaces like `adb shell`.
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Seconds to wait, raises asyncio.TimeoutError when exceeded.
+            Defaults to TIMING_CONFIG.connection.shell_command_timeout; a
+            timed out shell session is closed and reopened for the next command.
+        stderr: Include the command's stderr in the output (e.g. to detect
+            screencap failures), otherwise only stdout is returned.
+
+    Returns:
+        Command output.
+
+    Raises:
+        asyncio.TimeoutError: If the command did not finish in time.
+        ConnectionResetError: If the device's shell ended during the command
+            (it may have run, so it is not sent again).
+    """
+    if timeout is None:
+        timeout = TIMING_CONFIG.connection.shell_command_timeout
+    if USE_SHELL_SESSION:
+        try:
+            output, _ = await get_shell(device_id).run(_join(command), timeout, stderr)
+            return output
+        except ShellSessionError as e:
+            logger.debug(f"{e}, running the command as its own service")
+
+    if not stderr:
+        # The shell service merges stderr into its stream: drop it on the device
+        command = f"{{ {_join(command)}\n}} 2>/dev/null"
+    output = await _run("shell", command, device_id, timeout)
+    return output.decode("utf-8", errors="replace")
+
+
+async def adb_exec_out(
+    command: str | Sequence[str], device_id: str | None = None, timeout: float | None = None
+) -> bytes:
+    """Run `adb exec-out <command>` and return its raw output. See adb_shell."""
+    return await _run("exec-out", command, device_id, timeout)
+
+
+async def _run(
+    kind: str, command: str | Sequence[str], device_id: str | None, timeout: float | None
+) -> bytes:
+    if USE_SOCKET_TRANSPORT:
+        transport = get_transport(device_id)
+        try:
+            if kind == "shell":
+                return await transport.shell(command, timeout)
+            return await transport.exec_out(command, timeout)
+        except (OSError, asyncio.IncompleteReadError, AdbTransportError) as e:
+            logger.debug(f"adb socket transport unavailable ({e}), using adb client")
+
+    return await _run_client(kind, command, device_id, timeout)
+
+
+async def _run_client(
+    kind: str, command: str | Sequence[str], device_id: str | None, timeout: float | None
+) -> bytes:
+    """Run the command through an adb client process."""
+    args: List[str] = ["adb", "-s", device_id] if device_id else ["adb"]
+    args.append(kind)
+    args += [command] if isinstance(command, str) else [str(arg) for arg in command]
+
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    if kind == "shell":
+        return stdout + stderr
+    return stdout
@@ -11,21 +11,29 @@ from typing import Any, Callable, Dict, List
 
 from phone_agent.actions import ActionHandler
 from phone_agent.actions.handler import do, finish, parse_action
-from phone_agent.config import get_messages, get_system_prompt
+from phone_agent.config import TIMING_CONFIG, get_messages, get_system_prompt
+from phone_agent.config.apps import get_package_name
 from phone_agent.config.prompts_en import SYSTEM_PROMPT_PREDICTION as SYSTEM_PROMPT_PREDICTION_EN
 from phone_agent.context_manager import StructuredContext
 from phone_agent.device_factory import get_device_factory
+from phone_agent.fingerprint import fingerprints_match, hamming_distance
+from phone_agent.loop_monitor import monitor_event_loop
 from phone_agent.model import ModelClient, ModelConfig
 from phone_agent.model.client import MessageBuilder
+from phone_agent.model.image import PreparedImage, get_image_config, prepare_image
+from phone_agent.observation import Observation
 from phone_agent.planner import Planner
+from phone_agent.settle import expected_settle, learned_window
 from phone_agent.skill_executor import SkillExecutor
 from phone_agent.speculative_executor import SpeculativeExecutor
+from phone_agent.ui_diff import UIDiff, element_identity, element_label, element_state
 
 from act_mem.act_mem import ActionMemory
 from act_mem.workrecorder import WorkflowRecorder
 from act_mem.worknode import WorkAction
 
 from utils import extract_json
+from utils.element_table import ElementTable
 from phone_agent.error_analyzer import ErrorAnalyzer
 
 @dataclass
@@ -40,6 +48,14 @@ class AgentConfig:
     memory_dir: str = "./output/memory"
     enable_reflection: bool = True
     reflection_on_failure_only: bool = False
+    # Send "screen unchanged since step N" instead of a new screenshot whose
+    # fingerprint is within unchanged_screen_threshold bits of the last one sent;
+    # that image stays in the history part of the context
+    skip_unchanged_screens: bool = False
+    unchanged_screen_threshold: int = 2
+    # Fingerprint distance (bits of 64) above which reflect() treats the screen
+    # as visibly changed without looking at elements or calling the model
+    reflect_change_threshold: int = 12
 
     def __post_init__(self):
         if self.system_prompt is None:
@@ -92,6 +108,9 @@ class PhoneAgent:
         self.agent_config = agent_config or AgentConfig()
 
         self.model_client = ModelClient(self.model_config)
+        self._image_config = self.model_config.image_config or get_image_config(
+            self.model_config.model_name
+        )
         self.action_handler = ActionHandler(
             device_id=self.agent_config.device_id,
             confirmation_callback=confirmation_callback,
@@ -107,7 +126,11 @@ class PhoneAgent:
         self._predict = False
         self._step_count = 0
         self._actions_executed: list[dict[str, Any]] = []
-        self._last_screenshot = None  # Cache for screenshot reuse
+        self._last_observation = None  # Cache for observation reuse
+        self._last_model_image = None  # Last image sent to the model
+        self._prepared_image: tuple[Any, PreparedImage] | None = None  # Last encoded screenshot
+        self._last_image_fingerprint = None
+        self._last_image_step = 0
         
         # Skill执行状态跟踪
         self._post_skill_execution = False  # 标记是否刚执行完skill
@@ -136,12 +159,20 @@ class PhoneAgent:
         Returns:
             Dictionary containing execution results with actions list.
         """
+        with monitor_event_loop():
+            return await self._run_task(task)
+
+    async def _run_task(self, task: str) -> dict[str, Any]:
         start_time = time.time()
         self._context.reset()
         self._context.set_system_prompt(self.agent_config.system_prompt)
         self._context.set_task(task)
         self._step_count = 0
         self._actions_executed = []
+        self._last_model_image = None
+        self._prepared_image = None
+        self._last_image_fingerprint = None
+        self._last_image_step = 0
         workflow = self.memory.create_workflow(task)
         recorder = WorkflowRecorder(task=task, workflow=workflow)
 
@@ -207,16 +238,16 @@ class PhoneAgent:
                 }
             
             # if result.success and result.predict is not None and self._predict:
-            #     # Pass cached screenshot to executor and get final screenshot back
-            #     final_screenshot = await self.speculative_executor.executor(
+            #     # Pass cached observation to executor and get final observation back
+            #     final_observation = await self.speculative_executor.executor(
             #         result.predict, 
             #         # result.tag, 
             #         recorder,
-            #         initial_screenshot=self._last_screenshot
+            #         initial_observation=self._last_observation
             #     )
-            #     # Cache the final screenshot for next step
-            #     if final_screenshot is not None:
-            #         self._last_screenshot = final_screenshot
+            #     # Cache the final observation for next step
+            #     if final_observation is not None:
+            #         self._last_observation = final_observation
             #         if self.agent_config.verbose:
             #             print("📸 Cached final screenshot from speculative execution for next step")
             #     else:
@@ -229,6 +260,7 @@ class PhoneAgent:
         end_time = time.time()
         print(f"🏁 Task failed in {self._step_count} steps, time taken: {end_time - start_time:.2f} seconds")
         # self.memory.to_json()
+        self.memory.settle_profiles.save()
 
         return {
             'finished': False,
@@ -265,7 +297,11 @@ class PhoneAgent:
         self._context.reset()
         self._step_count = 0
         self._actions_executed = []
-        self._last_screenshot = None
+        self._last_observation = None
+        self._last_model_image = None
+        self._prepared_image = None
+        self._last_image_fingerprint = None
+        self._last_image_step = 0
         # 重置skill执行状态跟踪
         self._post_skill_execution = False
         self._executed_skills = []
@@ -276,6 +312,11 @@ class PhoneAgent:
         self._last_planning_step = -1
         self._planning_done = False
 
+    async def close(self) -> None:
+        """Release device state held across tasks, e.g. restore the user's keyboard."""
+        device_factory = await get_device_factory()
+        await device_factory.restore_keyboards()
+
     async def _execute_step(
         self, user_prompt: str, recorder: WorkflowRecorder, is_first: bool = False, is_portal: bool = True
     ) -> StepResult:
@@ -285,19 +326,20 @@ class PhoneAgent:
         # Optimize screenshot capture - reuse cached screenshot if available
         device_factory = await get_device_factory()
         
-        # Use cached screenshot as before_screenshot if available (from previous step)
-        if self._last_screenshot is not None and not is_first:
-            before_screenshot = self._last_screenshot
-            screenshot = before_screenshot  # Current screenshot is the cached one
+        # Use cached observation as before state if available (from previous step)
+        if self._last_observation is not None and not is_first:
+            observation = self._last_observation
             if self.agent_config.verbose:
                 print("📸 Reusing cached screenshot to avoid redundant capture")
         else:
-            screenshot = await device_factory.get_screenshot(device_id=self.agent_config.device_id)
-            before_screenshot = screenshot
-            if self.agent_config.verbose and not is_first:
-                print("📸 Capturing fresh screenshot (no cache available)")
-        
-        current_app = await device_factory.get_current_app(self.agent_config.device_id)
+            observation = await device_factory.get_observation(device_id=self.agent_config.device_id)
+            if self.agent_config.verbose:
+                if not is_first:
+                    print("📸 Capturing fresh screenshot (no cache available)")
+                print(f"⏱️ Observation: {observation.format_timings()}")
+
+        screenshot = observation.screenshot
+        current_app = observation.current_app
         
         # 优化：只在特定条件下进行planning
         # 1. 首次执行时（步骤0或1）
@@ -417,11 +459,11 @@ class PhoneAgent:
                         
                         # 获取skill执行后的截图用于验证
                         try:
-                            after_skill_screenshot = await device_factory.get_screenshot(device_id=self.agent_config.device_id)
+                            after_skill_observation = await device_factory.get_observation(device_id=self.agent_config.device_id)
                         except Exception as e:
                             if self.agent_config.verbose:
                                 print(f"Failed to capture post-skill screenshot: {e}")
-                            after_skill_screenshot = screenshot
+                            after_skill_observation = observation
                         
                         # 立即进行reflection分析
                         reflection_result = None
@@ -430,7 +472,8 @@ class PhoneAgent:
                                 reflection_result = await self.reflect(
                                     action_type="SkillExecution", 
                                     action_description=f"Executed skill '{plan.skill_name}' with params {plan.skill_params}", 
-                                    before_screenshot=screenshot,
+                                    before_observation=observation,
+                                    after_observation=after_skill_observation,
                                     is_skill_execution=True  # 标记这是skill执行的reflection
                                 )
                                 
@@ -445,7 +488,7 @@ class PhoneAgent:
                                     print(f"Skill reflection analysis failed: {e}")
                         
                         # 缓存skill执行后的截图用于下一步
-                        self._last_screenshot = after_skill_screenshot
+                        self._last_observation = after_skill_observation
                         if self.agent_config.verbose:
                             print("📸 Cached post-skill screenshot for next step")
                         
@@ -518,21 +561,11 @@ class PhoneAgent:
                     "path": e.get_xpath()
                 })
         else:
-            for i, e in enumerate(screenshot.elements, 1):  
-                common_fields = {
-                    "resourceId": e.resourceId,
-                    "className": e.className,
-                    "content": e.content_desc,
-                    "checked": e.state_desc,
-                }
-                elements_info.append({
-                    "id": f"A{i}",
-                    **common_fields,
-                    "bbox": e.bounds
-                })
-                elements.append({
-                    **common_fields
-                })
+            # Built from the element table columns; elements_info is cached on
+            # the table and shared with the speculative executor
+            element_table = ElementTable.of(screenshot.elements)
+            elements_info = element_table.elements_info()
+            elements = element_table.node_elements()
 
         node = work_graph.create_node(elements)
         print(f"Node {node.id} created.")
@@ -552,7 +585,26 @@ class PhoneAgent:
         screen_info = json.loads(screen_info_str)
 
         # Add screenshot and screen info to structured context
-        self._context.add_screenshot(screenshot.base64_data)
+        if (
+            self.agent_config.skip_unchanged_screens
+            and self._last_model_image is not None
+            and fingerprints_match(
+                screenshot.fingerprint,
+                self._last_image_fingerprint,
+                self.agent_config.unchanged_screen_threshold,
+            )
+        ):
+            # Same screen as already shown: coordinates still refer to that image
+            model_image = self._last_model_image
+            self._context.set_screen_unchanged(self._last_image_step)
+            if self.agent_config.verbose:
+                print(f"🖼️ Screen unchanged since step {self._last_image_step}, skipping image upload")
+        else:
+            model_image = await self._prepare_image(screenshot)
+            self._context.add_screenshot(model_image.base64_data, mime_type=model_image.mime_type)
+            self._last_model_image = model_image
+            self._last_image_fingerprint = screenshot.fingerprint
+            self._last_image_step = self._step_count
         self._context.add_screen_info(screen_info)
 
         # TODO: Generate speculative context for future UI states
@@ -653,10 +705,11 @@ class PhoneAgent:
         #         print(f"🧠 Memory for tag '{response.tag}' already loaded, skipping")
         
         
+        element_content = None
         try:
             # Extract action string from response.action dict
             # action_str = list(response.action.values())[0]
-            action, element_content = parse_action(action_code=list(response.action.values())[0], elements_info=elements_info)
+            action, element_content = parse_action(action_code=list(response.action.values())[0], elements_info=elements_info, image=model_image)
             print(f"element_content: {element_content}")
             if element_content is None:
                 node_action = node.add_action(action_type=action["action"], description=list(response.action.keys())[0])
@@ -709,23 +762,50 @@ class PhoneAgent:
         self._context.clear_speculative_context()
         # print(f"📚 Context:\n {self._context.to_messages()}\n")
 
-        # Execute action
+        # Execute action, waiting for the UI as long as this action usually takes
+        if action.get("action") == "Launch":
+            settle_target = action.get("app")
+        elif is_portal:
+            settle_target = self._target_resource_id(elements_info, element_content)
+        else:
+            settle_target = None
+        settle_key = (get_package_name(current_app) or current_app, action.get("action"), settle_target)
+        settle_stats = self.memory.settle_profiles.stats(
+            *settle_key, min_samples=TIMING_CONFIG.settle.learned_min_samples
+        )
         try:
-            result = await self.action_handler.execute(
-                action, screenshot.width, screenshot.height
-            )
+            with expected_settle(learned_window(settle_stats)):
+                result = await self.action_handler.execute(
+                    action, screenshot.width, screenshot.height
+                )
         except Exception as e:
             if self.agent_config.verbose:
                 traceback.print_exc()
             result = await self.action_handler.execute(
                 finish(message=str(e)), screenshot.width, screenshot.height
             )
+        if result.settle_time is not None:
+            self.memory.settle_profiles.record(*settle_key, result.settle_time, result.settle_stable)
+            if self.agent_config.verbose:
+                print(f"⏱️ UI settled in {result.settle_time * 1000:.0f}ms")
+
+        finished = action.get("action") == "Finish" or result.should_finish
+
+        # Capture the after-action observation once: reflection diffs against it
+        # and the next step reuses it as its before state
+        after_observation = None
+        if not finished:
+            try:
+                after_observation = await device_factory.get_observation(device_id=self.agent_config.device_id)
+                if self.agent_config.verbose:
+                    print(f"⏱️ Observation: {after_observation.format_timings()}")
+            except Exception as e:
+                if self.agent_config.verbose:
+                    print(f"Failed to cache screenshot: {e}")
         
         # Perform reflection analysis after action execution
         reflection_result = None
-        if (self.agent_config.enable_reflection and 
-            action.get("action") != "Finish" and 
-            not result.should_finish):
+        if self.agent_config.enable_reflection and not finished:
             
             # Check if we should only reflect on failures
             should_reflect = True
@@ -734,7 +814,7 @@ class PhoneAgent:
             
             if should_reflect:
                 try:
-                    reflection_result = await self.reflect(action_type=action["action"], action_description=list(response.action.keys())[0], before_screenshot=before_screenshot)
+                    reflection_result = await self.reflect(action_type=action["action"], action_description=list(response.action.keys())[0], before_observation=observation, after_observation=after_observation)
                     
                     # Update node_action with reflection result
                     if reflection_result and 'node_action' in locals():
@@ -855,21 +935,11 @@ class PhoneAgent:
             success=result.success,
         )
 
-        # Check if finished
-        finished = action.get("action") == "Finish" or result.should_finish
-        
-        
         # Cache the after-action screenshot for next step's before_screenshot
         # This avoids redundant screenshot capture in consecutive steps
-        if not finished:
-            try:
-                self._last_screenshot = await device_factory.get_screenshot(device_id=self.agent_config.device_id)
-                if self.agent_config.verbose:
-                    print("📸 Cached after-action screenshot for next step")
-            except Exception as e:
-                if self.agent_config.verbose:
-                    print(f"Failed to cache screenshot: {e}")
-                self._last_screenshot = None
+        self._last_observation = after_observation
+        if after_observation is not None and self.agent_config.verbose:
+            print("📸 Cached after-action screenshot for next step")
 
         if finished:
             recorder.flush()
@@ -971,17 +1041,50 @@ class PhoneAgent:
         if self.agent_config.verbose:
             print(f"💾 Cached planning result for task")
 
+    @staticmethod
+    def _target_resource_id(elements_info: list, element_content: str | None) -> str | None:
+        """Find the resourceId of the element an action targets (element_content from parse_action)."""
+        if not element_content:
+            return None
+        for e in elements_info:
+            if f"{e['resourceId']}/{e['className']}/{e['content']}" == element_content:
+                return e["resourceId"] or None
+        return None
+
+    async def _prepare_image(self, screenshot: Any) -> PreparedImage:
+        """
+        Encode a screenshot for the model using the configured size and format.
+
+        Base64 materialization, decoding, resizing and encoding run in a worker
+        thread. The last result is kept, so reflect() reuses the image the step
+        already prepared for the before screen, and the next step reuses the
+        after image when it reuses the observation.
+        """
+        if self._prepared_image is not None and self._prepared_image[0] is screenshot:
+            return self._prepared_image[1]
+        image = await asyncio.to_thread(
+            lambda: prepare_image(
+                screenshot.base64_data, screenshot.width, screenshot.height, self._image_config
+            )
+        )
+        self._prepared_image = (screenshot, image)
+        return image
+
     async def reflect(
         self,
         action_type: str,
         action_description: str,
-        before_screenshot: Any = None,
+        before_observation: Observation | None = None,
+        after_observation: Observation | None = None,
         is_skill_execution: bool = False,
         is_portal: bool = True,
     ) -> dict[str, Any]:
         """
         Reflect on action execution by comparing before and after interface states.
 
+        after_observation is captured here when not given. The element diff is
+        cached on after_observation (see Observation.ui_diff).
+
         Returns:
             {
                 action_successful: True / False / None,
@@ -1000,7 +1103,7 @@ class PhoneAgent:
         device_factory = await get_device_factory()
 
         # ---------- 1. Validate input ----------
-        if before_screenshot is None:
+        if before_observation is None:
             if self.agent_config.verbose:
                 print("⚠️ Reflect skipped: missing before screenshot")
 
@@ -1019,57 +1122,45 @@ class PhoneAgent:
             }
 
         # ---------- 2. Capture after screenshot ----------
-        current_screenshot = await device_factory.get_screenshot(
-            device_id=self.agent_config.device_id
-        )
+        if after_observation is None:
+            after_observation = await device_factory.get_observation(
+                device_id=self.agent_config.device_id
+            )
+        before_screenshot = before_observation.screenshot
+        current_screenshot = after_observation.screenshot
+
+        # ---------- 2.5 Cheap first stage: perceptual fingerprints ----------
+        before_fingerprint = getattr(before_screenshot, "fingerprint", None)
+        after_fingerprint = getattr(current_screenshot, "fingerprint", None)
+        if before_fingerprint is not None and after_fingerprint is not None:
+            frame_distance = hamming_distance(before_fingerprint, after_fingerprint)
+            if (
+                not is_skill_execution
+                and frame_distance >= self.agent_config.reflect_change_threshold
+            ):
+                if self.agent_config.verbose:
+                    print(f"✅ Screen visibly changed (fingerprint distance {frame_distance}) — atomic action assumed successful")
 
-        # ---------- 3. Extract UI elements ----------
-        if not is_portal:
-            before_elements = [
-                {
-                    "content": e.elem_id,
-                    "checked": e.checked,
-                    "focused": e.focused,
-                    "bbox": e.bbox,
-                }
-                for e in before_screenshot.elements
-            ]
-            after_elements = [
-                {
-                    "content": e.elem_id,
-                    "checked": e.checked,
-                    "focused": e.focused,
-                    "bbox": e.bbox,
-                }
-                for e in current_screenshot.elements
-            ]
-        else:
-            before_elements = [
-                {
-                    "resourceId": e.resourceId,
-                    "className": e.className,
-                    "content": e.content_desc,
-                    "checked": e.state_desc,
-                    "bbox": e.bounds,
-                }
-                for e in before_screenshot.elements
-            ]
-            after_elements = [
-                {
-                    "resourceId": e.resourceId,
-                    "className": e.className,
-                    "content": e.content_desc,
-                    "checked": e.state_desc,
-                    "bbox": e.bounds,
+                interface_changes = f"Screen content changed (fingerprint distance {frame_distance}/64)"
+                return {
+                    "action_successful": True,
+                    "execution_result": "success",
+                    "interface_changes": interface_changes,
+                    "expected_vs_actual": "UI changed consistently with atomic action",
+                    "abnormal_states": "None",
+                    "improvement_suggestions": "",
+                    "confidence_score": 0.9,
+                    "reflection_reasoning": interface_changes,
+                    "used_model_analysis": False,
+                    "elements_before": len(before_screenshot.elements),
+                    "elements_after": len(current_screenshot.elements),
                 }
-                for e in current_screenshot.elements
-            ]
 
-        
+        # ---------- 3. Diff UI elements ----------
+        ui_diff = after_observation.ui_diff(before_observation)
+
         # ---------- 4. Fast-path for atomic actions ----------
-        changes_analysis = self._analyze_interface_changes(
-            before_elements, after_elements
-        )
+        changes_analysis = self._analyze_interface_changes(ui_diff)
 
         has_obvious_changes = changes_analysis.get("has_obvious_changes", False)
         interface_changes = changes_analysis.get("changes_description", "")
@@ -1100,8 +1191,8 @@ class PhoneAgent:
                 "confidence_score": 0.9,
                 "reflection_reasoning": interface_changes,
                 "used_model_analysis": False,
-                "elements_before": len(before_elements),
-                "elements_after": len(after_elements),
+                "elements_before": ui_diff.before_count,
+                "elements_after": ui_diff.after_count,
             }
         elif not has_obvious_changes:
             print("⚠️ Reflect: no obvious UI changes detected")
@@ -1131,17 +1222,21 @@ class PhoneAgent:
     """.strip()
 
         # ---------- 6. Call model ----------
+        before_image = await self._prepare_image(before_screenshot)
+        after_image = await self._prepare_image(current_screenshot)
         reflection_context = [
             MessageBuilder.create_system_message(
                 "You are a professional Android UI reflection module."
             ),
             MessageBuilder.create_user_message(
                 text=f"{reflection_prompt}\n\nBefore screenshot:",
-                image_base64=before_screenshot.base64_data,
+                image_base64=before_image.base64_data,
+                mime_type=before_image.mime_type,
             ),
             MessageBuilder.create_user_message(
                 text="After screenshot:",
-                image_base64=current_screenshot.base64_data,
+                image_base64=after_image.base64_data,
+                mime_type=after_image.mime_type,
             ),
         ]
 
@@ -1167,8 +1262,8 @@ class PhoneAgent:
                     "confidence_score": 0.0,
                     "reflection_reasoning": "Model failed to follow JSON schema",
                     "used_model_analysis": True,
-                    "elements_before": len(before_elements),
-                    "elements_after": len(after_elements),
+                    "elements_before": ui_diff.before_count,
+                    "elements_after": ui_diff.after_count,
                 }
 
             # ---------- 8. Normalize result ----------
@@ -1202,8 +1297,8 @@ class PhoneAgent:
                 "confidence_score": confidence,
                 "reflection_reasoning": reflect_json.get("reasoning", ""),
                 "used_model_analysis": True,
-                "elements_before": len(before_elements),
-                "elements_after": len(after_elements),
+                "elements_before": ui_diff.before_count,
+                "elements_after": ui_diff.after_count,
             }
 
         except Exception as e:
@@ -1221,11 +1316,11 @@ class PhoneAgent:
                 "confidence_score": 0.0,
                 "reflection_reasoning": f"Reflection error: {e}",
                 "used_model_analysis": True,
-                "elements_before": len(before_elements),
-                "elements_after": len(after_elements),
+                "elements_before": ui_diff.before_count,
+                "elements_after": ui_diff.after_count,
             }
 
-    def _analyze_interface_changes(self, before_elements: list, after_elements: list, is_portal: bool=True) -> dict:
+    def _analyze_interface_changes(self, ui_diff: UIDiff) -> dict:
         """Analyze interface changes between before and after states.
         
         Returns:
@@ -1237,43 +1332,23 @@ class PhoneAgent:
             - has_obvious_changes: Boolean indicating if changes are obvious
             - changes_description: String description of changes
         """
-        # Compare element counts
-        element_count_diff = len(after_elements) - len(before_elements)
-        
-        if not is_portal:
-            # Compare element contents (simplified)
-            before_contents = set(elem.get('content', '') for elem in before_elements if elem.get('content', '').strip())
-            after_contents = set(elem.get('content', '') for elem in after_elements if elem.get('content', '').strip())
-        else:
-            before_resourceId = [elem.get('resourceId', '') for elem in before_elements]
-            before_className = [elem.get('className', '') for elem in before_elements]
-            before_content = [elem.get('content', '') for elem in before_elements]
-
-            after_resourceId = [elem.get('resourceId', '') for elem in after_elements]
-            after_className = [elem.get('className', '') for elem in after_elements]
-            after_content = [elem.get('content', '') for elem in after_elements]
+        element_count_diff = ui_diff.count_diff
 
-            before_contents = set(zip(before_resourceId, before_className, before_content))
-            after_contents = set(zip(after_resourceId, after_className, after_content))
-        
-        new_contents = after_contents - before_contents
-        removed_contents = before_contents - after_contents
+        # (resourceId, className, content) of the added and removed elements
+        new_contents = {element_identity(elem) for elem in ui_diff.added}
+        removed_contents = {element_identity(elem) for elem in ui_diff.removed}
         
         # Compare element states
-        # print(f"Comparing element states...")
-        state_changes = self._compare_element_states(before_elements, after_elements)
-        # print(f"state changes: {state_changes}")
+        state_changes = self._compare_element_states(ui_diff)
         # Determine if changes are obvious
         has_obvious_changes = self._determine_obvious_changes(
             element_count_diff, new_contents, removed_contents, state_changes
         )
-        # print(f"Has obvious changes: {has_obvious_changes}")
         
         # Build description
         changes_description = self._build_changes_description(
             element_count_diff, new_contents, removed_contents, state_changes
         )
-        # print(f"Changes Description: {changes_description}")
         
         return {
             'element_count_diff': element_count_diff,
@@ -1284,98 +1359,40 @@ class PhoneAgent:
             'changes_description': changes_description
         }
 
-
-
-    def _compare_element_states(self, before_elements: list, after_elements: list, is_portal: bool=True) -> list:
-        """Compare states of elements between before and after states."""
+    @staticmethod
+    def _compare_element_states(ui_diff: UIDiff) -> list:
+        """Describe state changes, moves and active elements that appeared or disappeared."""
         changes = []
-        
-        # Create dictionaries for quick lookup using content and bbox for better matching
-        def create_element_key(elem):
-            if is_portal:
-                # For portal, combine resourceId, className and content_desc to form content
-                resource_id = elem.get('resourceId', '')
-                class_name = elem.get('className', '')
-                content_desc = elem.get('content', '')
-                
-                # Combine all three with a separator
-                content = f"{resource_id}|{content_desc}|{class_name}".strip('|')
-            else:
-                content = elem.get('content', '')
-            bbox = elem.get('bbox', [])
-            # Use content and approximate position for matching
-            if bbox and len(bbox) >= 4:
-                return f"{content}_{int(bbox[0]/10)}_{int(bbox[1]/10)}"  # Approximate position
-            return content
-        
-        before_dict = {create_element_key(elem): elem for elem in before_elements}
-        after_dict = {create_element_key(elem): elem for elem in after_elements}
-        
-        # Find elements that exist in both lists and compare their states
-        common_keys = set(before_dict.keys()) & set(after_dict.keys())
-        
-        for key in common_keys:
-            before_elem = before_dict[key]
-            after_elem = after_dict[key]
-            
-            # Compare option state (this is the actual field used in the data structure)
-            before_option = before_elem.get('checked', "")
-            after_option = after_elem.get('checked', "")
-            
-            
-            
+
+        for before_elem, after_elem in ui_diff.state_changed:
+            content = element_label(before_elem)
+            if not content.strip():  # Only report changes for elements with meaningful content
+                continue
+            before_option, before_focused = element_state(before_elem)
+            after_option, after_focused = element_state(after_elem)
             if before_option != after_option:
-                content = before_elem.get('content', 'Unknown element')
-                # print(f"Content: {content}, before_option: {before_option}, after_option: {after_option}")
-                if content.strip():  # Only report changes for elements with meaningful content
-                    # if before_option is None and after_option is not None:
-                    #     changes.append(f"Element '{content}' became active/selected")
-                    # elif before_option is not None and after_option is None:
-                    #     changes.append(f"Element '{content}' became inactive/deselected")
-                    # elif before_option != after_option:
-                    #     status = "activated" if after_option else "deactivated"
-                    #     changes.append(f"Element '{content}' {status}")
-                    changes.append(f"Element '{content}' {after_option}")
-            
-            # Compare focused state (this is the actual field used in the data structure)
-            if not is_portal:      
-                before_focused = before_elem.get('focused', None)
-                after_focused = after_elem.get('focused', None)
-
-                if before_focused != after_focused:
-                    if before_focused == "enabled" and after_focused == "disabled":
-                        before_content = before_elem.get('content', 'Unknown element')
-                        # print(f"Element '{before_content}' lost focus")
-                        changes.append(f"Element '{before_content}' lost focus")
-                    elif before_focused == "disabled" and after_focused == "enabled":
-                        after_content = after_elem.get('content', 'Unknown element')
-                        # print(f"Element '{after_content}' gained focus")
-                        changes.append(f"Element '{after_content}' gained focus")
+                changes.append(f"Element '{content}' {after_option}")
+            if before_focused == "enabled" and after_focused == "disabled":
+                changes.append(f"Element '{content}' lost focus")
+            elif before_focused == "disabled" and after_focused == "enabled":
+                changes.append(f"Element '{content}' gained focus")
+
+        for before_elem, _ in ui_diff.moved:
+            content = element_label(before_elem)
+            if content.strip():
+                changes.append(f"Element '{content}' moved")
 
-        
-        # Also check for elements that appeared or disappeared with specific states
-        before_keys = set(before_dict.keys())
-        after_keys = set(after_dict.keys())
-        
         # New elements with active states
-        new_keys = after_keys - before_keys
-        
-        for key in new_keys:
-            elem = after_dict[key]
-            if elem.get('checked') is not None:
-                content = elem.get('content', 'Unknown element')
-                if content.strip():
-                    changes.append(f"New active element appeared: '{content}'")
-        
+        for elem in ui_diff.added:
+            content = element_label(elem)
+            if element_state(elem)[0] is not None and content.strip():
+                changes.append(f"New active element appeared: '{content}'")
+
         # Disappeared elements that were active
-        removed_keys = before_keys - after_keys
-        for key in removed_keys:
-            elem = before_dict[key]
-            if elem.get('checked') is not None:
-                content = elem.get('content', 'Unknown element')
-                if content.strip():
-                    changes.append(f"Active element disappeared: '{content}'")
-        # print(f"Changes: {changes}")
+        for elem in ui_diff.removed:
+            content = element_label(elem)
+            if element_state(elem)[0] is not None and content.strip():
+                changes.append(f"Active element disappeared: '{content}'")
         return changes
 
     def _determine_obvious_changes(self, element_count_diff: int, new_contents: set, 
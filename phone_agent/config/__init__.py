@@ -12,6 +12,7 @@ from phone_agent.config.timing import (
     ActionTimingConfig,
     ConnectionTimingConfig,
     DeviceTimingConfig,
+    SettleTimingConfig,
     TimingConfig,
     get_timing_config,
     update_timing_config,
@@ -50,6 +51,7 @@ __all__ = [
     "TimingConfig",
     "ActionTimingConfig",
     "DeviceTimingConfig",
+    "SettleTimingConfig",
     "ConnectionTimingConfig",
     "get_timing_config",
     "update_timing_config",
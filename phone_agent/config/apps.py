@@ -218,6 +218,12 @@ APP_PACKAGES: dict[str, str] = {
 }
 
 
+# Reverse lookup, the first app name listed for a package wins
+PACKAGE_APP_NAMES: dict[str, str] = {}
+for _name, _package in APP_PACKAGES.items():
+    PACKAGE_APP_NAMES.setdefault(_package, _name)
+
+
 def get_package_name(app_name: str) -> str | None:
     """
     Get the package name for an app.
@@ -241,10 +247,7 @@ def get_app_name(package_name: str) -> str | None:
     Returns:
         The display name of the app, or None if not found.
     """
-    for name, package in APP_PACKAGES.items():
-        if package == package_name:
-            return name
-    return None
+    return PACKAGE_APP_NAMES.get(package_name)
 
 
 def list_supported_apps() -> list[str]:
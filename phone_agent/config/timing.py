@@ -13,24 +13,20 @@ class ActionTimingConfig:
     """Configuration for action handler timing delays."""
 
     # Text input related delays (in seconds)
-    keyboard_switch_delay: float = 1.0  # Delay after switching to ADB keyboard
-    text_clear_delay: float = 1.0  # Delay after clearing text
-    text_input_delay: float = 1.0  # Delay after typing text
-    keyboard_restore_delay: float = 1.0  # Delay after restoring original keyboard
+    keyboard_switch_delay: float = 1.0  # Delay after switching to the input keyboard (once per session)
+    text_input_delay: float = 1.0  # Maximum wait for the UI to settle after typing text
+    batch_step_wait: float = 0.3  # Wait between actions run as one batch (ActionHandler.execute_batch)
 
     def __post_init__(self):
         """Load values from environment variables if present."""
         self.keyboard_switch_delay = float(
             os.getenv("PHONE_AGENT_KEYBOARD_SWITCH_DELAY", self.keyboard_switch_delay)
         )
-        self.text_clear_delay = float(
-            os.getenv("PHONE_AGENT_TEXT_CLEAR_DELAY", self.text_clear_delay)
-        )
         self.text_input_delay = float(
             os.getenv("PHONE_AGENT_TEXT_INPUT_DELAY", self.text_input_delay)
         )
-        self.keyboard_restore_delay = float(
-            os.getenv("PHONE_AGENT_KEYBOARD_RESTORE_DELAY", self.keyboard_restore_delay)
+        self.batch_step_wait = float(
+            os.getenv("PHONE_AGENT_BATCH_STEP_WAIT", self.batch_step_wait)
         )
 
 
@@ -85,6 +81,10 @@ class ConnectionTimingConfig:
     server_restart_delay: float = (
         1.0  # Wait time between killing and starting ADB server
     )
+    # Deadline of a shell command run without an explicit timeout, so a hung
+    # command (or an unbalanced quote in the persistent shell) cannot block
+    # the device's shell session forever
+    shell_command_timeout: float = 15.0
 
     def __post_init__(self):
         """Load values from environment variables if present."""
@@ -94,6 +94,51 @@ class ConnectionTimingConfig:
         self.server_restart_delay = float(
             os.getenv("PHONE_AGENT_SERVER_RESTART_DELAY", self.server_restart_delay)
         )
+        self.shell_command_timeout = float(
+            os.getenv("PHONE_AGENT_SHELL_COMMAND_TIMEOUT", self.shell_command_timeout)
+        )
+
+
+@dataclass
+class SettleTimingConfig:
+    """
+    Configuration for waiting until the UI is stable after an action.
+
+    When enabled, the device delays above are deadlines: the screen is sampled
+    every poll_interval and the wait ends as soon as stable_samples
+    consecutive samples agree.
+    """
+
+    enabled: bool = True  # False restores fixed sleeps of the full delay
+    min_wait: float = 0.2  # Wait before the first sample, for the action to take effect
+    poll_interval: float = 0.15  # Time between samples
+    stable_samples: int = 3  # Consecutive agreeing samples that count as settled
+
+    # Learned settle profiles (act_mem): start polling near the usual settle
+    # time of an action and end the wait near its p99
+    learned: bool = True
+    learned_min_samples: int = 5  # Samples needed before a profile is used
+    learned_margin: float = 1.25  # Deadline is p99 times this margin
+    learned_max_wait: float = 5.0  # Upper bound for a learned deadline
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.enabled = os.getenv("PHONE_AGENT_SETTLE", "1" if self.enabled else "0") != "0"
+        self.min_wait = float(os.getenv("PHONE_AGENT_SETTLE_MIN_WAIT", self.min_wait))
+        self.poll_interval = float(
+            os.getenv("PHONE_AGENT_SETTLE_POLL_INTERVAL", self.poll_interval)
+        )
+        self.stable_samples = int(
+            os.getenv("PHONE_AGENT_SETTLE_STABLE_SAMPLES", self.stable_samples)
+        )
+        self.learned = os.getenv("PHONE_AGENT_SETTLE_LEARNED", "1" if self.learned else "0") != "0"
+        self.learned_min_samples = int(
+            os.getenv("PHONE_AGENT_SETTLE_LEARNED_MIN_SAMPLES", self.learned_min_samples)
+        )
+        self.learned_margin = float(os.getenv("PHONE_AGENT_SETTLE_LEARNED_MARGIN", self.learned_margin))
+        self.learned_max_wait = float(
+            os.getenv("PHONE_AGENT_SETTLE_LEARNED_MAX_WAIT", self.learned_max_wait)
+        )
 
 
 @dataclass
@@ -103,12 +148,14 @@ class TimingConfig:
     action: ActionTimingConfig
     device: DeviceTimingConfig
     connection: ConnectionTimingConfig
+    settle: SettleTimingConfig
 
     def __init__(self):
         """Initialize all timing configurations."""
         self.action = ActionTimingConfig()
         self.device = DeviceTimingConfig()
         self.connection = ConnectionTimingConfig()
+        self.settle = SettleTimingConfig()
 
 
 # Global timing configuration instance
@@ -130,6 +177,7 @@ def update_timing_config(
     action: ActionTimingConfig | None = None,
     device: DeviceTimingConfig | None = None,
     connection: ConnectionTimingConfig | None = None,
+    settle: SettleTimingConfig | None = None,
 ) -> None:
     """
     Update the global timing configuration.
@@ -138,6 +186,7 @@ def update_timing_config(
         action: New action timing configuration.
         device: New device timing configuration.
         connection: New connection timing configuration.
+        settle: New UI settle configuration.
 
     Example:
         >>> from phone_agent.config.timing import update_timing_config, ActionTimingConfig
@@ -154,12 +203,15 @@ def update_timing_config(
         TIMING_CONFIG.device = device
     if connection is not None:
         TIMING_CONFIG.connection = connection
+    if settle is not None:
+        TIMING_CONFIG.settle = settle
 
 
 __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "SettleTimingConfig",
     "TimingConfig",
     "TIMING_CONFIG",
     "get_timing_config",
@@ -1,7 +1,7 @@
 """Context manager for structured conversation context."""
 
 import json
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Dict, List, Optional
 from phone_agent.model.client import MessageBuilder
 
@@ -160,12 +160,19 @@ class ScreenshotSection(ContextSection):
     width: int = 0
     height: int = 0
     timestamp: Optional[str] = None
+    mime_type: str = "image/png"
+    unchanged_since_step: Optional[int] = None  # Send a text marker instead of the image
+    title: str = "# Current Screen"
     
     def to_messages(self) -> List[Dict[str, Any]]:
+        if self.unchanged_since_step is not None:
+            return [MessageBuilder.create_user_message(
+                f"{self.title}\n\nScreen unchanged since step {self.unchanged_since_step}."
+            )]
         if not self.image_base64:
             return []
         
-        content = "# Current Screen\n\n"
+        content = f"{self.title}\n\n"
         if self.width and self.height:
             content += f"**Resolution:** {self.width}x{self.height}"
         if self.timestamp:
@@ -174,7 +181,8 @@ class ScreenshotSection(ContextSection):
         
         return [MessageBuilder.create_user_message(
             text=content,
-            image_base64=self.image_base64
+            image_base64=self.image_base64,
+            mime_type=self.mime_type
         )]
 
 
@@ -238,6 +246,9 @@ class StructuredContext:
         self.screenshot = ScreenshotSection()
         self.screen_info = ScreenInfoSection()
         self.speculative_context = SpeculativeContextSection()
+        # Last screenshot set, kept across clear_current_step: while the screen
+        # is unchanged it stays in the history and the current screen is a marker
+        self._last_screenshot: Optional[ScreenshotSection] = None
         
         self._step_count = 0
     
@@ -298,13 +309,30 @@ class StructuredContext:
         image_base64: str,
         width: int = 0,
         height: int = 0,
-        timestamp: Optional[str] = None
+        timestamp: Optional[str] = None,
+        mime_type: str = "image/png"
     ) -> None:
         """Set the current screenshot."""
         self.screenshot.image_base64 = image_base64
         self.screenshot.width = width
         self.screenshot.height = height
         self.screenshot.timestamp = timestamp
+        self.screenshot.mime_type = mime_type
+        self.screenshot.unchanged_since_step = None
+        self._last_screenshot = self.screenshot
+
+    def set_screen_unchanged(self, since_step: int) -> None:
+        """
+        Replace the current screenshot with a "screen unchanged" marker.
+
+        The last screenshot set stays in the history as the screen at
+        since_step, so the marker refers to an image the model still has.
+        """
+        self.screenshot = ScreenshotSection(unchanged_since_step=since_step)
+        if self._last_screenshot is not None:
+            self._last_screenshot = replace(
+                self._last_screenshot, title=f"# Screen at Step {since_step}"
+            )
     
     def set_screen_info(
         self,
@@ -315,9 +343,9 @@ class StructuredContext:
         self.screen_info.current_app = current_app
         self.screen_info.extra_info = extra_info
     
-    def add_screenshot(self, image_base64: str, width: int = 0, height: int = 0, timestamp: Optional[str] = None) -> None:
+    def add_screenshot(self, image_base64: str, width: int = 0, height: int = 0, timestamp: Optional[str] = None, mime_type: str = "image/png") -> None:
         """Add screenshot to context (alias for set_screenshot)."""
-        self.set_screenshot(image_base64, width, height, timestamp)
+        self.set_screenshot(image_base64, width, height, timestamp, mime_type)
     
     def add_screen_info(self, screen_info: Dict[str, Any]) -> None:
         """Add screen info to context."""
@@ -400,6 +428,10 @@ class StructuredContext:
         # 3. History (condensed recent actions)
         messages.extend(self.history.to_messages())
         
+        # Screen the "unchanged" marker below refers to
+        if self.screenshot.unchanged_since_step is not None and self._last_screenshot is not None:
+            messages.extend(self._last_screenshot.to_messages())
+        
         # 4. Reflection (only important insights)
         messages.extend(self.reflection.to_messages())
           
@@ -422,6 +454,7 @@ class StructuredContext:
         self.screenshot = ScreenshotSection()
         self.screen_info = ScreenInfoSection()
         self.speculative_context = SpeculativeContextSection()
+        self._last_screenshot = None
         self._step_count = 0
     
     def get_context_summary(self) -> Dict[str, Any]:
@@ -432,6 +465,7 @@ class StructuredContext:
             "history_entries": len(self.history.entries),
             "reflection_entries": len(self.reflection.entries),
             "has_screenshot": bool(self.screenshot.image_base64),
+            "screen_unchanged_since": self.screenshot.unchanged_since_step,
             "current_app": self.screen_info.current_app,
             "element_count": len(self.screen_info.elements)
         }
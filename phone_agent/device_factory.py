@@ -49,6 +49,18 @@ class DeviceFactory:
         """Get screenshot from device."""
         return await self.module.get_screenshot(prefix, save_dir, device_id, timeout)
 
+    async def get_observation(self, device_id: str | None = None, timeout: int = 10):
+        """Get screenshot, UI elements and current app, captured concurrently."""
+        if hasattr(self.module, "get_observation"):
+            return await self.module.get_observation(device_id, timeout)
+
+        from phone_agent.observation import gather_observation
+
+        return await gather_observation(
+            self.get_screenshot(device_id=device_id, timeout=timeout),
+            self.get_current_app(device_id),
+        )
+
     async def get_current_app(self, device_id: str | None = None) -> str:
         """Get current app name."""
         return await self.module.get_current_app(device_id)
@@ -121,24 +133,27 @@ class DeviceFactory:
         """Restore keyboard."""
         return await self.module.restore_keyboard(ime, device_id)
 
+    async def input_text(
+        self, text: str, device_id: str | None = None, clear: bool = True, enter: bool = False
+    ):
+        """Replace the text of the focused input field (clear, type, enter)."""
+        return await self.module.input_text(text, device_id, clear, enter)
+
+    async def restore_keyboards(self):
+        """Restore the IMEs switched by input_text (call on shutdown)."""
+        if hasattr(self.module, "restore_keyboards"):
+            await self.module.restore_keyboards()
+
     async def list_devices(self):
         """List connected devices."""
         return await self.module.list_devices()
 
     async def shell(self, command: str, device_id: str | None = None) -> str:
         """Execute shell command on device."""
-        import asyncio
-        adb_prefix = ["adb"]
-        if device_id:
-            adb_prefix = ["adb", "-s", device_id]
-        
-        process = await asyncio.create_subprocess_exec(
-            *adb_prefix, "shell", command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
-        return stdout.decode("utf-8").strip()
+        from phone_agent.adb.transport import adb_shell
+
+        output = await adb_shell(command, device_id)
+        return output.strip()
 
     async def list_packages(self, device_id: str | None = None) -> list[str]:
         """List installed packages on device."""
@@ -0,0 +1,103 @@
+"""Perceptual screen fingerprints (dHash / pHash) for cheap change detection."""
+
+import math
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image
+
+
+FINGERPRINT_BITS = 64
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """
+    Difference hash: compare horizontally adjacent pixels of a tiny grayscale image.
+
+    Args:
+        img: Image to fingerprint.
+        hash_size: Hash grid size, the hash has hash_size**2 bits.
+
+    Returns:
+        Fingerprint as an int.
+    """
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.BOX)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+
+def phash(img: Image.Image, hash_size: int = 8, sample_size: int = 32) -> int:
+    """
+    Perceptual hash: sign of the low-frequency DCT coefficients against their median.
+
+    More robust than dHash to small shifts and re-encoding, at a higher CPU cost.
+
+    Args:
+        img: Image to fingerprint.
+        hash_size: Number of low frequencies kept per axis.
+        sample_size: Size of the grayscale image the DCT runs on.
+
+    Returns:
+        Fingerprint as an int.
+    """
+    small = img.convert("L").resize((sample_size, sample_size), Image.BOX)
+    pixels = list(small.getdata())
+    cos_table = _dct_table(sample_size, hash_size)
+
+    # Separable 2D DCT-II, only the hash_size lowest frequencies per axis
+    rows = [
+        [sum(pixels[y * sample_size + x] * cos_table[u][x] for x in range(sample_size)) for u in range(hash_size)]
+        for y in range(sample_size)
+    ]
+    coeffs = [
+        sum(rows[y][u] * cos_table[v][y] for y in range(sample_size))
+        for v in range(hash_size)
+        for u in range(hash_size)
+    ]
+
+    # Skip the DC term when computing the median, it dominates the rest
+    median = sorted(coeffs[1:])[len(coeffs[1:]) // 2]
+    value = 0
+    for c in coeffs:
+        value = (value << 1) | (c > median)
+    return value
+
+
+def fingerprint_png(data: bytes, method: str = "dhash") -> int:
+    """
+    Fingerprint PNG bytes.
+
+    Args:
+        data: Encoded image.
+        method: "dhash" or "phash".
+
+    Returns:
+        Fingerprint as an int.
+    """
+    img = Image.open(BytesIO(data))
+    if method == "phash":
+        return phash(img)
+    return dhash(img)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+def fingerprints_match(a: int | None, b: int | None, threshold: int = 2) -> bool:
+    """Whether two fingerprints are within threshold bits. Missing fingerprints never match."""
+    if a is None or b is None:
+        return False
+    return hamming_distance(a, b) <= threshold
+
+
+@lru_cache(maxsize=4)
+def _dct_table(n: int, k: int) -> list:
+    """cos((2x + 1) u pi / 2n) for u < k, x < n."""
+    return [[math.cos((2 * x + 1) * u * math.pi / (2 * n)) for x in range(n)] for u in range(k)]
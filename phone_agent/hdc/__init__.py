@@ -21,6 +21,7 @@ from phone_agent.hdc.device import (
 from phone_agent.hdc.input import (
     clear_text,
     detect_and_set_adb_keyboard,
+    input_text,
     restore_keyboard,
     type_text,
 )
@@ -34,6 +35,7 @@ __all__ = [
     "clear_text",
     "detect_and_set_adb_keyboard",
     "restore_keyboard",
+    "input_text",
     # Device control
     "get_current_app",
     "tap",
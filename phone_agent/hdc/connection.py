@@ -3,7 +3,6 @@
 import asyncio
 import os
 import subprocess
-import time
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
@@ -128,11 +127,11 @@ class HDCConnection:
     Example:
         >>> conn = HDCConnection()
         >>> # Connect to remote device
-        >>> conn.connect("192.168.1.100:5555")
+        >>> await conn.connect("192.168.1.100:5555")
         >>> # List devices
-        >>> devices = conn.list_devices()
+        >>> devices = await conn.list_devices()
         >>> # Disconnect
-        >>> conn.disconnect("192.168.1.100:5555")
+        >>> await conn.disconnect("192.168.1.100:5555")
     """
 
     def __init__(self, hdc_path: str = "hdc"):
@@ -144,7 +143,7 @@ class HDCConnection:
         """
         self.hdc_path = hdc_path
 
-    def connect(self, address: str, timeout: int = 10) -> tuple[bool, str]:
+    async def connect(self, address: str, timeout: int = 10) -> tuple[bool, str]:
         """
         Connect to a remote device via TCP/IP.
 
@@ -163,7 +162,7 @@ class HDCConnection:
             address = f"{address}:5555"  # Default HDC port
 
         try:
-            result = _run_hdc_command(
+            result = await _run_hdc_command_async(
                 [self.hdc_path, "tconn", address],
                 capture_output=True,
                 text=True,
@@ -202,7 +201,7 @@ class HDCConnection:
                 devices = await self.list_devices()
                 for device in devices:
                     if ":" in device.device_id:  # Remote device
-                        _run_hdc_command(
+                        await _run_hdc_command_async(
                             [self.hdc_path, "tdisconn", device.device_id],
                             capture_output=True,
                             text=True,
@@ -210,7 +209,7 @@ class HDCConnection:
                         )
                 return True, "Disconnected all remote devices"
 
-            result = _run_hdc_command(cmd, capture_output=True, text=True, encoding="utf-8", timeout=5)
+            result = await _run_hdc_command_async(cmd, capture_output=True, text=True, encoding="utf-8", timeout=5)
 
             output = result.stdout + result.stderr
             return True, output.strip() or "Disconnected"
@@ -309,7 +308,7 @@ class HDCConnection:
 
         return any(d.device_id == device_id for d in devices)
 
-    def enable_tcpip(
+    async def enable_tcpip(
         self, port: int = 5555, device_id: str | None = None
     ) -> tuple[bool, str]:
         """
@@ -334,12 +333,12 @@ class HDCConnection:
                 cmd.extend(["-t", device_id])
             cmd.extend(["tmode", "port", str(port)])
 
-            result = _run_hdc_command(cmd, capture_output=True, text=True, encoding="utf-8", timeout=10)
+            result = await _run_hdc_command_async(cmd, capture_output=True, text=True, encoding="utf-8", timeout=10)
 
             output = result.stdout + result.stderr
 
             if result.returncode == 0 or "success" in output.lower():
-                time.sleep(TIMING_CONFIG.connection.adb_restart_delay)
+                await asyncio.sleep(TIMING_CONFIG.connection.adb_restart_delay)
                 return True, f"TCP/IP mode enabled on port {port}"
             else:
                 return False, output.strip()
@@ -347,7 +346,7 @@ class HDCConnection:
         except Exception as e:
             return False, f"Error enabling TCP/IP: {e}"
 
-    def get_device_ip(self, device_id: str | None = None) -> str | None:
+    async def get_device_ip(self, device_id: str | None = None) -> str | None:
         """
         Get the IP address of a connected device.
 
@@ -363,7 +362,7 @@ class HDCConnection:
                 cmd.extend(["-t", device_id])
             cmd.extend(["shell", "ifconfig"])
 
-            result = _run_hdc_command(cmd, capture_output=True, text=True, encoding="utf-8", timeout=5)
+            result = await _run_hdc_command_async(cmd, capture_output=True, text=True, encoding="utf-8", timeout=5)
 
             # Parse IP from ifconfig output
             for line in result.stdout.split("\n"):
@@ -386,7 +385,7 @@ class HDCConnection:
             print(f"Error getting device IP: {e}")
             return None
 
-    def restart_server(self) -> tuple[bool, str]:
+    async def restart_server(self) -> tuple[bool, str]:
         """
         Restart the HDC server.
 
@@ -395,14 +394,14 @@ class HDCConnection:
         """
         try:
             # Kill server
-            _run_hdc_command(
+            await _run_hdc_command_async(
                 [self.hdc_path, "kill"], capture_output=True, timeout=5
             )
 
-            time.sleep(TIMING_CONFIG.connection.server_restart_delay)
+            await asyncio.sleep(TIMING_CONFIG.connection.server_restart_delay)
 
             # Start server (HDC auto-starts when running commands)
-            _run_hdc_command(
+            await _run_hdc_command_async(
                 [self.hdc_path, "start", "-r"], capture_output=True, timeout=5
             )
 
@@ -412,7 +411,7 @@ class HDCConnection:
             return False, f"Error restarting server: {e}"
 
 
-def quick_connect(address: str) -> tuple[bool, str]:
+async def quick_connect(address: str) -> tuple[bool, str]:
     """
     Quick helper to connect to a remote device.
 
@@ -423,7 +422,7 @@ def quick_connect(address: str) -> tuple[bool, str]:
         Tuple of (success, message).
     """
     conn = HDCConnection()
-    return conn.connect(address)
+    return await conn.connect(address)
 
 
 async def list_devices() -> list[DeviceInfo]:
@@ -1,17 +1,17 @@
 """Device control utilities for HarmonyOS automation."""
 
+import asyncio
 import os
-import subprocess
-import time
 import re
 from typing import List, Optional, Tuple
 
 from phone_agent.config.apps_harmonyos import APP_ABILITIES, APP_PACKAGES
 from phone_agent.config.timing import TIMING_CONFIG
-from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.hdc.connection import _run_hdc_command_async
+from phone_agent.settle import SettleResult, wait_until_stable
 
 
-def get_current_app(device_id: str | None = None) -> str:
+async def get_current_app(device_id: str | None = None) -> str:
     """
     Get the currently focused app name.
 
@@ -24,7 +24,7 @@ def get_current_app(device_id: str | None = None) -> str:
     hdc_prefix = _get_hdc_prefix(device_id)
 
     # Use 'aa dump -l' to list running abilities
-    result = _run_hdc_command(
+    result = await _run_hdc_command_async(
         hdc_prefix + ["shell", "aa", "dump", "-l"],
         capture_output=True,
         text=True,
@@ -79,7 +79,7 @@ def get_current_app(device_id: str | None = None) -> str:
     return "System Home"
 
 
-def tap(
+async def tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
 ) -> None:
     """
@@ -89,7 +89,8 @@ def tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after tap. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after tap. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_tap_delay
@@ -97,14 +98,14 @@ def tap(
     hdc_prefix = _get_hdc_prefix(device_id)
 
     # HarmonyOS uses uitest uiInput click
-    _run_hdc_command(
+    await _run_hdc_command_async(
         hdc_prefix + ["shell", "uitest", "uiInput", "click", str(x), str(y)],
         capture_output=True
     )
-    time.sleep(delay)
+    await _settle("tap", device_id, delay)
 
 
-def double_tap(
+async def double_tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
 ) -> None:
     """
@@ -114,7 +115,8 @@ def double_tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after double tap. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after double tap. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_double_tap_delay
@@ -122,14 +124,14 @@ def double_tap(
     hdc_prefix = _get_hdc_prefix(device_id)
 
     # HarmonyOS uses uitest uiInput doubleClick
-    _run_hdc_command(
+    await _run_hdc_command_async(
         hdc_prefix + ["shell", "uitest", "uiInput", "doubleClick", str(x), str(y)],
         capture_output=True
     )
-    time.sleep(delay)
+    await _settle("double_tap", device_id, delay)
 
 
-def long_press(
+async def long_press(
     x: int,
     y: int,
     duration_ms: int = 3000,
@@ -144,7 +146,8 @@ def long_press(
         y: Y coordinate.
         duration_ms: Duration of press in milliseconds (note: HarmonyOS longClick may not support duration).
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after long press. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after long press. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_long_press_delay
@@ -153,14 +156,14 @@ def long_press(
 
     # HarmonyOS uses uitest uiInput longClick
     # Note: longClick may have a fixed duration, duration_ms parameter might not be supported
-    _run_hdc_command(
+    await _run_hdc_command_async(
         hdc_prefix + ["shell", "uitest", "uiInput", "longClick", str(x), str(y)],
         capture_output=True,
     )
-    time.sleep(delay)
+    await _settle("long_press", device_id, delay)
 
 
-def swipe(
+async def swipe(
     start_x: int,
     start_y: int,
     end_x: int,
@@ -179,7 +182,8 @@ def swipe(
         end_y: Ending Y coordinate.
         duration_ms: Duration of swipe in milliseconds (auto-calculated if None).
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after swipe. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after swipe. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_swipe_delay
@@ -194,7 +198,7 @@ def swipe(
 
     # HarmonyOS uses uitest uiInput swipe
     # Format: swipe startX startY endX endY duration
-    _run_hdc_command(
+    await _run_hdc_command_async(
         hdc_prefix
         + [
             "shell",
@@ -209,16 +213,17 @@ def swipe(
         ],
         capture_output=True,
     )
-    time.sleep(delay)
+    await _settle("swipe", device_id, delay)
 
 
-def back(device_id: str | None = None, delay: float | None = None) -> None:
+async def back(device_id: str | None = None, delay: float | None = None) -> None:
     """
     Press the back button.
 
     Args:
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after pressing back. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after pressing back. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_back_delay
@@ -226,20 +231,21 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
     hdc_prefix = _get_hdc_prefix(device_id)
 
     # HarmonyOS uses uitest uiInput keyEvent Back
-    _run_hdc_command(
+    await _run_hdc_command_async(
         hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Back"],
         capture_output=True
     )
-    time.sleep(delay)
+    await _settle("back", device_id, delay)
 
 
-def home(device_id: str | None = None, delay: float | None = None) -> None:
+async def home(device_id: str | None = None, delay: float | None = None) -> None:
     """
     Press the home button.
 
     Args:
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after pressing home. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after pressing home. If None,
+            uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_home_delay
@@ -247,14 +253,14 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
     hdc_prefix = _get_hdc_prefix(device_id)
 
     # HarmonyOS uses uitest uiInput keyEvent Home
-    _run_hdc_command(
+    await _run_hdc_command_async(
         hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Home"],
         capture_output=True
     )
-    time.sleep(delay)
+    await _settle("home", device_id, delay)
 
 
-def launch_app(
+async def launch_app(
     app_name: str, device_id: str | None = None, delay: float | None = None
 ) -> bool:
     """
@@ -263,7 +269,8 @@ def launch_app(
     Args:
         app_name: The app name (must be in APP_PACKAGES).
         device_id: Optional HDC device ID.
-        delay: Delay in seconds after launching. If None, uses configured default.
+        delay: Maximum seconds to wait for the UI to settle after launching. If None,
+            uses configured default.
 
     Returns:
         True if app was launched, False if app not found.
@@ -285,7 +292,7 @@ def launch_app(
 
     # HarmonyOS uses 'aa start' command to launch apps
     # Format: aa start -b {bundle} -a {ability}
-    _run_hdc_command(
+    await _run_hdc_command_async(
         hdc_prefix
         + [
             "shell",
@@ -298,10 +305,28 @@ def launch_app(
         ],
         capture_output=True,
     )
-    time.sleep(delay)
+    await _settle("launch_app", device_id, delay)
     return True
 
 
+async def _settle(action: str, device_id: str | None, max_wait: float) -> SettleResult:
+    """Wait until the foreground missions stop changing, at most max_wait seconds."""
+    hdc_prefix = _get_hdc_prefix(device_id)
+
+    async def probe():
+        result = await _run_hdc_command_async(
+            hdc_prefix + ["shell", "aa", "dump", "-l"],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        return result.stdout or None
+
+    return await wait_until_stable(
+        probe, max_wait, action, device_id, lambda a, b: a is not None and a == b
+    )
+
+
 def _get_hdc_prefix(device_id: str | None) -> list:
     """Get HDC command prefix with optional device specifier."""
     if device_id:
@@ -310,4 +335,4 @@ def _get_hdc_prefix(device_id: str | None) -> list:
 
 
 if __name__ == "__main__":
-    print(get_current_app())
\ No newline at end of file
+    print(asyncio.run(get_current_app()))
\ No newline at end of file
@@ -5,7 +5,8 @@ import base64
 import subprocess
 from typing import Optional
 
-from phone_agent.hdc.connection import _run_hdc_command, _run_hdc_command_async
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.hdc.connection import _run_hdc_command_async
 
 
 async def type_text(text: str, device_id: str | None = None) -> None:
@@ -90,6 +91,39 @@ async def clear_text(device_id: str | None = None) -> None:
     )
 
 
+async def input_text(
+    text: str,
+    device_id: str | None = None,
+    clear: bool = True,
+    enter: bool = False,
+    delay: float | None = None,
+) -> None:
+    """
+    Replace the text of the focused input field.
+
+    Args:
+        text: The text to type.
+        device_id: Optional HDC device ID for multi-device setups.
+        clear: Clear the field first.
+        enter: Press enter after typing.
+        delay: Maximum seconds to wait for the UI to settle after typing. If None, uses configured default.
+
+    Note:
+        HarmonyOS types through uitest without switching the IME, so there is
+        no keyboard to switch or restore.
+    """
+    from phone_agent.hdc.device import _settle
+
+    if delay is None:
+        delay = TIMING_CONFIG.action.text_input_delay
+
+    if clear:
+        await clear_text(device_id)
+    # type_text sends an ENTER keyEvent between lines
+    await type_text(text + "\n" if enter else text, device_id)
+    await _settle("type", device_id, delay)
+
+
 async def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
     """
     Detect current keyboard and switch to ADB Keyboard if available.
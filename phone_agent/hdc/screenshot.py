@@ -1,5 +1,6 @@
 """Screenshot utilities for capturing HarmonyOS device screen."""
 
+import asyncio
 import base64
 import os
 import subprocess
@@ -10,7 +11,7 @@ from io import BytesIO
 from typing import Tuple
 
 from PIL import Image
-from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.hdc.connection import _run_hdc_command_async
 
 
 @dataclass
@@ -23,7 +24,7 @@ class Screenshot:
     is_sensitive: bool = False
 
 
-def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
+async def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
     """
     Capture a screenshot from the connected HarmonyOS device.
 
@@ -47,7 +48,7 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         remote_path = "/data/local/tmp/tmp_screenshot.jpeg"
 
         # Try method 1: hdc shell screenshot (newer HarmonyOS versions)
-        result = _run_hdc_command(
+        result = await _run_hdc_command_async(
             hdc_prefix + ["shell", "screenshot", remote_path],
             capture_output=True,
             text=True,
@@ -58,7 +59,7 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         output = result.stdout + result.stderr
         if "fail" in output.lower() or "error" in output.lower() or "not found" in output.lower():
             # Try method 2: snapshot_display (older versions or different devices)
-            result = _run_hdc_command(
+            result = await _run_hdc_command_async(
                 hdc_prefix + ["shell", "snapshot_display", "-f", remote_path],
                 capture_output=True,
                 text=True,
@@ -70,7 +71,7 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
 
         # Pull screenshot to local temp path
         # Note: remote file is JPEG, but PIL can open it regardless of local extension
-        _run_hdc_command(
+        await _run_hdc_command_async(
             hdc_prefix + ["file", "recv", remote_path, temp_path],
             capture_output=True,
             text=True,
@@ -80,27 +81,33 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         if not os.path.exists(temp_path):
             return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read JPEG image and convert to PNG for model inference
-        # PIL automatically detects the image format from file content
-        img = Image.open(temp_path)
-        width, height = img.size
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-        # Cleanup
-        os.remove(temp_path)
-
-        return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
-        )
+        # Decoding and PNG encoding take ~100ms, keep them off the event loop
+        return await asyncio.to_thread(_load_screenshot, temp_path)
 
     except Exception as e:
         print(f"Screenshot error: {e}")
         return _create_fallback_screenshot(is_sensitive=False)
 
 
+def _load_screenshot(temp_path: str) -> Screenshot:
+    """Read the pulled screenshot, convert it to PNG and remove the file."""
+    # Read JPEG image and convert to PNG for model inference
+    # PIL automatically detects the image format from file content
+    img = Image.open(temp_path)
+    width, height = img.size
+
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+    # Cleanup
+    os.remove(temp_path)
+
+    return Screenshot(
+        base64_data=base64_data, width=width, height=height, is_sensitive=False
+    )
+
+
 def _get_hdc_prefix(device_id: str | None) -> list:
     """Get HDC command prefix with optional device specifier."""
     if device_id:
@@ -0,0 +1,130 @@
+"""Event loop lag monitor.
+
+Device commands, screenshot processing and model streaming share one asyncio
+event loop, and several agents may run on the same loop. A synchronous call
+inside a coroutine (subprocess.run, time.sleep, heavy image work) freezes all
+of them. LoopMonitor schedules a heartbeat callback on the loop and watches it
+from a thread: when the heartbeat is late by more than a threshold, the thread
+captures the stack of the blocking code, and a warning with the stack is logged
+once the loop runs again.
+
+Set PHONE_AGENT_LOOP_LAG_WARN to the threshold in seconds, 0 disables the monitor.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+logger = logging.getLogger("loop_monitor")
+
+LOOP_LAG_THRESHOLD = float(os.getenv("PHONE_AGENT_LOOP_LAG_WARN", "0.25"))
+
+
+class LoopMonitor:
+    """
+    Warns when a callback blocks an event loop longer than a threshold.
+
+    Args:
+        loop: The event loop to watch, must run in the thread calling start().
+        threshold: Seconds a callback may hold the loop, defaults to
+            PHONE_AGENT_LOOP_LAG_WARN.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, threshold: float | None = None):
+        self.loop = loop
+        self.threshold = LOOP_LAG_THRESHOLD if threshold is None else threshold
+        self.interval = max(self.threshold / 4, 0.01)  # Heartbeat period
+        self.stalls = 0  # Number of times the threshold was exceeded
+        self.max_lag = 0.0  # Longest block seen, in seconds
+        self._expected = 0.0  # When the next heartbeat is due
+        self._stack: tuple[float, str] | None = None  # (heartbeat due time, stack) of a stall
+        self._loop_thread_id: int | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._stopped = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._watchdog is not None
+
+    def start(self) -> None:
+        """Start the heartbeat and the watchdog thread (call from the loop's thread)."""
+        if self.running or self.threshold <= 0:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._schedule(time.monotonic())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop monitoring."""
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._watchdog = None
+
+    def _schedule(self, now: float) -> None:
+        self._expected = now + self.interval
+        self._handle = self.loop.call_later(self.interval, self._heartbeat)
+
+    def _heartbeat(self) -> None:
+        now = time.monotonic()
+        lag = now - self._expected
+        if lag > self.threshold:
+            self.stalls += 1
+            self.max_lag = max(self.max_lag, lag)
+            stack = self._stack
+            if stack is not None and stack[0] == self._expected:
+                logger.warning(f"Event loop blocked for {lag:.2f}s in:\n{stack[1]}")
+            else:
+                logger.warning(f"Event loop blocked for {lag:.2f}s")
+        self._stack = None
+        if not self._stopped.is_set():
+            self._schedule(now)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if self.loop.is_closed():
+                break
+            expected = self._expected
+            if self._stack is None and time.monotonic() - expected > self.threshold:
+                # The loop thread is stuck in the blocking call right now
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._stack = (expected, "".join(traceback.format_stack(frame, limit=8)))
+
+
+# One monitor per loop, shared by everything running on it
+_monitors: Dict[asyncio.AbstractEventLoop, LoopMonitor] = {}
+_users: Dict[asyncio.AbstractEventLoop, int] = {}
+
+
+@contextmanager
+def monitor_event_loop(threshold: float | None = None) -> Iterator[LoopMonitor]:
+    """
+    Watch the running event loop for the duration of the block.
+
+    Nested and concurrent uses on the same loop share one monitor, which stops
+    when the last block exits.
+    """
+    loop = asyncio.get_running_loop()
+    monitor = _monitors.get(loop)
+    if monitor is None:
+        monitor = _monitors[loop] = LoopMonitor(loop, threshold)
+        monitor.start()
+    _users[loop] = _users.get(loop, 0) + 1
+    try:
+        yield monitor
+    finally:
+        _users[loop] -= 1
+        if not _users[loop]:
+            monitor.stop()
+            del _users[loop], _monitors[loop]
@@ -1,5 +1,18 @@
 """Model client module for AI inference."""
 
 from phone_agent.model.client import ModelClient, ModelConfig
+from phone_agent.model.image import (
+    ImageConfig,
+    PreparedImage,
+    get_image_config,
+    prepare_image,
+)
 
-__all__ = ["ModelClient", "ModelConfig"]
+__all__ = [
+    "ModelClient",
+    "ModelConfig",
+    "ImageConfig",
+    "PreparedImage",
+    "get_image_config",
+    "prepare_image",
+]
@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 from openai import AsyncOpenAI
 
 from phone_agent.config.i18n import get_message
+from phone_agent.model.image import ImageConfig
 from utils.util import print_with_color
 
 
@@ -26,6 +27,7 @@ class ModelConfig:
     frequency_penalty: float = 0.2
     extra_body: dict[str, Any] = field(default_factory=dict)
     lang: str = "en"  # Language for UI messages: 'cn' or 'en'
+    image_config: ImageConfig | None = None  # None uses the per-model default
 
 
 @dataclass
@@ -437,7 +439,7 @@ class MessageBuilder:
 
     @staticmethod
     def create_user_message(
-        text: str, image_base64: str | None = None
+        text: str, image_base64: str | None = None, mime_type: str = "image/png"
     ) -> dict[str, Any]:
         """
         Create a user message with optional image.
@@ -445,6 +447,7 @@ class MessageBuilder:
         Args:
             text: Text content.
             image_base64: Optional base64-encoded image.
+            mime_type: Mime type of the image data.
 
         Returns:
             Message dictionary.
@@ -455,7 +458,7 @@ class MessageBuilder:
             content.append(
                 {
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
+                    "image_url": {"url": f"data:{mime_type};base64,{image_base64}"},
                 }
             )
 
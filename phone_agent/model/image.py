@@ -0,0 +1,165 @@
+"""Model-facing image preparation: downscale, lossy encoding and coordinate remapping."""
+
+import base64
+import os
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image
+
+
+# PIL format name and data URL mime type per supported output format
+_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+
+@dataclass
+class ImageConfig:
+    """
+    How screenshots are encoded before they are sent to the model.
+
+    Args:
+        max_long_side: Downscale so the longer side is at most this many pixels.
+            None keeps the device resolution.
+        format: Output format, one of "png", "jpeg" or "webp".
+        quality: Encoder quality for the lossy formats (1-100).
+    """
+
+    max_long_side: int | None = None
+    format: str = "png"
+    quality: int = 85
+
+    def __post_init__(self):
+        self.format = self.format.lower()
+        if self.format == "jpg":
+            self.format = "jpeg"
+        if self.format not in _FORMATS:
+            raise ValueError(f"Unsupported image format: {self.format}")
+
+
+# Per-model defaults, matched by model name prefix (longest prefix wins)
+MODEL_IMAGE_CONFIGS: dict[str, ImageConfig] = {
+    "autoglm-phone": ImageConfig(max_long_side=1280, format="jpeg", quality=85),
+    "qwen2.5-vl": ImageConfig(max_long_side=1288, format="jpeg", quality=85),
+    "qwen3-vl": ImageConfig(max_long_side=1280, format="jpeg", quality=85),
+    "gpt-4o": ImageConfig(max_long_side=1536, format="jpeg", quality=85),
+}
+
+
+def get_image_config(model_name: str | None) -> ImageConfig:
+    """
+    Get the image config for a model.
+
+    The per-model default can be overridden with the PHONE_AGENT_IMAGE_MAX_SIDE,
+    PHONE_AGENT_IMAGE_FORMAT and PHONE_AGENT_IMAGE_QUALITY environment variables.
+
+    Args:
+        model_name: Model name as sent to the API.
+
+    Returns:
+        ImageConfig for the model, a lossless passthrough config if unknown.
+    """
+    config = ImageConfig()
+    name = (model_name or "").lower()
+    matches = [prefix for prefix in MODEL_IMAGE_CONFIGS if name.startswith(prefix)]
+    if matches:
+        preset = MODEL_IMAGE_CONFIGS[max(matches, key=len)]
+        config = ImageConfig(preset.max_long_side, preset.format, preset.quality)
+
+    max_side = os.getenv("PHONE_AGENT_IMAGE_MAX_SIDE")
+    if max_side is not None:
+        config.max_long_side = int(max_side) or None
+    image_format = os.getenv("PHONE_AGENT_IMAGE_FORMAT")
+    if image_format:
+        config = ImageConfig(config.max_long_side, image_format, config.quality)
+    quality = os.getenv("PHONE_AGENT_IMAGE_QUALITY")
+    if quality:
+        config.quality = int(quality)
+    return config
+
+
+@dataclass
+class PreparedImage:
+    """A screenshot encoded for the model, with the mapping back to device pixels."""
+
+    base64_data: str
+    mime_type: str
+    width: int
+    height: int
+    device_width: int
+    device_height: int
+
+    @property
+    def is_scaled(self) -> bool:
+        """Whether model coordinates differ from device coordinates."""
+        return (self.width, self.height) != (self.device_width, self.device_height)
+
+    def to_device(self, x: float, y: float) -> tuple[int, int]:
+        """Map a point in model image pixels to device pixels."""
+        if not self.is_scaled:
+            return int(x), int(y)
+        return (
+            int(round(x * self.device_width / self.width)),
+            int(round(y * self.device_height / self.height)),
+        )
+
+
+def prepare_image(
+    base64_data: str, width: int, height: int, config: ImageConfig | None = None
+) -> PreparedImage:
+    """
+    Encode a device screenshot for the model.
+
+    A PNG screenshot that needs no resizing is passed through without decoding.
+
+    Args:
+        base64_data: Base64-encoded PNG screenshot.
+        width: Screenshot width in device pixels.
+        height: Screenshot height in device pixels.
+        config: Target resolution and encoding, None for passthrough.
+
+    Returns:
+        PreparedImage ready for MessageBuilder.create_user_message.
+    """
+    config = config or ImageConfig()
+    target_width, target_height = _target_size(width, height, config.max_long_side)
+
+    if config.format == "png" and (target_width, target_height) == (width, height):
+        return PreparedImage(base64_data, "image/png", width, height, width, height)
+
+    img = Image.open(BytesIO(base64.b64decode(base64_data)))
+    if (target_width, target_height) != img.size:
+        # draft() lets the decoder subsample JPEG input before the resize
+        img.draft("RGB", (target_width, target_height))
+        img = img.resize((target_width, target_height), Image.BILINEAR)
+
+    pil_format, mime_type = _FORMATS[config.format]
+    save_kwargs = {}
+    if config.format == "png":
+        save_kwargs["compress_level"] = 1
+    else:
+        img = img.convert("RGB")
+        save_kwargs["quality"] = config.quality
+
+    buffered = BytesIO()
+    img.save(buffered, format=pil_format, **save_kwargs)
+    return PreparedImage(
+        base64_data=base64.b64encode(buffered.getvalue()).decode("utf-8"),
+        mime_type=mime_type,
+        width=target_width,
+        height=target_height,
+        device_width=width,
+        device_height=height,
+    )
+
+
+def _target_size(width: int, height: int, max_long_side: int | None) -> tuple[int, int]:
+    """Compute the downscaled size, keeping the aspect ratio."""
+    long_side = max(width, height)
+    if not max_long_side or long_side <= max_long_side:
+        return width, height
+    scale = max_long_side / long_side
+    return max(1, round(width * scale)), max(1, round(height * scale))
@@ -0,0 +1,73 @@
+"""Observation capture: screenshot, UI tree and foreground app in one call."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, Tuple, TypeVar
+
+from phone_agent.ui_diff import UIDiff, diff_elements
+
+T = TypeVar("T")
+
+
+@dataclass
+class Observation:
+    """
+    Everything the agent observes about the device at one point in time.
+
+    Attributes:
+        screenshot: Device screenshot (with UI elements for ADB devices).
+        current_app: Foreground app name.
+        timings: Wall time in seconds per captured part, plus "total".
+        timestamp: Capture start time (time.time()).
+
+    The UI diff against the previous observation is computed once by ui_diff
+    and cached, so every consumer of the same pair shares it.
+    """
+
+    screenshot: Any
+    current_app: str
+    timings: Dict[str, float] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+    _ui_diff: Tuple[Any, UIDiff] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def ui_diff(self, before: "Observation") -> UIDiff:
+        """UI element changes from the before observation to this one (cached)."""
+        if self._ui_diff is None or self._ui_diff[0] is not before:
+            self._ui_diff = (
+                before,
+                diff_elements(before.screenshot.elements, self.screenshot.elements),
+            )
+        return self._ui_diff[1]
+
+    def format_timings(self) -> str:
+        """Format timings for logging, e.g. 'screenshot 180ms, ui_tree 240ms'."""
+        return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.timings.items())
+
+
+async def timed(name: str, timings: Dict[str, float], awaitable: Awaitable[T]) -> T:
+    """Await a part of an observation and record how long it took, even on failure."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = time.perf_counter() - start
+
+
+async def gather_observation(
+    screenshot: Awaitable[Any], current_app: Awaitable[str]
+) -> Observation:
+    """
+    Build an observation from a screenshot and a current app coroutine run concurrently.
+
+    Used for devices whose screenshot already includes everything else it needs.
+    """
+    timings: Dict[str, float] = {}
+    timestamp = time.time()
+    start = time.perf_counter()
+    results: Tuple[Any, str] = await asyncio.gather(
+        timed("screenshot", timings, screenshot),
+        timed("current_app", timings, current_app),
+    )
+    timings["total"] = time.perf_counter() - start
+    return Observation(results[0], results[1], timings, timestamp)
@@ -3,6 +3,6 @@ Portal UI Provider
 基于 Droidrun Portal 的 UI 处理模块
 """
 
-from .portal_client import PortalClient
+from .portal_client import PortalClient, close_portal_clients, get_portal_client
 
-__all__ = ['PortalClient']
+__all__ = ['PortalClient', 'get_portal_client', 'close_portal_clients']
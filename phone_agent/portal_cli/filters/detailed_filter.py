@@ -1,6 +1,6 @@
 """Detailed filtering - all logic self-contained."""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from .base import TreeFilter
 
 
@@ -25,23 +25,55 @@ class DetailedFilter(TreeFilter):
         screen_width = screen_bounds.get("width", 1080)
         screen_height = screen_bounds.get("height", 2400)
 
-        filtered_tree = a11y_tree
+        return self._filter_tree(a11y_tree, screen_width, screen_height)
 
-        if self.clip_bounds:
-            filtered_tree = self._clip_tree_bounds(
-                filtered_tree, screen_width, screen_height
-            )
-
-        if self.filter_keyboard:
-            filtered_tree = self._filter_keyboard_elements(filtered_tree)
-            if filtered_tree is None:
-                return None
+    def _filter_tree(
+        self, root: Dict[str, Any], screen_width: int, screen_height: int
+    ) -> Optional[Dict[str, Any]]:
+        """Clip bounds, drop keyboard subtrees and prune invisible nodes in one pass.
 
-        filtered_tree = self._filter_out_of_bounds(
-            filtered_tree, screen_width, screen_height
-        )
+        Iterative post-order walk: a node is copied once, after its children
+        are decided. Nodes inside an ``ignoreBoundsFiltering`` subtree are kept
+        regardless of visibility. The input tree is not modified.
+        """
+        if self.filter_keyboard and self._should_filter_keyboard(root):
+            return None
 
-        return filtered_tree
+        # Frames: [node, child iterator, kept children, ignore bounds filtering]
+        result: List[Dict[str, Any]] = []
+        stack = [[root, iter(root.get("children", ())), [],
+                  root.get("ignoreBoundsFiltering") == "true"]]
+        while stack:
+            frame = stack[-1]
+            child = next(frame[1], None)
+            if child is not None:
+                if self.filter_keyboard and self._should_filter_keyboard(child):
+                    continue
+                stack.append([child, iter(child.get("children", ())), [],
+                              frame[3] or child.get("ignoreBoundsFiltering") == "true"])
+                continue
+
+            stack.pop()
+            node, _, children, ignore = frame
+            out = {**node, "children": children}
+            bounds = node.get("boundsInScreen")
+            if self.clip_bounds and bounds is not None:
+                bounds = self._clip_bounds_to_screen(bounds, screen_width, screen_height)
+                out["boundsInScreen"] = bounds
+
+            if not ignore and not children:
+                if bounds is None:
+                    visible_percentage = 0.0
+                else:
+                    visible_percentage = self._get_visible_percentage(
+                        bounds, screen_width, screen_height
+                    )
+                if visible_percentage < self.visibility_threshold:
+                    continue
+
+            (stack[-1][2] if stack else result).append(out)
+
+        return result[0] if result else None
 
     @staticmethod
     def _get_visible_percentage(
@@ -85,75 +117,12 @@ class DetailedFilter(TreeFilter):
             "bottom": min(bounds.get("bottom", 0), screen_height),
         }
 
-    @classmethod
-    def _clip_tree_bounds(
-        cls, node: Dict[str, Any], screen_width: int, screen_height: int
-    ) -> Dict[str, Any]:
-        """Recursively clip all bounds in tree to screen."""
-        if "boundsInScreen" in node:
-            node = {**node}
-            node["boundsInScreen"] = cls._clip_bounds_to_screen(
-                node["boundsInScreen"], screen_width, screen_height
-            )
-
-        if "children" in node:
-            node["children"] = [
-                cls._clip_tree_bounds(child, screen_width, screen_height)
-                for child in node["children"]
-            ]
-
-        return node
-
     @staticmethod
     def _should_filter_keyboard(node: Dict[str, Any]) -> bool:
         """Check if element is from Google keyboard."""
         resource_id = node.get("resourceId", "")
         return resource_id.startswith("com.google.android.inputmethod.latin:id/")
 
-    @classmethod
-    def _filter_keyboard_elements(
-        cls, node: Dict[str, Any]
-    ) -> Optional[Dict[str, Any]]:
-        """Recursively remove keyboard elements from tree."""
-        filtered_children = []
-        for child in node.get("children", []):
-            filtered_child = cls._filter_keyboard_elements(child)
-            if filtered_child is not None:
-                filtered_children.append(filtered_child)
-
-        if cls._should_filter_keyboard(node):
-            return None
-
-        return {**node, "children": filtered_children}
-
-    def _filter_out_of_bounds(
-        self, node: Dict[str, Any], screen_width: int, screen_height: int
-    ) -> Optional[Dict[str, Any]]:
-        """Filter tree by visibility with parent preservation."""
-        if node.get("ignoreBoundsFiltering") == "true":
-            return node
-
-        filtered_children = []
-        for child in node.get("children", []):
-            filtered_child = self._filter_out_of_bounds(
-                child, screen_width, screen_height
-            )
-            if filtered_child is not None:
-                filtered_children.append(filtered_child)
-
-        bounds = node.get("boundsInScreen")
-        if bounds is None:
-            visible_percentage = 0.0
-        else:
-            visible_percentage = self._get_visible_percentage(
-                bounds, screen_width, screen_height
-            )
-
-        if visible_percentage < self.visibility_threshold and not filtered_children:
-            return None
-
-        return {**node, "children": filtered_children}
-
     def get_name(self) -> str:
         """Return filter name."""
         return "detailed"
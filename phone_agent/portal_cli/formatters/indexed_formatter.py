@@ -1,13 +1,19 @@
 """Indexed formatter - Standard DroidRun format."""
 
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from .base import TreeFormatter
-from ..helpers.coordinate import bounds_to_normalized
+from ..helpers.coordinate import to_normalized
 
 
 class IndexedFormatter(TreeFormatter):
     """Format tree in the standard DroidRun format."""
 
+    # Rendered line fragments (everything after "A{index}. ") and record fields
+    # keyed by node fingerprint. Shared across instances so unchanged nodes are
+    # not re-rendered on consecutive steps.
+    _line_cache: Dict[tuple, tuple] = {}
+    _line_cache_size = 4096
+
     def __init__(self):
         self.screen_width: Optional[int] = None
         self.screen_height: Optional[int] = None
@@ -17,19 +23,32 @@ class IndexedFormatter(TreeFormatter):
         self, filtered_tree: Optional[Dict[str, Any]], phone_state: Dict[str, Any]
     ) -> Tuple[str, str, List[Dict[str, Any]], Dict[str, Any]]:
         """Format device state with indices and hierarchy."""
-        focused_text = self._get_focused_text(phone_state)
+        formatted_text, focused_text, a11y_tree, phone_state, _ = self.format_elements(
+            filtered_tree, phone_state
+        )
+        return (formatted_text, focused_text, a11y_tree, phone_state)
 
-        if filtered_tree is None:
-            a11y_tree = []
-        else:
-            a11y_tree = self._flatten_with_index(filtered_tree, [1])
+    def format_elements(
+        self,
+        filtered_tree: Optional[Dict[str, Any]],
+        phone_state: Dict[str, Any],
+        element_factory: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> Tuple[str, str, List[Dict[str, Any]], Dict[str, Any], List[Any]]:
+        """Like format, but also build one element per record in the same pass.
+
+        Records carry numeric bounds in "rect" (x1, y1, x2, y2), matching the
+        "bounds" string. element_factory is called with each record; the
+        results are returned as the last tuple item (empty without a factory).
+        """
+        focused_text = self._get_focused_text(phone_state)
+        a11y_tree, lines, elements = self._flatten_and_render(filtered_tree, element_factory)
 
         phone_state_text = self._format_phone_state(phone_state)
-        ui_elements_text = self._format_ui_elements_text(a11y_tree)
+        ui_elements_text = self._format_ui_elements_text(lines)
 
         formatted_text = f"{phone_state_text}\n\n{ui_elements_text}"
 
-        return (formatted_text, focused_text, a11y_tree, phone_state)
+        return (formatted_text, focused_text, a11y_tree, phone_state, elements)
 
     @staticmethod
     def _get_focused_text(phone_state: Dict[str, Any]) -> str:
@@ -65,102 +84,104 @@ class IndexedFormatter(TreeFormatter):
 
         return phone_state_text
 
-    def _format_ui_elements_text(self, a11y_tree: List[Dict[str, Any]]) -> str:
+    def _format_ui_elements_text(self, lines: List[str]) -> str:
         """Format UI elements text."""
         screen_size = f" (screen size: {self.screen_width}x{self.screen_height})"
         coord_note = " (normalized [0-1000])" if self.use_normalized else screen_size
         schema = "'index. className: content|state|bounds(x1,y1,x2,y2)'"
-        if a11y_tree:
-            formatted_ui = IndexedFormatter._format_ui_elements(a11y_tree)
-            ui_elements_text = (
-                f"Current Clickable UI elements{coord_note}:\n{schema}:\n{formatted_ui}"
-            )
-        else:
-            ui_elements_text = (
-                f"Current Clickable UI elements{coord_note}:\n{schema}:\nNo UI elements found"
-            )
-        return ui_elements_text
-
-    @staticmethod
-    def _format_ui_elements(ui_data: List[Dict[str, Any]], level: int = 0) -> str:
-        """Format UI elements."""
-        if not ui_data:
-            return ""
-
-        formatted_lines = []
-        indent = "  " * level
-
-        elements = ui_data if isinstance(ui_data, list) else [ui_data]
-
-        for element in elements:
-            if not isinstance(element, dict):
-                continue
-
-            index = element.get("index", "")
-            class_name = element.get("className", "")
-            resource_id = element.get("resourceId", "")
-            text = element.get("content_desc", "")
-            bounds = element.get("bounds", "")
-            state = element.get("state_desc", "")
-            children = element.get("children", [])
-
-            line_parts = []
-            if index != "":
-                line_parts.append(f"A{index}.")
-            if class_name:
-                line_parts.append(class_name + ":")
-
-
-            if text:
-                line_parts.append(f'| "{text}"')
-            elif resource_id:
-                line_parts.append(f"| {resource_id}")
-            else:
-                line_parts.append("|")
-
-            if state:
-                line_parts.append(f"| {state}")
-            else:
-                line_parts.append("|")
-
-            if bounds:
-                line_parts.append(f"| ({bounds})")
-            
-
-            formatted_line = f"{indent}{' '.join(line_parts)}"
-            formatted_lines.append(formatted_line)
-
+        formatted_ui = "\n".join(lines) if lines else "No UI elements found"
+        return f"Current Clickable UI elements{coord_note}:\n{schema}:\n{formatted_ui}"
+
+    def _flatten_and_render(
+        self,
+        root: Optional[Dict[str, Any]],
+        element_factory: Optional[Callable[[Dict[str, Any]], Any]],
+    ) -> Tuple[List[Dict[str, Any]], List[str], List[Any]]:
+        """Flatten the tree in pre-order, assigning indices from 1.
+
+        Returns the flat records, their formatted lines and the factory-built
+        elements, produced in a single iterative traversal.
+        """
+        records: List[Dict[str, Any]] = []
+        lines: List[str] = []
+        elements: List[Any] = []
+        if root is None:
+            return records, lines, elements
+
+        normalize = (
+            (self.screen_width, self.screen_height)
+            if self.use_normalized and self.screen_width and self.screen_height
+            else None
+        )
+        cache = IndexedFormatter._line_cache
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            children = node.get("children")
             if children:
-                child_formatted = IndexedFormatter._format_ui_elements(
-                    children, level + 1
-                )
-                if child_formatted:
-                    formatted_lines.append(child_formatted)
-
-        return "\n".join(formatted_lines)
-
-    def _flatten_with_index(
-        self, node: Dict[str, Any], counter: List[int]
-    ) -> List[Dict[str, Any]]:
-        """Recursively flatten tree with index assignment."""
-        results = []
-
-        formatted = self._format_node(node, counter[0])
-        results.append(formatted)
-        counter[0] += 1
-
-        for child in node.get("children", []):
-            results.extend(self._flatten_with_index(child, counter))
+                stack.extend(reversed(children))
+
+            key = self._fingerprint(node, normalize)
+            cached = cache.get(key)
+            if cached is None:
+                cached = self._render_node(node, normalize)
+                if len(cache) >= IndexedFormatter._line_cache_size:
+                    cache.clear()
+                cache[key] = cached
+            fragment, resource_id, short_class, text, bounds_str, rect, state = cached
+
+            index = len(records) + 1
+            record = {
+                "index": index,
+                "resourceId": resource_id,
+                "className": short_class,
+                "content_desc": text,
+                "bounds": bounds_str,
+                "rect": rect,
+                "state_desc": state,
+                "children": [],
+            }
+            records.append(record)
+            lines.append(f"A{index}. {fragment}")
+            if element_factory is not None:
+                elements.append(element_factory(record))
+
+        return records, lines, elements
 
-        return results
-
-    def _format_node(self, node: Dict[str, Any], index: int) -> Dict[str, Any]:
-        """Format single node to DroidRun format."""
+    @staticmethod
+    def _fingerprint(node: Dict[str, Any], normalize: Optional[Tuple[int, int]]) -> tuple:
+        """Key of everything a node's rendered line depends on."""
         bounds = node.get("boundsInScreen", {})
-        bounds_str = f"{bounds.get('left', 0)},{bounds.get('top', 0)},{bounds.get('right', 0)},{bounds.get('bottom', 0)}"
+        return (
+            node.get("className", ""),
+            node.get("resourceId", ""),
+            node.get("text"),
+            node.get("contentDescription"),
+            node.get("stateDescription", ""),
+            bounds.get("left", 0),
+            bounds.get("top", 0),
+            bounds.get("right", 0),
+            bounds.get("bottom", 0),
+            normalize,
+        )
 
-        if self.use_normalized and self.screen_width and self.screen_height:
-            bounds_str = bounds_to_normalized(bounds_str, self.screen_width, self.screen_height)
+    @staticmethod
+    def _render_node(node: Dict[str, Any], normalize: Optional[Tuple[int, int]]) -> tuple:
+        """Render a single node to its line fragment and DroidRun record fields."""
+        bounds = node.get("boundsInScreen", {})
+        rect = (
+            bounds.get("left", 0),
+            bounds.get("top", 0),
+            bounds.get("right", 0),
+            bounds.get("bottom", 0),
+        )
+        if normalize is not None:
+            width, height = normalize
+            rect = (
+                *to_normalized(rect[0], rect[1], width, height),
+                *to_normalized(rect[2], rect[3], width, height),
+            )
+        bounds_str = f"{rect[0]},{rect[1]},{rect[2]},{rect[3]}"
 
         if node.get("contentDescription") and node.get("text"):
             text = node.get("text") + ":" + node.get("contentDescription")
@@ -173,13 +194,19 @@ class IndexedFormatter(TreeFormatter):
 
         class_name = node.get("className", "")
         short_class = class_name.split(".")[-1] if class_name else ""
+        resource_id = node.get("resourceId", "")
+        state = node.get("stateDescription", "")
+
+        line_parts = []
+        if short_class:
+            line_parts.append(short_class + ":")
+        if text:
+            line_parts.append(f'| "{text}"')
+        elif resource_id:
+            line_parts.append(f"| {resource_id}")
+        else:
+            line_parts.append("|")
+        line_parts.append(f"| {state}" if state else "|")
+        line_parts.append(f"| ({bounds_str})")
 
-        return {
-            "index": index,
-            "resourceId": node.get("resourceId", ""),
-            "className": short_class,
-            "content_desc": text,
-            "bounds": bounds_str,
-            "state_desc": node.get("stateDescription", ""),
-            "children": [],
-        }
+        return (" ".join(line_parts), resource_id, short_class, text, bounds_str, rect, state)
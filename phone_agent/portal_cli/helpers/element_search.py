@@ -3,9 +3,16 @@ Element search and filtering for Android accessibility trees.
 
 Provides composable filters to search elements by text, ID, spatial relationships, and traits.
 Works with raw a11y tree data from Portal before index assignment.
+
+Every filter is a query object that can be called with a list of nodes like a
+plain function. A call flattens the input once into a NodeTable (pre-order
+rows with parent links, subtree ranges, bounds and centers) and evaluates the
+whole composed query against it, so nested filters (compose, intersect,
+spatial anchors, hierarchy filters) share one flattening.
 """
 
-from typing import List, Dict, Any, Callable, Tuple
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Callable, Iterator, Tuple
 import re
 
 ElementFilter = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
@@ -15,10 +22,13 @@ ElementFilter = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
 
 
 def flatten_tree(root: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Recursively flatten tree to list of all nodes."""
-    results = [root]
-    for child in root.get("children", []):
-        results.extend(flatten_tree(child))
+    """Flatten tree to list of all nodes (pre-order)."""
+    results = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        results.append(node)
+        stack.extend(reversed(node.get("children", [])))
     return results
 
 
@@ -48,352 +58,458 @@ def sort_by_position(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return sorted(nodes, key=get_sort_key)
 
 
-# ========== FILTERS CLASS ==========
+# ========== NODE TABLE ==========
+
+
+class NodeTable:
+    """
+    Flattened, indexed view of one or more trees.
+
+    Rows are nodes in pre-order; the subtree of row r is rows r..end[r]-1.
+    Bounds and centers are stored per row. Sorted edge indexes for the
+    spatial filters are built on first use.
+    """
+
+    def __init__(self, roots: List[Dict[str, Any]]):
+        self.nodes: List[Dict[str, Any]] = []
+        self.parent: List[int] = []
+        self.end: List[int] = []
+        self.left: List[int] = []
+        self.top: List[int] = []
+        self.right: List[int] = []
+        self.bottom: List[int] = []
+        self.center_x: List[int] = []
+        self.center_y: List[int] = []
+        self._row_of: Dict[int, int] = {}
+        self._indexed_rows = 0
+        self._edges: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._prefix: Dict[int, List[int]] = {}
+        self.roots: List[int] = self.add_roots(roots)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add_roots(self, roots: List[Dict[str, Any]]) -> List[int]:
+        """Append the trees under roots as new rows, return the root rows."""
+        root_rows = []
+        for root in roots:
+            root_rows.append(len(self.nodes))
+            # (node, parent row) in pre-order; None marks the end of a subtree
+            stack: List[Any] = [(root, -1)]
+            open_rows: List[int] = []
+            while stack:
+                item = stack.pop()
+                if item is None:
+                    self.end[open_rows.pop()] = len(self.nodes)
+                    continue
+                node, parent = item
+                row = len(self.nodes)
+                bounds = node.get("boundsInScreen", {})
+                left = bounds.get("left", 0)
+                top = bounds.get("top", 0)
+                right = bounds.get("right", 0)
+                bottom = bounds.get("bottom", 0)
+                self.nodes.append(node)
+                self.parent.append(parent)
+                self.end.append(row + 1)
+                self.left.append(left)
+                self.top.append(top)
+                self.right.append(right)
+                self.bottom.append(bottom)
+                self.center_x.append((left + right) // 2)
+                self.center_y.append((top + bottom) // 2)
+                children = node.get("children", [])
+                if children:
+                    open_rows.append(row)
+                    stack.append(None)
+                    stack.extend((child, row) for child in reversed(children))
+        self._edges = {}
+        self._prefix = {}
+        return root_rows
+
+    def rows_for(self, nodes: List[Dict[str, Any]]) -> List[int]:
+        """Rows of nodes returned by a plain callable filter (appended if unknown)."""
+        row_of = self._row_of
+        rows = []
+        for node in nodes:
+            # Index rows added since the last lookup, keeping the first row of a node
+            for row in range(self._indexed_rows, len(self.nodes)):
+                row_of.setdefault(id(self.nodes[row]), row)
+            self._indexed_rows = len(self.nodes)
+            row = row_of.get(id(node))
+            if row is None:
+                row = self.add_roots([node])[0]
+            rows.append(row)
+        return rows
+
+    def flatten(self, rows: List[int]) -> List[int]:
+        """Rows of the subtrees of rows, like flatten_tree over each node."""
+        if len(rows) == 1:
+            return list(range(rows[0], self.end[rows[0]]))
+        flat: List[int] = []
+        for row in rows:
+            flat.extend(range(row, self.end[row]))
+        return flat
+
+    def is_whole(self, rows: List[int]) -> bool:
+        """Whether rows are exactly the table roots (their subtrees cover every row)."""
+        return bool(rows == self.roots and self.roots and self.end[self.roots[-1]] == len(self.nodes))
+
+    def children(self, row: int) -> Iterator[int]:
+        """Direct child rows of row, in order."""
+        child = row + 1
+        end = self.end[row]
+        while child < end:
+            yield child
+            child = self.end[child]
+
+    def edge_index(self, edge: str) -> Tuple[List[int], List[int]]:
+        """(sorted values, rows in that order) for edge "left"/"top"/"right"/"bottom"."""
+        index = self._edges.get(edge)
+        if index is None:
+            values = getattr(self, edge)
+            order = sorted(range(len(values)), key=values.__getitem__)
+            index = self._edges[edge] = ([values[r] for r in order], order)
+        return index
+
+    def match_counts(self, predicate: "_Predicate") -> List[int]:
+        """Prefix counts of rows matching predicate: rows a..b-1 have counts[b] - counts[a]."""
+        counts = self._prefix.get(id(predicate))
+        if counts is None:
+            counts = [0]
+            total = 0
+            for node in self.nodes:
+                total += predicate.test(node)
+                counts.append(total)
+            self._prefix[id(predicate)] = counts
+        return counts
+
+
+# ========== QUERIES ==========
+
+
+class Query:
+    """A filter evaluated against a NodeTable; calling it runs it on plain nodes."""
+
+    def __call__(self, nodes: List[Dict]) -> List[Dict]:
+        table = NodeTable(nodes)
+        return [table.nodes[row] for row in self.evaluate(table, table.roots)]
+
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        """Result rows for input rows (the rows the nodes list would contain)."""
+        raise NotImplementedError
+
+
+def _evaluate(f: ElementFilter, table: NodeTable, rows: List[int]) -> List[int]:
+    """Evaluate a query on the table, or call a plain filter function on the nodes."""
+    if isinstance(f, Query):
+        return f.evaluate(table, rows)
+    return table.rows_for(f([table.nodes[row] for row in rows]))
+
+
+def _subtree_has_match(
+    f: ElementFilter, table: NodeTable, first: int, end: int, input_rows: Callable[[], List[int]]
+) -> bool:
+    """Whether f matches anything in rows first..end-1, given to f as input_rows()."""
+    if isinstance(f, _Predicate):
+        counts = table.match_counts(f)
+        return counts[end] > counts[first]
+    return bool(_evaluate(f, table, input_rows()))
+
+
+class _Predicate(Query):
+    """Keep the flattened nodes for which test(node) is true."""
+
+    def __init__(self, test: Callable[[Dict], bool]):
+        self.test = test
+
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        test = self.test
+        nodes = table.nodes
+        return [row for row in table.flatten(rows) if test(nodes[row])]
+
+
+class _FlatQuery(Query):
+    """Apply fn(table, flattened rows) to the flattened input."""
+
+    def __init__(self, fn: Callable[[NodeTable, List[int]], List[int]]):
+        self.fn = fn
+
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        return self.fn(table, table.flatten(rows))
+
+
+class _Spatial(Query):
+    """Flattened nodes on one side of the first anchor match, nearest center first."""
+
+    # side -> (edge of candidates, edge of the anchor, candidates must be greater)
+    SIDES = {
+        "below": ("top", "bottom", True),
+        "above": ("bottom", "top", False),
+        "left_of": ("right", "left", False),
+        "right_of": ("left", "right", True),
+    }
 
+    def __init__(self, side: str, anchor_filter: ElementFilter):
+        self.edge, self.anchor_edge, self.greater = self.SIDES[side]
+        self.anchor_filter = anchor_filter
 
-class Filters:
-    """Composable filters for element search."""
-
-    # ========== TEXT MATCHING ==========
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        anchor_rows = _evaluate(self.anchor_filter, table, rows)
+        if not anchor_rows:
+            return []
 
-    @staticmethod
-    def text_matches(pattern: str | re.Pattern) -> ElementFilter:
-        """
-        Match elements by text content in text, contentDescription, or hint fields.
-        Supports exact match, regex, and newline normalization.
-        """
-        if isinstance(pattern, str):
-            regex = re.compile(re.escape(pattern), re.IGNORECASE)
-            pattern_str = pattern
+        anchor = anchor_rows[0]
+        anchor_node = table.nodes[anchor]
+        limit = getattr(table, self.anchor_edge)[anchor]
+        edge = getattr(table, self.edge)
+
+        if table.is_whole(rows):
+            # Half-plane lookup on the sorted edge index instead of a scan
+            values, order = table.edge_index(self.edge)
+            if self.greater:
+                candidates = order[bisect_right(values, limit):]
+            else:
+                candidates = order[:bisect_left(values, limit)]
+            candidates.sort()  # Ties in distance keep document order
+        elif self.greater:
+            candidates = [row for row in table.flatten(rows) if edge[row] > limit]
         else:
-            regex = pattern
-            pattern_str = pattern.pattern
+            candidates = [row for row in table.flatten(rows) if edge[row] < limit]
+
+        ax, ay = table.center_x[anchor], table.center_y[anchor]
+        cx, cy = table.center_x, table.center_y
+        nodes = table.nodes
+        candidates = [row for row in candidates if nodes[row] is not anchor_node]
+        candidates.sort(key=lambda row: (cx[row] - ax) ** 2 + (cy[row] - ay) ** 2)
+        return candidates
+
+
+class _ContainsChild(Query):
+    def __init__(self, child_filter: ElementFilter):
+        self.child_filter = child_filter
+
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        results = []
+        for row in table.flatten(rows):
+            if not table.nodes[row].get("children"):
+                continue
+            if _subtree_has_match(
+                self.child_filter, table, row + 1, table.end[row],
+                lambda: list(table.children(row)),
+            ):
+                results.append(row)
+        return results
+
+
+class _ContainsDescendants(Query):
+    def __init__(self, filters: List[ElementFilter]):
+        self.filters = filters
+
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        return [
+            row
+            for row in table.flatten(rows)
+            if all(
+                _subtree_has_match(
+                    f, table, row, table.end[row], lambda: table.flatten([row])
+                )
+                for f in self.filters
+            )
+        ]
 
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
 
-            results = []
+class _ChildOf(Query):
+    def __init__(self, parent_filter: ElementFilter):
+        self.parent_filter = parent_filter
 
-            for node in all_nodes:
-                text = node.get("text", "")
-                content_desc = node.get("contentDescription", "")
-                hint = node.get("hint", "")
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        results = []
+        for parent in _evaluate(self.parent_filter, table, rows):
+            results.extend(table.children(parent))
+        return results
 
-                for field_value in [text, content_desc, hint]:
-                    if not field_value:
-                        continue
 
-                    # Exact match
-                    if pattern_str == field_value:
-                        results.append(node)
-                        break
+class _Compose(Query):
+    def __init__(self, filters: List[ElementFilter]):
+        self.filters = filters
 
-                    # Regex match
-                    if regex.search(field_value):
-                        results.append(node)
-                        break
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        result = rows
+        for f in self.filters:
+            result = _evaluate(f, table, result)
+            if not result:
+                break
+        return result
 
-                    # Newline-normalized match
-                    normalized = field_value.replace("\n", " ")
-                    if pattern_str == normalized or regex.search(normalized):
-                        results.append(node)
-                        break
 
-            return results
+class _Intersect(Query):
+    def __init__(self, filters: List[ElementFilter]):
+        self.filters = filters
 
-        return filter_fn
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        if not self.filters:
+            return rows
 
-    @staticmethod
-    def id_matches(pattern: str | re.Pattern) -> ElementFilter:
-        """Match elements by resource ID (full or short form)."""
-        if isinstance(pattern, str):
-            regex = re.compile(re.escape(pattern), re.IGNORECASE)
-            pattern_str = pattern
-        else:
-            regex = pattern
-            pattern_str = pattern.pattern
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
+        nodes = table.nodes
+        common_ids = None
+        for f in self.filters:
+            ids = {id(nodes[row]) for row in _evaluate(f, table, rows)}
+            common_ids = ids if common_ids is None else common_ids & ids
+            if not common_ids:
+                return []
 
-            results = []
+        return [row for row in table.flatten(rows) if id(nodes[row]) in common_ids]
+
+
+class _DeepestMatching(Query):
+    def __init__(self, base_filter: ElementFilter):
+        self.base_filter = base_filter
+
+    def evaluate(self, table: NodeTable, rows: List[int]) -> List[int]:
+        base = self.base_filter
+        results = []
+        for root in rows:
+            end = table.end[root]
+            # has[r]: the subtree of r has a match; leaf_match[r]: r is a deepest match
+            has = {}
+            deepest = set()
+            for row in range(end - 1, root - 1, -1):
+                if any(has[child] for child in table.children(row)):
+                    has[row] = True
+                elif isinstance(base, _Predicate):
+                    has[row] = bool(base.test(table.nodes[row]))
+                    if has[row]:
+                        deepest.add(row)
+                else:
+                    has[row] = bool(_evaluate(base, table, [row]))
+                    if has[row]:
+                        deepest.add(row)
+            results.extend(row for row in range(root, end) if row in deepest)
+        return results
 
-            for node in all_nodes:
-                resource_id = node.get("resourceId", "")
 
-                if not resource_id:
-                    continue
+# ========== FILTERS CLASS ==========
 
-                short_id = (
-                    resource_id.split("/")[-1] if "/" in resource_id else resource_id
-                )
 
-                # Check full ID
-                if pattern_str == resource_id or regex.search(resource_id):
-                    results.append(node)
-                    continue
+def _text_pattern(pattern: str | re.Pattern) -> Tuple[re.Pattern, str]:
+    if isinstance(pattern, str):
+        return re.compile(re.escape(pattern), re.IGNORECASE), pattern
+    return pattern, pattern.pattern
 
-                # Check short ID
-                if pattern_str == short_id or regex.search(short_id):
-                    results.append(node)
-
-            return results
 
-        return filter_fn
+class Filters:
+    """Composable filters for element search."""
 
-    # ========== SPATIAL FILTERS ==========
+    # ========== TEXT MATCHING ==========
 
     @staticmethod
-    def below(anchor_filter: ElementFilter) -> ElementFilter:
-        """Find elements positioned below the anchor element."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            anchor_results = anchor_filter(nodes)
-
-            if not anchor_results:
-                return []
-
-            anchor = anchor_results[0]
-            anchor_bounds = anchor.get("boundsInScreen", {})
-            anchor_bottom = anchor_bounds.get("bottom", 0)
-            anchor_center_x, anchor_center_y = get_element_center(anchor)
-
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            candidates = []
-            for node in all_nodes:
-                if node == anchor:
+    def text_matches(pattern: str | re.Pattern) -> ElementFilter:
+        """
+        Match elements by text content in text, contentDescription, or hint fields.
+        Supports exact match, regex, and newline normalization.
+        """
+        regex, pattern_str = _text_pattern(pattern)
+
+        def test(node: Dict) -> bool:
+            for field_value in (
+                node.get("text", ""),
+                node.get("contentDescription", ""),
+                node.get("hint", ""),
+            ):
+                if not field_value:
                     continue
 
-                node_bounds = node.get("boundsInScreen", {})
-                node_top = node_bounds.get("top", 0)
-
-                if node_top > anchor_bottom:
-                    node_center_x, node_center_y = get_element_center(node)
-                    distance = (
-                        (node_center_x - anchor_center_x) ** 2
-                        + (node_center_y - anchor_center_y) ** 2
-                    ) ** 0.5
-                    candidates.append((distance, node))
+                # Exact match, regex match
+                if pattern_str == field_value or regex.search(field_value):
+                    return True
 
-            candidates.sort(key=lambda x: x[0])
-            return [node for dist, node in candidates]
+                # Newline-normalized match
+                normalized = field_value.replace("\n", " ")
+                if pattern_str == normalized or regex.search(normalized):
+                    return True
+            return False
 
-        return filter_fn
+        return _Predicate(test)
 
     @staticmethod
-    def above(anchor_filter: ElementFilter) -> ElementFilter:
-        """Find elements positioned above the anchor element."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            anchor_results = anchor_filter(nodes)
+    def id_matches(pattern: str | re.Pattern) -> ElementFilter:
+        """Match elements by resource ID (full or short form)."""
+        regex, pattern_str = _text_pattern(pattern)
 
-            if not anchor_results:
-                return []
+        def test(node: Dict) -> bool:
+            resource_id = node.get("resourceId", "")
 
-            anchor = anchor_results[0]
-            anchor_bounds = anchor.get("boundsInScreen", {})
-            anchor_top = anchor_bounds.get("top", 0)
-            anchor_center_x, anchor_center_y = get_element_center(anchor)
+            if not resource_id:
+                return False
 
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
+            short_id = (
+                resource_id.split("/")[-1] if "/" in resource_id else resource_id
+            )
 
-            candidates = []
-            for node in all_nodes:
-                if node == anchor:
-                    continue
+            # Check full ID, then short ID
+            return bool(
+                pattern_str == resource_id
+                or regex.search(resource_id)
+                or pattern_str == short_id
+                or regex.search(short_id)
+            )
 
-                node_bounds = node.get("boundsInScreen", {})
-                node_bottom = node_bounds.get("bottom", 0)
+        return _Predicate(test)
 
-                if node_bottom < anchor_top:
-                    node_center_x, node_center_y = get_element_center(node)
-                    distance = (
-                        (node_center_x - anchor_center_x) ** 2
-                        + (node_center_y - anchor_center_y) ** 2
-                    ) ** 0.5
-                    candidates.append((distance, node))
+    # ========== SPATIAL FILTERS ==========
 
-            candidates.sort(key=lambda x: x[0])
-            return [node for dist, node in candidates]
+    @staticmethod
+    def below(anchor_filter: ElementFilter) -> ElementFilter:
+        """Find elements positioned below the anchor element."""
+        return _Spatial("below", anchor_filter)
 
-        return filter_fn
+    @staticmethod
+    def above(anchor_filter: ElementFilter) -> ElementFilter:
+        """Find elements positioned above the anchor element."""
+        return _Spatial("above", anchor_filter)
 
     @staticmethod
     def left_of(anchor_filter: ElementFilter) -> ElementFilter:
         """Find elements positioned left of the anchor element."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            anchor_results = anchor_filter(nodes)
-
-            if not anchor_results:
-                return []
-
-            anchor = anchor_results[0]
-            anchor_bounds = anchor.get("boundsInScreen", {})
-            anchor_left = anchor_bounds.get("left", 0)
-            anchor_center_x, anchor_center_y = get_element_center(anchor)
-
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            candidates = []
-            for node in all_nodes:
-                if node == anchor:
-                    continue
-
-                node_bounds = node.get("boundsInScreen", {})
-                node_right = node_bounds.get("right", 0)
-
-                if node_right < anchor_left:
-                    node_center_x, node_center_y = get_element_center(node)
-                    distance = (
-                        (node_center_x - anchor_center_x) ** 2
-                        + (node_center_y - anchor_center_y) ** 2
-                    ) ** 0.5
-                    candidates.append((distance, node))
-
-            candidates.sort(key=lambda x: x[0])
-            return [node for dist, node in candidates]
-
-        return filter_fn
+        return _Spatial("left_of", anchor_filter)
 
     @staticmethod
     def right_of(anchor_filter: ElementFilter) -> ElementFilter:
         """Find elements positioned right of the anchor element."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            anchor_results = anchor_filter(nodes)
-
-            if not anchor_results:
-                return []
-
-            anchor = anchor_results[0]
-            anchor_bounds = anchor.get("boundsInScreen", {})
-            anchor_right = anchor_bounds.get("right", 0)
-            anchor_center_x, anchor_center_y = get_element_center(anchor)
-
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            candidates = []
-            for node in all_nodes:
-                if node == anchor:
-                    continue
-
-                node_bounds = node.get("boundsInScreen", {})
-                node_left = node_bounds.get("left", 0)
-
-                if node_left > anchor_right:
-                    node_center_x, node_center_y = get_element_center(node)
-                    distance = (
-                        (node_center_x - anchor_center_x) ** 2
-                        + (node_center_y - anchor_center_y) ** 2
-                    ) ** 0.5
-                    candidates.append((distance, node))
-
-            candidates.sort(key=lambda x: x[0])
-            return [node for dist, node in candidates]
-
-        return filter_fn
+        return _Spatial("right_of", anchor_filter)
 
     # ========== TRAIT FILTERS ==========
 
     @staticmethod
     def clickable() -> ElementFilter:
         """Match clickable elements."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [node for node in all_nodes if node.get("isClickable", False)]
-
-        return filter_fn
+        return _Predicate(lambda node: bool(node.get("isClickable", False)))
 
     @staticmethod
     def non_clickable() -> ElementFilter:
         """Match non-clickable elements."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [node for node in all_nodes if not node.get("isClickable", False)]
-
-        return filter_fn
+        return _Predicate(lambda node: not node.get("isClickable", False))
 
     @staticmethod
     def enabled(expected: bool = True) -> ElementFilter:
         """Match elements by enabled state."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [
-                node for node in all_nodes if node.get("isEnabled", False) == expected
-            ]
-
-        return filter_fn
+        return _Predicate(lambda node: node.get("isEnabled", False) == expected)
 
     @staticmethod
     def selected(expected: bool = True) -> ElementFilter:
         """Match elements by selected state."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [
-                node for node in all_nodes if node.get("isSelected", False) == expected
-            ]
-
-        return filter_fn
+        return _Predicate(lambda node: node.get("isSelected", False) == expected)
 
     @staticmethod
     def checked(expected: bool = True) -> ElementFilter:
         """Match elements by checked state."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [
-                node for node in all_nodes if node.get("isChecked", False) == expected
-            ]
-
-        return filter_fn
+        return _Predicate(lambda node: node.get("isChecked", False) == expected)
 
     @staticmethod
     def focused(expected: bool = True) -> ElementFilter:
         """Match elements by focused state."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [
-                node for node in all_nodes if node.get("isFocused", False) == expected
-            ]
-
-        return filter_fn
+        return _Predicate(lambda node: node.get("isFocused", False) == expected)
 
     # ========== SIZE MATCHING ==========
 
@@ -403,143 +519,59 @@ class Filters:
     ) -> ElementFilter:
         """Match elements by size (width and/or height with tolerance)."""
 
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
+        def fn(table: NodeTable, flat: List[int]) -> List[int]:
             results = []
-            for node in all_nodes:
-                bounds = node.get("boundsInScreen", {})
-
-                actual_width = bounds.get("right", 0) - bounds.get("left", 0)
-                actual_height = bounds.get("bottom", 0) - bounds.get("top", 0)
-
+            for row in flat:
                 if width is not None:
-                    if abs(actual_width - width) > tolerance:
+                    if abs(table.right[row] - table.left[row] - width) > tolerance:
                         continue
 
                 if height is not None:
-                    if abs(actual_height - height) > tolerance:
+                    if abs(table.bottom[row] - table.top[row] - height) > tolerance:
                         continue
 
-                results.append(node)
+                results.append(row)
 
             return results
 
-        return filter_fn
+        return _FlatQuery(fn)
 
     # ========== HIERARCHY FILTERS ==========
 
     @staticmethod
     def contains_child(child_filter: ElementFilter) -> ElementFilter:
         """Match elements that contain at least one direct child matching the filter."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            results = []
-
-            for node in all_nodes:
-                children = node.get("children", [])
-
-                if not children:
-                    continue
-
-                matching_children = child_filter(children)
-
-                if matching_children:
-                    results.append(node)
-
-            return results
-
-        return filter_fn
+        return _ContainsChild(child_filter)
 
     @staticmethod
     def contains_descendants(filters: List[ElementFilter]) -> ElementFilter:
         """Match elements that contain ALL specified descendants at any depth."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            results = []
-
-            for node in all_nodes:
-                descendants = flatten_tree(node)
-
-                all_match = True
-
-                for descendant_filter in filters:
-                    matches = descendant_filter(descendants)
-
-                    if not matches:
-                        all_match = False
-                        break
-
-                if all_match:
-                    results.append(node)
-
-            return results
-
-        return filter_fn
+        return _ContainsDescendants(filters)
 
     @staticmethod
     def child_of(parent_filter: ElementFilter) -> ElementFilter:
         """Match elements that are direct children of elements matching the parent filter."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            parents = parent_filter(nodes)
-
-            if not parents:
-                return []
-
-            results = []
-            for parent in parents:
-                results.extend(parent.get("children", []))
-
-            return results
-
-        return filter_fn
+        return _ChildOf(parent_filter)
 
     # ========== UTILITY FILTERS ==========
 
     @staticmethod
     def has_text() -> ElementFilter:
         """Match elements that have non-empty text content."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [
-                node
-                for node in all_nodes
-                if (
-                    node.get("text")
-                    or node.get("contentDescription")
-                    or node.get("hint")
-                )
-            ]
-
-        return filter_fn
+        return _Predicate(
+            lambda node: bool(
+                node.get("text") or node.get("contentDescription") or node.get("hint")
+            )
+        )
 
     @staticmethod
     def clickable_first() -> ElementFilter:
         """Sort elements to put clickable ones first."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return sorted(all_nodes, key=lambda n: not n.get("isClickable", False))
-
-        return filter_fn
+        return _FlatQuery(
+            lambda table, flat: sorted(
+                flat, key=lambda row: not table.nodes[row].get("isClickable", False)
+            )
+        )
 
     # ========== INDEX SELECTION ==========
 
@@ -547,89 +579,31 @@ class Filters:
     def index(idx: int) -> ElementFilter:
         """Select element at index position (supports negative indices)."""
 
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            sorted_nodes = sort_by_position(all_nodes)
+        def fn(table: NodeTable, flat: List[int]) -> List[int]:
+            sorted_rows = sorted(flat, key=lambda row: (table.top[row], table.left[row]))
 
             try:
-                return [sorted_nodes[idx]]
+                return [sorted_rows[idx]]
             except IndexError:
                 return []
 
-        return filter_fn
+        return _FlatQuery(fn)
 
     # ========== COMPOSITION ==========
 
     @staticmethod
     def compose(filters: List[ElementFilter]) -> ElementFilter:
         """Apply filters sequentially (pipeline)."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            result = nodes
-
-            for f in filters:
-                result = f(result)
-
-                if not result:
-                    break
-
-            return result
-
-        return filter_fn
+        return _Compose(filters)
 
     @staticmethod
     def intersect(filters: List[ElementFilter]) -> ElementFilter:
         """Return elements matching ALL filters (AND logic)."""
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            if not filters:
-                return nodes
-
-            result_sets = [set(id(n) for n in filters[0](nodes))]
-
-            for f in filters[1:]:
-                result_ids = set(id(n) for n in f(nodes))
-                result_sets.append(result_ids)
-
-            common_ids = result_sets[0].intersection(*result_sets[1:])
-
-            all_nodes = []
-            for node in nodes:
-                all_nodes.extend(flatten_tree(node))
-
-            return [n for n in all_nodes if id(n) in common_ids]
-
-        return filter_fn
+        return _Intersect(filters)
 
     # ========== DEEPEST MATCHING ==========
 
     @staticmethod
     def deepest_matching(base_filter: ElementFilter) -> ElementFilter:
         """Find the deepest (most specific) matching elements in the tree."""
-
-        def find_deepest_in_node(node: Dict) -> List[Dict]:
-            child_matches = []
-            for child in node.get("children", []):
-                child_matches.extend(find_deepest_in_node(child))
-
-            if child_matches:
-                return child_matches
-
-            current_matches = base_filter([node])
-            if current_matches:
-                return [node]
-
-            return []
-
-        def filter_fn(nodes: List[Dict]) -> List[Dict]:
-            results = []
-
-            for node in nodes:
-                results.extend(find_deepest_in_node(node))
-
-            return results
-
-        return filter_fn
+        return _DeepestMatching(base_filter)
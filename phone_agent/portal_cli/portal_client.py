@@ -2,15 +2,15 @@
 Portal Client - Unified communication layer for DroidRun Portal app.
 
 This module provides automatic TCP/Content Provider fallback for Portal communication.
+Use get_portal_client() to share one keep-alive client per device.
 """
 
-# TODO for future: Add TCP connection management
-
 import asyncio
 import base64
 import io
 import json
 import logging
+import os
 import re
 from typing import Any, Dict, List, Optional
 
@@ -21,6 +21,9 @@ logger = logging.getLogger("portal_client")
 
 PORTAL_REMOTE_PORT = 8080  # Port on device where Portal HTTP server runs
 
+# Prefer the forwarded TCP server over the content provider (set to 0 to disable)
+PORTAL_PREFER_TCP = os.getenv("PHONE_AGENT_PORTAL_TCP", "1") != "0"
+
 
 class PortalClient:
     """
@@ -32,6 +35,7 @@ class PortalClient:
     - Tests connection and sets tcp_available flag
     - All methods auto-select TCP or content provider based on availability
     - Port forwards persist until device disconnect (no explicit cleanup needed)
+    - One keep-alive HTTP connection is reused across calls (call close() when done)
 
     Key features:
     - Reuses existing port forwards (no cleanup needed)
@@ -60,6 +64,7 @@ class PortalClient:
         self.tcp_base_url = None
         self.local_tcp_port = None
         self._connected = False
+        self._http: httpx.AsyncClient | None = None
 
     async def connect(self) -> None:
         """
@@ -73,6 +78,23 @@ class PortalClient:
 
         self._connected = True
 
+    async def close(self) -> None:
+        """Close the keep-alive HTTP connection. The client reconnects on next use."""
+        http, self._http = self._http, None
+        self.tcp_available = False
+        self._connected = False
+        if http is not None:
+            await http.aclose()
+
+    def _client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, so requests reuse one keep-alive connection."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+                timeout=10.0,
+            )
+        return self._http
+
     async def _ensure_connected(self) -> None:
         """Check if connected, raise error if not."""
         if not self._connected:
@@ -155,9 +177,9 @@ class PortalClient:
     async def _test_connection(self) -> bool:
         """Test if TCP connection to Portal is working."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.tcp_base_url}/ping", timeout=5)
-                return response.status_code == 200
+            client = self._client()
+            response = await client.get(f"{self.tcp_base_url}/ping", timeout=5)
+            return response.status_code == 200
         except Exception as e:
             logger.debug(f"TCP connection test failed: {e}")
             return False
@@ -231,36 +253,53 @@ class PortalClient:
     async def _get_state_tcp(self) -> Dict[str, Any]:
         """Get state via TCP."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.tcp_base_url}/state_full", timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
+            client = self._client()
+            response = await client.get(
+                f"{self.tcp_base_url}/state_full", timeout=10
+            )
+            if response.status_code == 200:
+                data = response.json()
 
-                    # Handle nested "result" or "data" field (backward compatible)
-                    if isinstance(data, dict):
-                        # Check for 'result' first (new portal format), then 'data' (legacy)
-                        inner_key = "result" if "result" in data else "data" if "data" in data else None
-                        if inner_key:
-                            inner_value = data[inner_key]
-                            if isinstance(inner_value, str):
-                                try:
-                                    return json.loads(inner_value)
-                                except json.JSONDecodeError:
-                                    pass
-                            elif isinstance(inner_value, dict):
-                                return inner_value
-                    return data
-                else:
-                    logger.debug(
-                        f"TCP get_state failed ({response.status_code}), using fallback"
-                    )
-                    return await self._get_state_content_provider()
+                # Handle nested "result" or "data" field (backward compatible)
+                if isinstance(data, dict):
+                    # Check for 'result' first (new portal format), then 'data' (legacy)
+                    inner_key = "result" if "result" in data else "data" if "data" in data else None
+                    if inner_key:
+                        inner_value = data[inner_key]
+                        if isinstance(inner_value, str):
+                            try:
+                                return json.loads(inner_value)
+                            except json.JSONDecodeError:
+                                pass
+                        elif isinstance(inner_value, dict):
+                            return inner_value
+                return data
+            else:
+                logger.debug(
+                    f"TCP get_state failed ({response.status_code}), using fallback"
+                )
+                return await self._get_state_content_provider()
         except Exception as e:
             logger.debug(f"TCP get_state error: {e}, using fallback")
             return await self._get_state_content_provider()
 
+    async def get_state_digest(self) -> Optional[int]:
+        """
+        Hash of the raw state response, for cheap change detection.
+
+        Only available over TCP: skips JSON parsing, and the content provider
+        is too slow to poll.
+
+        Returns:
+            Hash of the response body, or None without TCP.
+        """
+        await self._ensure_connected()
+        if not self.tcp_available:
+            return None
+        response = await self._client().get(f"{self.tcp_base_url}/state_full", timeout=5)
+        response.raise_for_status()
+        return hash(response.content)
+
     async def _get_state_content_provider(self) -> Dict[str, Any]:
         """Get state via content provider (fallback)."""
         try:
@@ -319,21 +358,21 @@ class PortalClient:
         try:
             encoded = base64.b64encode(text.encode()).decode()
             payload = {"base64_text": encoded, "clear": clear}
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.tcp_base_url}/keyboard/input",
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=10,
+            client = self._client()
+            response = await client.post(
+                f"{self.tcp_base_url}/keyboard/input",
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=10,
+            )
+            if response.status_code == 200:
+                logger.debug("TCP input_text successful")
+                return True
+            else:
+                logger.debug(
+                    f"TCP input_text failed ({response.status_code}), using fallback"
                 )
-                if response.status_code == 200:
-                    logger.debug("TCP input_text successful")
-                    return True
-                else:
-                    logger.debug(
-                        f"TCP input_text failed ({response.status_code}), using fallback"
-                    )
-                    return await self._input_text_content_provider(text, clear)
+                return await self._input_text_content_provider(text, clear)
         except Exception as e:
             logger.debug(f"TCP input_text error: {e}, using fallback")
             return await self._input_text_content_provider(text, clear)
@@ -378,25 +417,25 @@ class PortalClient:
             if not hide_overlay:
                 url += "?hideOverlay=false"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    # Check for 'result' first (new portal format), then 'data' (legacy)
-                    if data.get("status") == "success":
-                        inner_key = "result" if "result" in data else "data" if "data" in data else None
-                        if inner_key:
-                            logger.debug("Screenshot taken via TCP")
-                            return base64.b64decode(data[inner_key])
-                    logger.debug(
-                        "TCP screenshot failed (invalid response), using fallback"
-                    )
-                    return await self._take_screenshot_adb()
-                else:
-                    logger.debug(
-                        f"TCP screenshot failed ({response.status_code}), using fallback"
-                    )
-                    return await self._take_screenshot_adb()
+            client = self._client()
+            response = await client.get(url, timeout=10.0)
+            if response.status_code == 200:
+                data = response.json()
+                # Check for 'result' first (new portal format), then 'data' (legacy)
+                if data.get("status") == "success":
+                    inner_key = "result" if "result" in data else "data" if "data" in data else None
+                    if inner_key:
+                        logger.debug("Screenshot taken via TCP")
+                        return base64.b64decode(data[inner_key])
+                logger.debug(
+                    "TCP screenshot failed (invalid response), using fallback"
+                )
+                return await self._take_screenshot_adb()
+            else:
+                logger.debug(
+                    f"TCP screenshot failed ({response.status_code}), using fallback"
+                )
+                return await self._take_screenshot_adb()
         except Exception as e:
             logger.debug(f"TCP screenshot error: {e}, using fallback")
             return await self._take_screenshot_adb()
@@ -483,17 +522,17 @@ class PortalClient:
         await self._ensure_connected()
         if self.tcp_available:
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"{self.tcp_base_url}/version", timeout=5.0
-                    )
-                    if response.status_code == 200:
-                        data = response.json()
-                        # Check for 'result' first (new portal format), then 'data' (legacy)
-                        inner_key = "result" if "result" in data else "data" if "data" in data else None
-                        if inner_key:
-                            return data[inner_key]
-                        return data.get("status", "unknown")
+                client = self._client()
+                response = await client.get(
+                    f"{self.tcp_base_url}/version", timeout=5.0
+                )
+                if response.status_code == 200:
+                    data = response.json()
+                    # Check for 'result' first (new portal format), then 'data' (legacy)
+                    inner_key = "result" if "result" in data else "data" if "data" in data else None
+                    if inner_key:
+                        return data[inner_key]
+                    return data.get("status", "unknown")
             except Exception:
                 pass
 
@@ -523,32 +562,32 @@ class PortalClient:
         await self._ensure_connected()
         if self.tcp_available:
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"{self.tcp_base_url}/ping", timeout=5.0
-                    )
-                    if response.status_code == 200:
-                        try:
-                            tcp_response = response.json() if response.content else {}
-                            return {
-                                "status": "success",
-                                "method": "tcp",
-                                "url": self.tcp_base_url,
-                                "response": tcp_response,
-                            }
-                        except json.JSONDecodeError:
-                            return {
-                                "status": "success",
-                                "method": "tcp",
-                                "url": self.tcp_base_url,
-                                "response": response.text,
-                            }
-                    else:
+                client = self._client()
+                response = await client.get(
+                    f"{self.tcp_base_url}/ping", timeout=5.0
+                )
+                if response.status_code == 200:
+                    try:
+                        tcp_response = response.json() if response.content else {}
+                        return {
+                            "status": "success",
+                            "method": "tcp",
+                            "url": self.tcp_base_url,
+                            "response": tcp_response,
+                        }
+                    except json.JSONDecodeError:
                         return {
-                            "status": "error",
+                            "status": "success",
                             "method": "tcp",
-                            "message": f"HTTP {response.status_code}: {response.text}",
+                            "url": self.tcp_base_url,
+                            "response": response.text,
                         }
+                else:
+                    return {
+                        "status": "error",
+                        "method": "tcp",
+                        "message": f"HTTP {response.status_code}: {response.text}",
+                    }
             except Exception as e:
                 return {"status": "error", "method": "tcp", "message": str(e)}
         else:
@@ -571,3 +610,57 @@ class PortalClient:
                     "method": "content_provider",
                     "message": str(e),
                 }
+
+
+# One long-lived client per device, created by the event loop that uses it
+_portal_clients: Dict[Optional[str], "asyncio.Task[PortalClient]"] = {}
+
+
+async def _create_portal_client(device_id: Optional[str], prefer_tcp: bool) -> PortalClient:
+    from async_adbutils import adb
+
+    device = await adb.device(serial=device_id)
+    client = PortalClient(device, prefer_tcp=prefer_tcp)
+    await client.connect()
+    return client
+
+
+async def get_portal_client(
+    device_id: Optional[str] = None, prefer_tcp: Optional[bool] = None
+) -> PortalClient:
+    """
+    Get the shared PortalClient for a device, connecting it on first use.
+
+    Concurrent callers share one connection attempt. A client whose creation
+    failed is not cached, so the next call retries.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        prefer_tcp: Use the forwarded TCP server, defaults to PORTAL_PREFER_TCP.
+
+    Returns:
+        Connected PortalClient.
+    """
+    loop = asyncio.get_running_loop()
+    task = _portal_clients.get(device_id)
+    if task is None or task.get_loop() is not loop or _failed(task):
+        if prefer_tcp is None:
+            prefer_tcp = PORTAL_PREFER_TCP
+        task = loop.create_task(_create_portal_client(device_id, prefer_tcp))
+        _portal_clients[device_id] = task
+    return await asyncio.shield(task)
+
+
+async def close_portal_clients() -> None:
+    """Close all shared Portal clients of the running event loop (call on shutdown)."""
+    loop = asyncio.get_running_loop()
+    tasks = [t for t in _portal_clients.values() if t.get_loop() is loop]
+    for device_id in [k for k, t in _portal_clients.items() if t in tasks]:
+        del _portal_clients[device_id]
+    for task in tasks:
+        if task.done() and not _failed(task):
+            await task.result().close()
+
+
+def _failed(task: asyncio.Task) -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
@@ -0,0 +1,243 @@
+"""Adaptive waiting until the UI is stable after an action.
+
+A probe returns a cheap sample of the screen state (a UI tree hash, a frame
+fingerprint, the focused window). wait_until_stable samples it at short
+intervals and returns as soon as enough consecutive samples agree, or when
+the deadline (the old fixed delay) passes.
+
+Within expected_settle, the wait uses a window learned from earlier settle
+times of the same action (see act_mem.SettleProfiles) instead: sampling starts
+shortly before the action usually settles and the deadline is near its p99.
+"""
+
+import asyncio
+import logging
+import operator
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Generator, Iterator, Tuple
+
+from phone_agent.config.timing import TIMING_CONFIG
+
+if TYPE_CHECKING:
+    from act_mem.settle_profile import SettleStats
+
+logger = logging.getLogger("settle")
+
+
+@dataclass
+class SettleResult:
+    """Outcome of waiting for the UI to settle after one action."""
+
+    action: str
+    elapsed: float  # Seconds from the start of the wait until it returned
+    stable: bool  # False if the deadline passed first (or no probe was usable)
+    samples: int = 0
+    finished_at: float = field(default_factory=time.time)
+    learned: bool = False  # Whether a learned window replaced the configured delay
+
+
+@dataclass
+class SettleWindow:
+    """Learned wait window: first sample after start seconds, deadline after deadline seconds."""
+
+    start: float
+    deadline: float
+
+
+# Window for the waits of the action currently executing, see expected_settle
+_window: ContextVar[SettleWindow | None] = ContextVar("settle_window", default=None)
+
+
+def learned_window(stats: "SettleStats | None") -> SettleWindow | None:
+    """
+    Derive the wait window for an action from its recorded settle times.
+
+    Sampling starts at p50 minus the time needed to confirm stability, so a
+    typical action is confirmed right at p50. The deadline is p99 with
+    TIMING_CONFIG.settle.learned_margin, widened once more when the deadline
+    was hit before (those samples underestimate the real settle time).
+
+    Args:
+        stats: Settle statistics of the action, from act_mem.SettleProfiles.
+
+    Returns:
+        SettleWindow, or None to use the configured delay.
+    """
+    config = TIMING_CONFIG.settle
+    if stats is None or not config.learned or stats.count < config.learned_min_samples:
+        return None
+
+    confirm = (config.stable_samples - 1) * config.poll_interval
+    start = max(config.min_wait, stats.p50 - confirm)
+    deadline = stats.p99 * config.learned_margin
+    if stats.deadline_rate > 0:
+        deadline *= config.learned_margin
+    deadline = max(deadline, start + confirm + config.poll_interval)
+    return SettleWindow(min(start, config.learned_max_wait), min(deadline, config.learned_max_wait))
+
+
+@contextmanager
+def expected_settle(window: SettleWindow | None) -> Iterator[None]:
+    """Use a learned window for the settle waits inside the block (None keeps the defaults)."""
+    token = _window.set(window)
+    try:
+        yield
+    finally:
+        _window.reset(token)
+
+
+def _wait_bounds(max_wait: float) -> Tuple[float, float, bool]:
+    """Return (min_wait, max_wait, learned) for a wait, applying the current window."""
+    window = _window.get()
+    if window is None:
+        return TIMING_CONFIG.settle.min_wait, max_wait, False
+    return window.start, window.deadline, True
+
+
+# Most recent result per device, see get_last_settle
+_last_results: Dict[str | None, SettleResult] = {}
+
+
+def get_last_settle(device_id: str | None = None) -> SettleResult | None:
+    """Return the most recent settle result for a device."""
+    return _last_results.get(device_id)
+
+
+def _record(device_id: str | None, result: SettleResult) -> SettleResult:
+    _last_results[device_id] = result
+    logger.debug(
+        f"{result.action} settled in {result.elapsed:.2f}s "
+        f"({'stable' if result.stable else 'deadline'}, {result.samples} samples)"
+    )
+    return result
+
+
+class _Agreement:
+    """Counts consecutive agreeing samples."""
+
+    def __init__(self, same: Callable[[Any, Any], bool]):
+        self.same = same
+        self.samples = 0
+        self.agreeing = 0
+        self.previous = None
+
+    def add(self, sample: Any) -> int:
+        self.agreeing = self.agreeing + 1 if self.samples and self.same(sample, self.previous) else 1
+        self.samples += 1
+        self.previous = sample
+        return self.agreeing
+
+
+def _settle_steps(
+    max_wait: float,
+    action: str,
+    device_id: str | None,
+    same: Callable[[Any, Any], bool],
+) -> Generator[float | None, Any, SettleResult]:
+    """
+    Sampling and stability decision shared by wait_until_stable(_sync).
+
+    Yields the seconds to sleep next, or None for a probe sample, which the
+    caller sends back (or throws in the exception the probe raised). Returns
+    the recorded SettleResult.
+    """
+    config = TIMING_CONFIG.settle
+    start = time.perf_counter()
+
+    if not config.enabled:
+        yield max_wait
+        return _record(device_id, SettleResult(action, time.perf_counter() - start, False))
+
+    min_wait, max_wait, learned = _wait_bounds(max_wait)
+    deadline = start + max_wait
+    if max_wait <= min_wait:
+        yield max_wait
+        return _record(device_id, SettleResult(action, time.perf_counter() - start, False, learned=learned))
+
+    yield min_wait
+    agreement = _Agreement(same)
+    try:
+        while agreement.add((yield None)) < config.stable_samples:
+            if deadline - time.perf_counter() <= config.poll_interval:
+                break
+            yield config.poll_interval
+        else:
+            elapsed = time.perf_counter() - start
+            return _record(device_id, SettleResult(action, elapsed, True, agreement.samples, learned=learned))
+    except Exception as e:
+        logger.debug(f"Settle probe failed ({e}), waiting for the deadline")
+
+    yield max(0.0, deadline - time.perf_counter())
+    elapsed = time.perf_counter() - start
+    return _record(device_id, SettleResult(action, elapsed, False, agreement.samples, learned=learned))
+
+
+async def wait_until_stable(
+    probe: Callable[[], Awaitable[Any]],
+    max_wait: float,
+    action: str = "action",
+    device_id: str | None = None,
+    same: Callable[[Any, Any], bool] = operator.eq,
+) -> SettleResult:
+    """
+    Wait until consecutive probe samples agree, at most max_wait seconds.
+
+    Sampling follows TIMING_CONFIG.settle. If settling is disabled, or the
+    probe fails, this sleeps for the full max_wait like a fixed delay. Inside
+    expected_settle, the learned window replaces min_wait and max_wait.
+
+    Args:
+        probe: Returns a sample of the screen state.
+        max_wait: Deadline in seconds.
+        action: Action name, for reporting.
+        device_id: Device the action ran on, for get_last_settle.
+        same: Whether two samples agree, equality by default.
+
+    Returns:
+        SettleResult with the time spent waiting.
+    """
+    steps = _settle_steps(max_wait, action, device_id, same)
+    try:
+        request = next(steps)
+        while True:
+            if request is not None:
+                await asyncio.sleep(request)
+                request = next(steps)
+                continue
+            try:
+                sample = await probe()
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(sample)
+    except StopIteration as stop:
+        return stop.value
+
+
+def wait_until_stable_sync(
+    probe: Callable[[], Any],
+    max_wait: float,
+    action: str = "action",
+    device_id: str | None = None,
+    same: Callable[[Any, Any], bool] = operator.eq,
+) -> SettleResult:
+    """Blocking variant of wait_until_stable, for synchronous device modules."""
+    steps = _settle_steps(max_wait, action, device_id, same)
+    try:
+        request = next(steps)
+        while True:
+            if request is not None:
+                time.sleep(request)
+                request = next(steps)
+                continue
+            try:
+                sample = probe()
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(sample)
+    except StopIteration as stop:
+        return stop.value
@@ -2,19 +2,11 @@ import os
 import time
 import asyncio
 import importlib.util
-from dataclasses import dataclass
 from .device_factory import get_device_factory
 from typing import List, Dict, Any, Callable, Optional
-from .actions.handler import ActionHandler, finish
+from .actions.handler import SCREEN_CHANGING_ACTIONS, ActionHandler
 from code_generator import extract_element_id
 
-@dataclass
-class StepResult:
-    """Result of a single agent step."""
-
-    success: bool
-    message: str | None = None
-
 class SkillExecutor:
     
     def __init__(
@@ -73,48 +65,61 @@ class SkillExecutor:
         
         if not actions:
             return "Error, No actions provided"
-        
-        result = None
-        for action in actions:
-            result = await self._execute_step(action)
-            # If any action fails, return immediately
-            if not result.success:
-                return f"Error, {result.message}"
 
-        # All actions succeeded
-        if result and result.success:
-            return "Success"
-        
-        return "Error, Unknown error occurred"
+        # Read the screen once per batch of actions instead of once per action
+        start = 0
+        while start < len(actions):
+            device_factory = await get_device_factory()
+            observation = await device_factory.get_observation(device_id=self.device_id)
+            screenshot = observation.screenshot
+            elements_info = []
+            for e in screenshot.elements:
+                elements_info.append({
+                    "bbox": e.bbox,
+                    "path": extract_element_id(e.get_xpath())
+                })
 
-    async def _execute_step(self, action_code: Dict[str, Any]) -> StepResult:
-        
-        device_factory = await get_device_factory()
-        screenshot = await device_factory.get_screenshot(device_id=self.device_id)
-        elements_info = []
+            batch = self._take_batch(actions[start:], elements_info)
+            print(f"Actions: {batch}")
 
-        for e in screenshot.elements:
-            elements_info.append({
-                "bbox": e.bbox,
-                "path": extract_element_id(e.get_xpath())
-            })
+            try:
+                results = await self.action_handler.execute_batch(batch, screenshot.width, screenshot.height)
+            except Exception as e:
+                return f"Error, {e}"
 
-        action = self._parse_action(action_code, elements_info)
-        print(f"Action: {action}")
+            # If any action fails, return immediately
+            for action, result in zip(batch, results):
+                if not result.success:
+                    return f"Error, {result.message or action.get('message')}"
+            start += len(batch)
 
-        try:
-            result = await self.action_handler.execute(action, screenshot.width, screenshot.height)
-        except Exception as e:
-            result = await self.action_handler.execute(
-                finish(message=str(e)), screenshot.width, screenshot.height
-            )
-            return StepResult(False, str(e))
-        
+        # All actions succeeded
+        return "Success"
 
-        return StepResult(
-            success=result.success,
-            message=result.message or action.get("message"),
-        )
+    def _take_batch(self, actions: List[Dict[str, Any]], elements_info: List[Dict[str, Any]]) -> List[dict[str, Any]]:
+        """
+        Parse the leading actions that can run without reading the screen again.
+
+        The first action is always taken. Following actions are taken while
+        their target element is on the current screen, and only actions
+        without a target after an action that may change the screen (a tap,
+        swipe or navigation, see SCREEN_CHANGING_ACTIONS).
+
+        Two taps therefore never share a batch: "tap, tap, type, enter" needs a
+        fresh screen before the second tap. What a tap can still carry is the
+        run of target-less actions after it (Wait, Back, Home, Launch), which
+        is where multi-action skills save their round-trips.
+        """
+        batch = []
+        screen_changed = False
+        for action_code in actions:
+            if batch and "element" in action_code:
+                on_screen = any(element["path"] == action_code["element"] for element in elements_info)
+                if screen_changed or not on_screen:
+                    break
+            batch.append(self._parse_action(action_code, elements_info))
+            screen_changed = screen_changed or action_code.get("action") in SCREEN_CHANGING_ACTIONS
+        return batch
 
     def _parse_action(self, action_code: Dict[str, Any], elements_info: List[Dict[str, Any]]) -> dict[str, Any]:
         action = {"_metadata": "do"}
@@ -9,7 +9,9 @@ from sentence_transformers import SentenceTransformer
 
 from phone_agent.device_factory import get_device_factory
 from phone_agent.context_manager import StructuredContext
-from phone_agent.actions.handler import ActionHandler
+from phone_agent.actions.handler import SCREEN_CHANGING_ACTIONS, ActionHandler
+from phone_agent.ui_diff import content_similarity
+from utils.element_table import ElementTable
 
 from act_mem.act_mem import ActionMemory
 from act_mem.workflow import Workflow, WorkGraph
@@ -177,31 +179,7 @@ class SpeculativeExecutor:
         Returns:
             Similarity score between 0.0 and 1.0
         """
-        if not current_elements or not stored_elements:
-            return 0.0
-        
-        # Simple matching based on element content and types
-        current_contents = set()
-        stored_contents = set()
-        
-        for elem in current_elements:
-            content = elem.get('content', '').strip()
-            if content:
-                current_contents.add(content)
-        
-        for elem in stored_elements:
-            content = elem.get('content', '').strip()
-            if content:
-                stored_contents.add(content)
-        
-        if not current_contents or not stored_contents:
-            return 0.0
-        
-        # Calculate similarity ratio
-        intersection = current_contents.intersection(stored_contents)
-        union = current_contents.union(stored_contents)
-        
-        return len(intersection) / len(union) if union else 0.0
+        return content_similarity(current_elements, stored_elements)
     
     def _predict_future_nodes(
         self, 
@@ -398,7 +376,7 @@ class SpeculativeExecutor:
             prediction: Dict[str, str], 
             # tag: str, 
             recorder=None, 
-            initial_screenshot=None, 
+            initial_observation=None, 
             is_portal: bool = True
         ):
         """
@@ -407,20 +385,21 @@ class SpeculativeExecutor:
         Args:
             prediction: List of predicted actions
             recorder: WorkflowRecorder instance for recording actions (optional)
-            initial_screenshot: Initial screenshot to use (optional, will capture if not provided)
+            initial_observation: Initial observation to use (optional, will capture if not provided)
             
         Returns:
-            The final screenshot after all speculative actions, or None if no actions executed
+            The final observation after all speculative actions
         """
 
         device_factory = await get_device_factory()
         
-        # Use provided screenshot or capture new one
-        if initial_screenshot is not None:
-            screenshot = initial_screenshot
+        # Use provided observation or capture new one
+        if initial_observation is not None:
+            observation = initial_observation
         else:
-            screenshot = await device_factory.get_screenshot(device_id=self.device_id)
-        final_screenshot = screenshot
+            observation = await device_factory.get_observation(device_id=self.device_id)
+        screenshot = observation.screenshot
+        final_observation = observation
 
         current_elements = []
 
@@ -431,13 +410,11 @@ class SpeculativeExecutor:
                     "bbox": e.bbox,
                 })
         else:
-            for e in screenshot.elements:
-                current_elements.append({
-                    "resourceId": e.resourceId,
-                    "className": e.className,
-                    "content": e.content_desc,
-                    "bbox": e.bounds,
-                })
+            current_elements = ElementTable.of(screenshot.elements).elements_info()
+
+        # Nothing to record: run the predictions without reading every intermediate screen
+        if recorder is None:
+            return await self._execute_batched(prediction, observation, current_elements, is_portal)
 
         # Track if we need to complete agent.py's pending transition
         # Only complete it if we actually execute at least one speculative action
@@ -452,7 +429,7 @@ class SpeculativeExecutor:
                 # Only do this once, when we're sure we'll execute at least one action
                 if not pending_transition_completed and recorder and recorder._pending_from_node_id is not None:
                     # Get current app and work graph
-                    current_app = await device_factory.get_current_app(self.device_id)
+                    current_app = observation.current_app
                     work_graph = self._memory.get_work_graph(current_app)
                     if work_graph is None:
                         work_graph = self._memory.add_work_graph(current_app)
@@ -468,13 +445,7 @@ class SpeculativeExecutor:
                                 "path": e.get_xpath()
                             })
                     else:
-                        for e in screenshot.elements:
-                            after_elements.append({
-                                "resourceId": e.resourceId,
-                                "className": e.className,
-                                "content": e.content_desc,
-                                "checked": e.state_desc,
-                            })
+                        after_elements = ElementTable.of(screenshot.elements).node_elements()
                     
                     to_node = work_graph.create_node(after_elements)
                     # to_node.add_tag(tag=tag)
@@ -484,11 +455,7 @@ class SpeculativeExecutor:
                     pending_transition_completed = True
                     print("✅ Completed agent.py's pending transition before first speculative action")
                 
-                for j in range(len(self._future_nodes[i].elements_info)):
-                    if i == 0:
-                        self._future_nodes[i].elements_info[j]['id'] = f"B{j+1}"
-                    elif i == 1:
-                        self._future_nodes[i].elements_info[j]['id'] = f"C{j+1}"
+                self._label_future_node(i)
                 print(f"predictive action content: {list(prediction.values())[i]}")
                 
                 # print(f"predictive action elements_info: {self._future_nodes[i].elements_info}")
@@ -510,7 +477,7 @@ class SpeculativeExecutor:
                         
                         if recorder:
                             # Get current app
-                            current_app = await device_factory.get_current_app(self.device_id)
+                            current_app = observation.current_app
                             
                             # Get or create work graph for current app
                             work_graph = self._memory.get_work_graph(current_app)
@@ -546,13 +513,7 @@ class SpeculativeExecutor:
                                         "path": e.get_xpath()
                                     })
                             else:
-                                for e in screenshot.elements:
-                                    before_elements.append({
-                                        "resourceId": e.resourceId,
-                                        "className": e.className,
-                                        "content": e.content_desc,
-                                        "checked": e.state_desc,
-                                    })
+                                before_elements = ElementTable.of(screenshot.elements).node_elements()
                             
                             # Add action to from_node based on action type
                             if action["action"] == "Type":
@@ -619,7 +580,8 @@ class SpeculativeExecutor:
                             )
                             
                             # Get screenshot after action execution to create to_node
-                            after_screenshot = await device_factory.get_screenshot(device_id=self.device_id)
+                            observation = await device_factory.get_observation(device_id=self.device_id)
+                            after_screenshot = observation.screenshot
                             after_elements = []
                             if not is_portal:
                                 for e in after_screenshot.elements:
@@ -630,13 +592,7 @@ class SpeculativeExecutor:
                                         "path": e.get_xpath()
                                     })
                             else:
-                                for e in after_screenshot.elements:
-                                    after_elements.append({
-                                        "resourceId": e.resourceId,
-                                        "className": e.className,
-                                        "content": e.content_desc,
-                                        "checked": e.state_desc,
-                                    })
+                                after_elements = ElementTable.of(after_screenshot.elements).node_elements()
                             
                             # Create to_node
                             to_node = work_graph.create_node(after_elements)
@@ -647,7 +603,7 @@ class SpeculativeExecutor:
                             
                             # Update screenshot and current_elements for next iteration
                             screenshot = after_screenshot
-                            final_screenshot = after_screenshot
+                            final_observation = observation
                             
                             # Update current_elements for next speculative action matching
                             current_elements = []
@@ -658,13 +614,7 @@ class SpeculativeExecutor:
                                         "bbox": e.bbox,
                                     })
                             else:
-                                for e in screenshot.elements:
-                                    current_elements.append({
-                                        "resourceId": e.resourceId,
-                                        "className": e.className,
-                                        "content": e.content_desc,
-                                        "bbox": e.bounds,
-                                    })
+                                current_elements = ElementTable.of(screenshot.elements).elements_info()
                         
                         action_dict = {list(prediction.keys())[i]: list(prediction.values())[i]}
                         print(f"Speculative action executed and recorded: {action_dict}")
@@ -677,7 +627,71 @@ class SpeculativeExecutor:
             else:
                 break
 
-        return final_screenshot
+        return final_observation
+
+    async def _execute_batched(
+            self,
+            prediction: Dict[str, str],
+            observation,
+            current_elements: List[Dict[str, Any]],
+            is_portal: bool = True,
+        ):
+        """
+        Execute predictions in one device round-trip, without recording them.
+
+        Predicted actions are resolved against the current screen and run with
+        ActionHandler.execute_batch, up to the first one whose target is not on
+        this screen, or any target after a tap, swipe or navigation (see
+        SCREEN_CHANGING_ACTIONS), which would need a fresh screen. Only the
+        target-less actions after the first tap (Wait, Back, Home, Launch) are
+        batched with it, consecutive taps are not.
+
+        Returns:
+            The observation after the executed actions.
+        """
+        if not self._future_nodes or not self._elements_match(current_elements, self._future_nodes[0].elements_info):
+            return observation
+
+        screenshot = observation.screenshot
+        batch, entries = [], []
+        # Targets are resolved on the current screen, so a targeted action may
+        # only follow actions that leave the screen as it is
+        screen_changed = False
+        for i, (description, action_code) in enumerate(list(prediction.items())[:len(self._future_nodes)]):
+            self._label_future_node(i)
+            try:
+                action, element_content = await self.parse_action(action_code, i, current_elements, is_portal)
+            except ValueError as e:
+                print(f"Speculative action parse error: {e}")
+                break
+            if action is None or action.get("action") == "Finish":
+                break
+            if "element" in action and (screen_changed or not element_content):
+                break
+            batch.append(action)
+            entries.append({description: action_code})
+            screen_changed = screen_changed or action.get("action") in SCREEN_CHANGING_ACTIONS
+
+        if not batch:
+            return observation
+
+        print(f"Executing {len(batch)} speculative actions as one batch: {batch}")
+        results = await self.action_handler.execute_batch(batch, screenshot.width, screenshot.height)
+        for entry, result in zip(entries, results):
+            if not result.success:
+                break
+            self._context.add_history_entry(content="", action=entry)
+
+        device_factory = await get_device_factory()
+        return await device_factory.get_observation(device_id=self.device_id)
+
+    def _label_future_node(self, i: int) -> None:
+        """Give the elements of the i-th predicted node the ids the prediction uses (B1.., C1..)."""
+        for j in range(len(self._future_nodes[i].elements_info)):
+            if i == 0:
+                self._future_nodes[i].elements_info[j]['id'] = f"B{j+1}"
+            elif i == 1:
+                self._future_nodes[i].elements_info[j]['id'] = f"C{j+1}"
 
     def _elements_match(
         self, 
@@ -0,0 +1,186 @@
+"""Structural diff of the UI elements of two observations.
+
+Elements are keyed by a stable identity (resourceId, class, content) plus
+their bounds quantized to a grid. An element whose identity and quantized
+bounds are on both screens is unchanged (or state-changed if its checked /
+focused state differs); an identity that is on both screens at different
+bounds has moved; everything else was added or removed. Each element is
+visited a constant number of times, so the diff is linear in the element
+count.
+
+Works on the AndroidElement / AndroidPortalElement objects of a Screenshot
+and on the element dicts stored in memory ("resourceId", "className",
+"content", "bbox", "checked"/"option", "focused").
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Tuple
+
+# Bounds are compared on a grid of this many pixels
+BOUNDS_QUANTUM = 10
+
+Identity = Tuple[str, str, str]
+Rect = Tuple[int, int, int, int]
+
+
+def element_identity(elem: Any) -> Identity:
+    """(resourceId, class, content) of a UI element object or element dict."""
+    if isinstance(elem, dict):
+        return (
+            elem.get("resourceId", "") or "",
+            elem.get("className", "") or "",
+            elem.get("content", "") or "",
+        )
+    if hasattr(elem, "content_desc"):  # AndroidPortalElement
+        return (elem.resourceId or "", elem.className or "", elem.content_desc or "")
+    # AndroidElement: elem_id already carries the class and semantic content
+    raw = elem.raw
+    return (raw.get("resource-id", ""), raw.get("class", ""), elem.elem_id)
+
+
+def element_rect(elem: Any) -> Rect | None:
+    """Bounds as (x1, y1, x2, y2), None if the element has none."""
+    if isinstance(elem, dict):
+        bbox = elem.get("bbox")
+    else:
+        bbox = getattr(elem, "bounds", None) or getattr(elem, "bbox", None)
+    if not bbox:
+        return None
+    if len(bbox) == 2:  # ((x1, y1), (x2, y2))
+        (x1, y1), (x2, y2) = bbox
+        return (x1, y1, x2, y2)
+    return tuple(bbox[:4])
+
+
+def element_state(elem: Any) -> Tuple[Any, Any]:
+    """(checked, focused) state of an element; focused is None for portal elements."""
+    if isinstance(elem, dict):
+        return (elem.get("checked", elem.get("option")), elem.get("focused"))
+    if hasattr(elem, "state_desc"):
+        return (elem.state_desc, None)
+    return (elem.checked, elem.focused)
+
+
+def element_label(elem: Any) -> str:
+    """Short human readable name of an element for change descriptions."""
+    resource_id, _, content = element_identity(elem)
+    return content or resource_id
+
+
+def _quantize(rect: Rect | None, quantum: int) -> Rect | None:
+    if rect is None:
+        return None
+    return (rect[0] // quantum, rect[1] // quantum, rect[2] // quantum, rect[3] // quantum)
+
+
+@dataclass
+class UIDiff:
+    """
+    Changes from a before screen to an after screen.
+
+    Attributes:
+        added: Elements only on the after screen.
+        removed: Elements only on the before screen.
+        moved: (before, after) pairs with the same identity at different bounds.
+        state_changed: (before, after) pairs at the same place whose checked or
+            focused state changed.
+        before_count / after_count: Number of elements on each screen.
+    """
+
+    added: List[Any] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)
+    moved: List[Tuple[Any, Any]] = field(default_factory=list)
+    state_changed: List[Tuple[Any, Any]] = field(default_factory=list)
+    before_count: int = 0
+    after_count: int = 0
+
+    @property
+    def count_diff(self) -> int:
+        return self.after_count - self.before_count
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.moved or self.state_changed)
+
+    @property
+    def unchanged_count(self) -> int:
+        return self.after_count - len(self.added) - len(self.moved) - len(self.state_changed)
+
+
+def diff_elements(
+    before: Iterable[Any], after: Iterable[Any], quantum: int = BOUNDS_QUANTUM
+) -> UIDiff:
+    """
+    Diff two element lists in linear time.
+
+    Elements sharing an identity are matched on the same quantized bounds
+    first; the rest of them are paired in document order as moves.
+
+    Args:
+        before: Elements of the earlier screen.
+        after: Elements of the later screen.
+        quantum: Grid size in pixels used to compare bounds.
+
+    Returns:
+        UIDiff with the added, removed, moved and state-changed elements.
+    """
+    diff = UIDiff()
+
+    # identity -> (before elements in document order, matched flags,
+    #              quantized bounds -> positions of unmatched elements)
+    before_index: Dict[Identity, Tuple[List[Any], List[bool], Dict[Rect | None, Deque[int]]]] = {}
+    for elem in before:
+        diff.before_count += 1
+        identity = element_identity(elem)
+        group = before_index.get(identity)
+        if group is None:
+            group = before_index[identity] = ([], [], {})
+        elems, matched, slots = group
+        slots.setdefault(_quantize(element_rect(elem), quantum), deque()).append(len(elems))
+        elems.append(elem)
+        matched.append(False)
+
+    unmatched_after: Dict[Identity, List[Any]] = {}
+    for elem in after:
+        diff.after_count += 1
+        identity = element_identity(elem)
+        group = before_index.get(identity)
+        positions = group[2].get(_quantize(element_rect(elem), quantum)) if group else None
+        if positions:
+            i = positions.popleft()
+            group[1][i] = True
+            before_elem = group[0][i]
+            if element_state(before_elem) != element_state(elem):
+                diff.state_changed.append((before_elem, elem))
+        else:
+            unmatched_after.setdefault(identity, []).append(elem)
+
+    for identity, (elems, matched, _) in before_index.items():
+        leftover = [elem for elem, done in zip(elems, matched) if not done]
+        if not leftover:
+            continue
+        moved_to = unmatched_after.pop(identity, [])
+        diff.moved.extend(zip(leftover, moved_to))
+        diff.removed.extend(leftover[len(moved_to):])
+        if len(moved_to) > len(leftover):
+            unmatched_after[identity] = moved_to[len(leftover):]
+
+    for elems in unmatched_after.values():
+        diff.added.extend(elems)
+
+    return diff
+
+
+def content_similarity(current: Iterable[Any], stored: Iterable[Any]) -> float:
+    """
+    Jaccard similarity of the non-empty element contents of two screens.
+
+    Returns:
+        Similarity between 0.0 and 1.0 (0.0 if either screen has no content).
+    """
+    current_contents = {c for c in (element_identity(e)[2].strip() for e in current) if c}
+    stored_contents = {c for c in (element_identity(e)[2].strip() for e in stored) if c}
+    if not current_contents or not stored_contents:
+        return 0.0
+    return len(current_contents & stored_contents) / len(current_contents | stored_contents)
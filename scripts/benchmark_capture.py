@@ -0,0 +1,86 @@
+"""
+Benchmark the screen capture backends against each other on a connected device.
+
+For every capture mode this measures the bare capture (capture_png) and a full
+observation (screenshot + portal UI state + foreground app), and prints mean,
+p50 and p95 latencies plus the PNG size.
+
+Usage examples:
+  python scripts/benchmark_capture.py
+  python scripts/benchmark_capture.py --device-id emulator-5554 --runs 20
+  python scripts/benchmark_capture.py --modes adb-exec-out portal-tcp
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.adb import get_observation, stop_frame_servers  # noqa: E402
+from phone_agent.adb.screenshot import CaptureMode, capture_png  # noqa: E402
+from phone_agent.portal_cli import close_portal_clients  # noqa: E402
+
+
+def summarize(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return (
+        f"mean {statistics.mean(ordered) * 1000:7.1f}ms  "
+        f"p50 {statistics.median(ordered) * 1000:7.1f}ms  "
+        f"p95 {p95 * 1000:7.1f}ms"
+    )
+
+
+async def bench_mode(mode: CaptureMode, device_id: str | None, runs: int, warmup: int):
+    capture_times, observation_times, sizes = [], [], []
+
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        data = await capture_png(device_id, mode=mode)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            capture_times.append(elapsed)
+            sizes.append(len(data))
+
+    for i in range(warmup + runs):
+        observation = await get_observation(device_id, mode=mode)
+        if i >= warmup:
+            observation_times.append(observation.timings["total"])
+
+    print(f"{mode.value:<18} capture     {summarize(capture_times)}  "
+          f"png {statistics.mean(sizes) / 1024:.0f}KiB")
+    print(f"{'':<18} observation {summarize(observation_times)}")
+
+
+async def main(args):
+    modes = [CaptureMode(m) for m in args.modes] if args.modes else list(CaptureMode)
+    try:
+        for mode in modes:
+            try:
+                await bench_mode(mode, args.device_id, args.runs, args.warmup)
+            except Exception as e:
+                print(f"{mode.value:<18} failed: {e}")
+    finally:
+        await close_portal_clients()
+        stop_frame_servers()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark screen capture backends",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--device-id", type=str, default=None, help="ADB device ID")
+    parser.add_argument("--runs", type=int, default=10, help="Measured runs per mode")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured runs per mode")
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=[m.value for m in CaptureMode],
+        help="Capture modes to compare (default: all)",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""
+Microbenchmark DetailedFilter on captured portal payloads.
+
+A payload is a JSON file with the portal state (as returned by
+PortalClient.get_state: "a11y_tree" and "device_context"). Save one from a
+device with --capture, or run without files to use a synthetic tree.
+For every payload this prints the node counts before and after filtering and
+the mean, p50 and p95 time of one DetailedFilter.filter call.
+
+Usage examples:
+  python scripts/benchmark_detailed_filter.py
+  python scripts/benchmark_detailed_filter.py --capture state.json --device emulator-5554
+  python scripts/benchmark_detailed_filter.py state.json --runs 500 --clip-bounds
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from phone_agent.portal_cli.filters import DetailedFilter  # noqa: E402
+
+
+def summarize(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return (
+        f"mean {statistics.mean(ordered) * 1000:7.2f}ms  "
+        f"p50 {statistics.median(ordered) * 1000:7.2f}ms  "
+        f"p95 {p95 * 1000:7.2f}ms"
+    )
+
+
+def count_nodes(tree) -> int:
+    if tree is None:
+        return 0
+    count, stack = 0, [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.get("children", ()))
+    return count
+
+
+def synthetic_payload(depth: int = 8, fanout: int = 3, seed: int = 0) -> dict:
+    """A scrolled list-like tree with a keyboard and many offscreen rows."""
+    rng = random.Random(seed)
+
+    def build(level: int, top: int) -> dict:
+        height = max(10, 2400 >> level)
+        node = {
+            "className": "android.view.View",
+            "text": f"row {top}",
+            "boundsInScreen": {"left": 0, "top": top, "right": 1080, "bottom": top + height},
+        }
+        if rng.random() < 0.02:
+            node["resourceId"] = "com.google.android.inputmethod.latin:id/key"
+        if level < depth:
+            node["children"] = [
+                build(level + 1, top + rng.randint(-height, 2 * height)) for _ in range(fanout)
+            ]
+        return node
+
+    return {
+        "a11y_tree": build(0, 0),
+        "device_context": {"screen_bounds": {"width": 1080, "height": 2400}},
+    }
+
+
+def bench_payload(name: str, payload: dict, tree_filter: DetailedFilter, runs: int, warmup: int) -> None:
+    tree, context = payload["a11y_tree"], payload["device_context"]
+    times = []
+    filtered = None
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        filtered = tree_filter.filter(tree, context)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            times.append(elapsed)
+
+    print(f"{name:<24} {count_nodes(tree):6d} -> {count_nodes(filtered):6d} nodes  {summarize(times)}")
+
+
+async def capture(path: str, device_id: str | None) -> None:
+    from utils.ui_filter import fetch_state_portal
+
+    payload = await fetch_state_portal(device_id)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    print(f"Saved portal payload to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DetailedFilter on portal payloads")
+    parser.add_argument("files", nargs="*", help="Portal state JSON files (default: synthetic tree)")
+    parser.add_argument("--capture", metavar="PATH", help="Save the device's portal state to PATH first")
+    parser.add_argument("--device", default=None, help="ADB device ID for --capture")
+    parser.add_argument("--runs", type=int, default=200, help="Timed runs per payload")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed runs per payload")
+    parser.add_argument("--clip-bounds", action="store_true", help="Enable bounds clipping")
+    args = parser.parse_args()
+
+    files = list(args.files)
+    if args.capture:
+        asyncio.run(capture(args.capture, args.device))
+        files.append(args.capture)
+
+    tree_filter = DetailedFilter(clip_bounds=args.clip_bounds)
+    if not files:
+        bench_payload("synthetic", synthetic_payload(), tree_filter, args.runs, args.warmup)
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        bench_payload(os.path.basename(path), payload, tree_filter, args.runs, args.warmup)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Microbenchmark utils.ui_filter.ui_filter on the uiautomator XML fixtures.
+
+For every fixture this prints the number of actionable elements and the mean,
+p50 and p95 time of one ui_filter call. No device is needed.
+
+Usage examples:
+  python scripts/benchmark_ui_filter.py
+  python scripts/benchmark_ui_filter.py --runs 500 --min-dist 50
+  python scripts/benchmark_ui_filter.py tests/test_ui.xml
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.ui_filter import ui_filter  # noqa: E402
+
+
+def summarize(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return (
+        f"mean {statistics.mean(ordered) * 1000:7.2f}ms  "
+        f"p50 {statistics.median(ordered) * 1000:7.2f}ms  "
+        f"p95 {p95 * 1000:7.2f}ms"
+    )
+
+
+def bench_file(path: str, runs: int, warmup: int, min_dist: int) -> None:
+    times = []
+    count = 0
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        count = len(ui_filter(path, min_dist))
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            times.append(elapsed)
+
+    size = os.path.getsize(path) / 1024
+    print(f"{os.path.basename(path):<18} {size:5.0f}KiB {count:4d} elements  {summarize(times)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ui_filter on XML fixtures")
+    parser.add_argument(
+        "files", nargs="*",
+        help="XML files to filter (default: tests/emulator_ui.xml, tests/screen_ui.xml, tests/test_ui*.xml)",
+    )
+    parser.add_argument("--runs", type=int, default=200, help="Timed runs per file")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed runs per file")
+    parser.add_argument("--min-dist", type=int, default=30, help="ui_filter dedup distance")
+    args = parser.parse_args()
+
+    files = args.files or [
+        os.path.join(ROOT, "tests", "emulator_ui.xml"),
+        os.path.join(ROOT, "tests", "screen_ui.xml"),
+        *sorted(glob.glob(os.path.join(ROOT, "tests", "test_ui*.xml"))),
+    ]
+    for path in files:
+        bench_file(path, args.runs, args.warmup, args.min_dist)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Inspect the learned post-action settle profiles stored with the action memory.
+
+Lists, per (app package, action, target resourceId), how many settle samples
+were recorded, their p50 and p99, how often the deadline passed before the UI
+settled, and the wait window the agent uses for that action (first sample and
+deadline). Targets marked "*" are the per-(package, action) aggregates used for
+targets without enough samples of their own.
+
+Usage examples:
+  python scripts/inspect_settle_profiles.py
+  python scripts/inspect_settle_profiles.py --memory-dir ./output/memory --package calendar
+  python scripts/inspect_settle_profiles.py --action Tap --sort p99 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from act_mem.settle_profile import SettleProfiles  # noqa: E402
+from phone_agent.config.timing import TIMING_CONFIG  # noqa: E402
+from phone_agent.settle import learned_window  # noqa: E402
+
+
+def main(args):
+    profiles = SettleProfiles(args.memory_dir)
+    rows = [
+        stats
+        for stats in profiles
+        if stats.count >= args.min_samples
+        and (not args.package or args.package.lower() in stats.package.lower())
+        and (not args.action or stats.action == args.action)
+        and (args.targets or stats.resource_id == "*")
+    ]
+    rows.sort(key=lambda stats: getattr(stats, args.sort), reverse=args.sort != "package")
+
+    if args.json:
+        out = []
+        for stats in rows:
+            window = learned_window(stats)
+            out.append({**asdict(stats), "window": asdict(window) if window else None})
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+        return
+
+    if not rows:
+        print(f"No settle profiles in {profiles.path}")
+        return
+
+    print(
+        f"{'package':<36} {'action':<10} {'target':<40} {'n':>4} "
+        f"{'p50':>7} {'p99':>7} {'miss':>5}  window"
+    )
+    for stats in rows:
+        window = learned_window(stats)
+        learned = f"{window.start * 1000:.0f}-{window.deadline * 1000:.0f}ms" if window else "default"
+        print(
+            f"{stats.package[:36]:<36} {stats.action[:10]:<10} {stats.resource_id[-40:]:<40} "
+            f"{stats.count:>4} {stats.p50 * 1000:>5.0f}ms {stats.p99 * 1000:>5.0f}ms "
+            f"{stats.deadline_rate:>5.0%}  {learned}"
+        )
+    if not TIMING_CONFIG.settle.learned:
+        print("\nLearned windows are disabled (PHONE_AGENT_SETTLE_LEARNED=0)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Inspect learned settle profiles",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--memory-dir", type=str, default="./output/memory", help="Action memory directory")
+    parser.add_argument("--package", type=str, default=None, help="Only packages containing this text")
+    parser.add_argument("--action", type=str, default=None, help="Only this action type, e.g. Tap")
+    parser.add_argument("--targets", action=argparse.BooleanOptionalAction, default=True,
+                        help="Show per-target profiles, not only the per-action aggregates")
+    parser.add_argument("--min-samples", type=int, default=1, help="Hide profiles with fewer samples")
+    parser.add_argument("--sort", choices=["package", "count", "p50", "p99", "deadline_rate"], default="p99")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    main(parser.parse_args())
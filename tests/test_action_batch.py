@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from phone_agent.actions import handler as handler_module
+from phone_agent.actions.handler import ActionHandler, do
+from phone_agent.adb import batch as batch_module
+from phone_agent.adb.batch import ShellBatch
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.settle import SettleResult
+
+# Device commands as shell functions that log their arguments, "input tap 0 0" fails
+FAKE_DEVICE = """
+input() { [ "$*" = "tap 0 0" ] && return 1; echo "input $*"; }
+am() { echo "am $*"; }
+monkey() { echo "monkey $*"; }
+"""
+
+
+@pytest.fixture
+def device(monkeypatch):
+    scripts = []
+
+    async def adb_shell(command, device_id=None, timeout=None, stderr=False):
+        scripts.append(command)
+        process = await asyncio.create_subprocess_exec(
+            "sh", "-c", FAKE_DEVICE + command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        output, _ = await process.communicate()
+        return output.decode()
+
+    async def settle(action, device_id=None, max_wait=1.0):
+        return SettleResult(action, 0.01, True)
+
+    class FakeKeyboard:
+        uses_portal = False
+
+        async def start(self):
+            return "adb"
+
+    async def get_device_factory():
+        return DeviceFactory(DeviceType.ADB)
+
+    monkeypatch.setattr(batch_module, "adb_shell", adb_shell)
+    monkeypatch.setattr(batch_module, "settle", settle)
+    monkeypatch.setattr(batch_module, "get_keyboard_session", lambda device_id: FakeKeyboard())
+    monkeypatch.setattr(handler_module, "get_device_factory", get_device_factory)
+    return scripts
+
+
+def test_one_script_per_batch(device):
+    async def run():
+        batch = ShellBatch(step_wait=0)
+        batch.tap(10, 20)
+        await batch.input_text("hi", enter=True, tap=(30, 40))
+        batch.back()
+        return await batch.run(), batch.settle_result
+
+    results, settle = asyncio.run(run())
+    assert results == [True, True, True]
+    assert settle.stable
+    assert len(device) == 1
+    assert device[0].split(" && ") == [
+        "input tap 10 20", "echo __batch_step 0",
+        "sleep 0", "input tap 30 40", "sleep 0", "am broadcast -a ADB_CLEAR_TEXT",
+        "am broadcast -a ADB_INPUT_B64 --es msg aGk=", "input keyevent KEYCODE_ENTER", "echo __batch_step 1",
+        "sleep 0", "input keyevent 4", "echo __batch_step 2",
+    ]
+
+
+def test_execute_batch_stops_at_failure(device):
+    actions = [
+        do(action="Tap", element=[1, 1]),
+        do(action="Tap", element=[0, 0]),
+        do(action="Home"),
+    ]
+    results = asyncio.run(ActionHandler().execute_batch(actions, 1080, 2400))
+    assert [r.success for r in results] == [True, False, False]
+    assert results[1].message == "Tap failed"
+    assert len(device) == 1
+
+
+def test_execute_batch_runs_other_actions_alone(device):
+    actions = [
+        do(action="Launch", app="Settings"),
+        do(action="Note", message="remember"),
+        do(action="Swipe", element=[500, 1000], direction="up", distance="short"),
+        do(action="Launch", app="No Such App"),
+        do(action="Back"),
+    ]
+    results = asyncio.run(ActionHandler().execute_batch(actions, 1000, 2000))
+    assert [r.success for r in results] == [True, True, True, False, False]
+    assert results[3].message == "App not found: No Such App"
+    assert len(device) == 2
+    assert "input swipe 500 1000 500 600 500" in device[1]
+
+
+def test_script_timeout_covers_its_sleeps(monkeypatch):
+    from phone_agent.config.timing import TIMING_CONFIG
+
+    timeouts = []
+
+    async def hung_shell(command, device_id=None, timeout=None, stderr=False):
+        timeouts.append(timeout)
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(batch_module, "adb_shell", hung_shell)
+    monkeypatch.setattr(TIMING_CONFIG.connection, "shell_command_timeout", 10.0)
+
+    async def run():
+        batch = ShellBatch(step_wait=0.5)
+        batch.long_press(1, 2, duration_ms=3000)
+        batch.wait(4)
+        return await batch.run()
+
+    assert asyncio.run(run()) == [False, False]
+    assert timeouts == [10.0 + 0.5 + 3.0 + 0.5 + 4]
+
+
+def test_skill_batch_ends_before_targets_after_a_tap():
+    from phone_agent.skill_executor import SkillExecutor
+
+    executor = object.__new__(SkillExecutor)
+    elements_info = [
+        {"path": "menu", "bbox": ((0, 0), (100, 100))},
+        {"path": "item", "bbox": ((0, 100), (100, 200))},
+    ]
+    actions = [
+        {"action": "Tap", "element": "menu"},
+        {"action": "Type", "text": "hi"},
+        {"action": "Tap", "element": "item"},  # Looked up on the screen the first tap opened
+    ]
+
+    batch = executor._take_batch(actions, elements_info)
+    assert batch == [
+        {"_metadata": "do", "action": "Tap", "element": [50, 50]},
+        {"_metadata": "do", "action": "Type", "text": "hi"},
+    ]
+
+
+def test_skill_saves_round_trips_with_target_less_runs(device, monkeypatch):
+    from types import SimpleNamespace
+
+    from phone_agent import skill_executor as skill_module
+    from phone_agent.config.timing import TIMING_CONFIG
+    from phone_agent.skill_executor import SkillExecutor
+
+    observations = []
+
+    class FakeFactory:
+        async def get_observation(self, device_id=None):
+            elements = [
+                SimpleNamespace(bbox=((100, 100), (300, 300)), get_xpath=lambda: "clear_all"),
+                SimpleNamespace(bbox=((100, 400), (300, 600)), get_xpath=lambda: "wifi"),
+            ]
+            observations.append(elements)
+            return SimpleNamespace(screenshot=SimpleNamespace(elements=elements, width=1000, height=2000))
+
+    async def get_device_factory():
+        return FakeFactory()
+
+    monkeypatch.setattr(skill_module, "get_device_factory", get_device_factory)
+    monkeypatch.setattr(skill_module, "extract_element_id", lambda xpath: xpath)
+    monkeypatch.setattr(TIMING_CONFIG.action, "batch_step_wait", 0)
+
+    actions = [
+        {"action": "Tap", "element": "clear_all"},
+        {"action": "Wait", "duration": "0 seconds"},
+        {"action": "Home"},
+        {"action": "Launch", "app": "Settings"},
+        {"action": "Tap", "element": "wifi"},  # Needs the screen Settings opened
+        {"action": "Back"},
+    ]
+    assert asyncio.run(SkillExecutor("emulator-5554").run(actions)) == "Success"
+
+    # Six actions, two screen reads and two device scripts instead of six of each
+    assert len(observations) == 2
+    assert len(device) == 2
+    assert [script.count("echo __batch_step") for script in device] == [4, 2]
+    assert "monkey -p com.android.settings" in device[0]
+    assert device[1].endswith("input keyevent 4 && echo __batch_step 1")
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from phone_agent.adb.transport import AdbTransport, AdbTransportError
+
+
+class FakeAdbServer:
+    """Minimal adb server: host:transport handshake, then shell:/exec: echo the command."""
+
+    def __init__(self, serials=("emulator-5554",)):
+        self.serials = serials
+        self.connections = 0
+        self.services = []
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                length = int(await reader.readexactly(4), 16)
+                request = (await reader.readexactly(length)).decode()
+                if request.startswith("host:transport:"):
+                    if request.split(":", 2)[2] not in self.serials:
+                        message = b"device not found"
+                        writer.write(b"FAIL%04x" % len(message) + message)
+                        break
+                    writer.write(b"OKAY")
+                elif request.startswith(("shell:", "exec:")):
+                    self.services.append(request)
+                    writer.write(b"OKAY" + request.split(":", 1)[1].encode() + b"\n")
+                    break
+                else:
+                    break
+        except asyncio.IncompleteReadError:
+            pass
+        await writer.drain()
+        writer.close()
+
+
+def test_shell_and_exec_out():
+    async def run():
+        async with FakeAdbServer() as server:
+            transport = AdbTransport("emulator-5554", port=server.port, pool_size=0)
+            assert await transport.shell(["input", "tap", 1, 2]) == b"input tap 1 2\n"
+            assert await transport.exec_out("screencap -p") == b"screencap -p\n"
+            assert server.services == ["shell:input tap 1 2", "exec:screencap -p"]
+
+    asyncio.run(run())
+
+
+def test_pool_keeps_handshaken_connections_ready():
+    async def run():
+        async with FakeAdbServer() as server:
+            transport = AdbTransport("emulator-5554", port=server.port, pool_size=2)
+            await transport.shell("true")
+            await asyncio.sleep(0.1)  # background refill
+            assert len(transport._pool) == 2
+
+            connections = server.connections
+            await transport.shell("true")
+            # Served by a pooled connection, the refill opens one more
+            await asyncio.sleep(0.1)
+            assert server.connections == connections + 1
+            await transport.close()
+
+    asyncio.run(run())
+
+
+def test_unknown_device_raises():
+    async def run():
+        async with FakeAdbServer() as server:
+            transport = AdbTransport("missing", port=server.port, pool_size=0)
+            with pytest.raises(AdbTransportError, match="device not found"):
+                await transport.shell("true")
+
+    asyncio.run(run())
+
+
+def test_transports_are_per_loop_and_dropped_with_closed_loops():
+    from phone_agent.adb import transport as transport_module
+
+    async def lookup():
+        return transport_module.get_transport("emulator-5554")
+
+    first_loop = asyncio.new_event_loop()
+    first = first_loop.run_until_complete(lookup())
+    assert first_loop.run_until_complete(lookup()) is first
+    first_loop.close()
+
+    second = asyncio.run(lookup())
+    assert second is not first
+    assert first_loop not in transport_module._transports
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import phone_agent.agent as agent_module
+from phone_agent.agent import PhoneAgent
+from phone_agent.model.image import ImageConfig, PreparedImage
+
+
+def make_agent():
+    agent = PhoneAgent.__new__(PhoneAgent)
+    agent._image_config = ImageConfig(max_long_side=640, format="jpeg")
+    agent._prepared_image = None
+    return agent
+
+
+def screenshot(data):
+    return SimpleNamespace(base64_data=data, width=1080, height=2400)
+
+
+def test_prepare_image_runs_off_loop_and_reuses_the_last_result(monkeypatch):
+    calls = []
+
+    def fake_prepare(base64_data, width, height, config):
+        calls.append((base64_data, threading.current_thread()))
+        return PreparedImage(base64_data, "image/jpeg", 288, 640, width, height)
+
+    monkeypatch.setattr(agent_module, "prepare_image", fake_prepare)
+    agent = make_agent()
+    before, after = screenshot("before"), screenshot("after")
+
+    async def scenario():
+        step_image = await agent._prepare_image(before)
+        # reflect(): the before screen was already prepared by the step
+        assert await agent._prepare_image(before) is step_image
+        after_image = await agent._prepare_image(after)
+        # The next step reuses the observation captured after the action
+        assert await agent._prepare_image(after) is after_image
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+    assert [data for data, _ in calls] == ["before", "after"]
+    assert all(thread is not loop_thread for _, thread in calls)
@@ -0,0 +1,56 @@
+from phone_agent.context_manager import StructuredContext
+
+
+def parts(messages, kind):
+    """Content parts of one kind ("image_url" or "text") across user messages."""
+    return [
+        part[kind]
+        for message in messages
+        if isinstance(message["content"], list)
+        for part in message["content"]
+        if part["type"] == kind
+    ]
+
+
+def images(messages):
+    return [part["url"] for part in parts(messages, "image_url")]
+
+
+def texts(messages):
+    return parts(messages, "text")
+
+
+def test_unchanged_screen_sends_marker_and_keeps_image_in_history():
+    context = StructuredContext()
+    context.set_task("open settings")
+
+    # Step 1: a new screenshot is sent
+    context.add_screenshot("aW1hZ2U=", mime_type="image/jpeg")
+    assert images(context.to_messages()) == ["data:image/jpeg;base64,aW1hZ2U="]
+    context.add_history_entry("tap", {"Tap": "do(action='Tap', element=[1, 1])"})
+    context.clear_current_step()
+
+    # Steps 2 and 3: same screen, the current screen is only a text marker and
+    # the image sent at step 1 stays in the history
+    for _ in range(2):
+        context.set_screen_unchanged(1)
+        messages = context.to_messages()
+        assert images(messages) == ["data:image/jpeg;base64,aW1hZ2U="]
+        assert "# Screen at Step 1\n\n" in texts(messages)
+        assert messages[-1]["content"][-1]["text"] == "# Current Screen\n\nScreen unchanged since step 1."
+        assert [p["type"] for p in messages[-1]["content"]] == ["text"]
+        context.clear_current_step()
+
+    # A new screenshot drops the marker
+    context.add_screenshot("bmV3")
+    messages = context.to_messages()
+    assert images(messages) == ["data:image/png;base64,bmV3"]
+    assert not any("unchanged" in text for text in texts(messages))
+
+
+def test_reset_forgets_last_screenshot():
+    context = StructuredContext()
+    context.add_screenshot("aW1hZ2U=")
+    context.reset()
+    context.set_screen_unchanged(1)
+    assert images(context.to_messages()) == []
@@ -0,0 +1,57 @@
+import copy
+
+from phone_agent.portal_cli.filters import DetailedFilter
+
+CONTEXT = {"screen_bounds": {"width": 1080, "height": 2400}}
+KEYBOARD_ID = "com.google.android.inputmethod.latin:id/key"
+
+
+def node(left, top, right, bottom, *children, **attrs):
+    return {
+        "boundsInScreen": {"left": left, "top": top, "right": right, "bottom": bottom},
+        "children": list(children),
+        **attrs,
+    }
+
+
+def texts(tree):
+    out = [tree.get("text")] if tree.get("text") else []
+    for child in tree.get("children", []):
+        out.extend(texts(child))
+    return out
+
+
+def test_keyboard_and_offscreen_nodes_are_removed():
+    tree = node(
+        0, 0, 1080, 2400,
+        node(0, 0, 100, 100, text="visible"),
+        node(0, 2500, 100, 2600, text="offscreen"),
+        node(0, 2000, 1080, 2400, node(0, 2000, 100, 2100, text="key"), resourceId=KEYBOARD_ID),
+        # Offscreen parent is kept for its visible child
+        node(0, 2300, 100, 2900, node(0, 2300, 100, 2350, text="child")),
+    )
+    original = copy.deepcopy(tree)
+    filtered = DetailedFilter().filter(tree, CONTEXT)
+    assert texts(filtered) == ["visible", "child"]
+    assert tree == original
+
+
+def test_ignore_bounds_filtering_and_clipping():
+    tree = node(
+        0, 0, 1080, 2400,
+        node(-50, 2300, 100, 2600, node(0, 3000, 100, 3100, text="kept"), ignoreBoundsFiltering="true"),
+    )
+    filtered = DetailedFilter(clip_bounds=True).filter(tree, CONTEXT)
+    assert texts(filtered) == ["kept"]
+    assert filtered["children"][0]["boundsInScreen"] == {"left": 0, "top": 2300, "right": 100, "bottom": 2400}
+
+
+def test_keyboard_root_and_deep_tree():
+    assert DetailedFilter().filter(node(0, 0, 10, 10, resourceId=KEYBOARD_ID), CONTEXT) is None
+
+    root = leaf = node(0, 0, 10, 10)
+    for _ in range(5000):
+        child = node(0, 0, 10, 10)
+        leaf["children"].append(child)
+        leaf = child
+    assert DetailedFilter().filter(root, CONTEXT) is not None
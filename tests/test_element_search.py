@@ -0,0 +1,55 @@
+from phone_agent.portal_cli.helpers.element_search import Filters
+
+
+def node(left, top, right, bottom, *children, **attrs):
+    return {
+        "boundsInScreen": {"left": left, "top": top, "right": right, "bottom": bottom},
+        "children": list(children),
+        **attrs,
+    }
+
+
+def texts(nodes):
+    return [n.get("text") for n in nodes]
+
+
+TREE = node(
+    0, 0, 1080, 2400,
+    node(0, 0, 1080, 100, node(10, 10, 200, 90, text="Title"), resourceId="app:id/toolbar"),
+    node(
+        0, 200, 1080, 400,
+        node(10, 210, 300, 390, text="Name"),
+        node(400, 210, 1000, 390, text="Alice", isClickable=True),
+        resourceId="app:id/row",
+    ),
+    node(0, 500, 1080, 700, node(10, 510, 300, 690, text="Email"), resourceId="app:id/row"),
+    node(500, 2200, 800, 2300, text="Save", isClickable=True),
+)
+
+
+def test_spatial_filters_order_by_distance():
+    assert texts(Filters.below(Filters.text_matches("Name"))([TREE])) == ["Email", None, "Save"]
+    assert texts(Filters.right_of(Filters.text_matches("Name"))([TREE])) == ["Alice", "Save"]
+    assert texts(Filters.above(Filters.text_matches("Name"))([TREE])) == ["Title", None]
+    assert Filters.left_of(Filters.text_matches("Missing"))([TREE]) == []
+
+
+def test_hierarchy_filters():
+    rows = Filters.contains_descendants([Filters.text_matches("Name"), Filters.clickable()])([TREE])
+    assert [n.get("resourceId") for n in rows] == [None, "app:id/row"]
+
+    # The child filter sees the children's whole subtrees
+    rows = Filters.contains_child(Filters.text_matches("Email"))([TREE])
+    assert [n.get("resourceId") for n in rows] == [None, "app:id/row"]
+
+    assert texts(Filters.child_of(Filters.id_matches("toolbar"))([TREE])) == ["Title"]
+    assert texts(Filters.deepest_matching(Filters.has_text())([TREE])) == ["Title", "Name", "Alice", "Email", "Save"]
+
+
+def test_composition_and_plain_callables():
+    row_children = Filters.compose([Filters.id_matches("row"), lambda nodes: nodes[1:], Filters.has_text()])
+    assert texts(row_children([TREE])) == ["Email"]
+
+    both = Filters.intersect([Filters.clickable(), Filters.below(Filters.text_matches("Email"))])
+    assert texts(both([TREE])) == ["Save"]
+    assert texts(Filters.compose([Filters.has_text(), Filters.index(-1)])([TREE])) == ["Save"]
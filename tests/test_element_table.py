@@ -0,0 +1,110 @@
+import numpy as np
+
+from utils.element_table import ElementTable
+from utils.ui_filter import portal_elements_from_state
+
+
+def record(resource_id, content, rect, class_name="TextView", state=""):
+    return {
+        "resourceId": resource_id,
+        "className": class_name,
+        "content_desc": content,
+        "state_desc": state,
+        "rect": rect,
+    }
+
+
+RECORDS = [
+    record("app:id/title", "Settings", (0, 0, 1080, 120)),
+    record("app:id/wifi", "Wi-Fi", (0, 120, 1080, 240), class_name="Switch", state="checked"),
+    record("", "", (0, 240, 540, 360)),
+]
+
+
+def test_rows_expose_element_attributes():
+    table = ElementTable.from_records(RECORDS)
+
+    assert len(table) == 3
+    assert table.bounds.shape == (3, 4)
+    row = table[1]
+    assert row.resourceId == "app:id/wifi"
+    assert row.className == "Switch"
+    assert row.content_desc == "Wi-Fi"
+    assert row.state_desc == "checked"
+    assert row.bounds == ((0, 120), (1080, 240))
+    assert row.center == (540.0, 180.0)
+    assert table[-1].bounds == ((0, 240), (540, 360))
+    assert [e.content_desc for e in table] == ["Settings", "Wi-Fi", ""]
+    assert table.centers.tolist() == [[540.0, 60.0], [540.0, 180.0], [270.0, 300.0]]
+
+
+def test_slice_is_a_table_view():
+    table = ElementTable.from_records(RECORDS)
+
+    tail = table[1:]
+    assert isinstance(tail, ElementTable)
+    assert [e.resourceId for e in tail] == ["app:id/wifi", ""]
+    assert np.shares_memory(tail.bounds, table.bounds)
+
+
+def test_elements_info_and_node_elements():
+    table = ElementTable.from_records(RECORDS)
+
+    info = table.elements_info()
+    assert info[1] == {
+        "id": "A2",
+        "resourceId": "app:id/wifi",
+        "className": "Switch",
+        "content": "Wi-Fi",
+        "checked": "checked",
+        "bbox": ((0, 120), (1080, 240)),
+    }
+    assert table.elements_info() is info
+    assert table.elements_info("B")[0]["id"] == "B1"
+
+    nodes = table.node_elements()
+    assert nodes[0] == {
+        "resourceId": "app:id/title",
+        "className": "TextView",
+        "content": "Settings",
+        "checked": "",
+    }
+    assert table.node_elements() is not nodes
+
+
+def test_of_converts_element_objects():
+    table = ElementTable.from_records(RECORDS)
+
+    assert ElementTable.of(table) is table
+    copy = ElementTable.of(list(table))
+    assert copy.bounds.tolist() == table.bounds.tolist()
+    assert copy.elements_info() == table.elements_info()
+    assert len(ElementTable.of([])) == 0
+    assert ElementTable.of([]).elements_info() == []
+
+
+def node(left, top, right, bottom, *children, **attrs):
+    return {
+        "boundsInScreen": {"left": left, "top": top, "right": right, "bottom": bottom},
+        "children": list(children),
+        **attrs,
+    }
+
+
+def test_portal_state_yields_element_table():
+    state = {
+        "a11y_tree": node(
+            0, 0, 1080, 2400,
+            node(100, 200, 300, 260, text="OK", resourceId="app:id/ok", className="Button"),
+            className="FrameLayout",
+        ),
+        "device_context": {"screen_bounds": {"width": 1080, "height": 2400}},
+        "phone_state": {"packageName": "com.example"},
+    }
+
+    _, elements = portal_elements_from_state(state)
+
+    assert isinstance(elements, ElementTable)
+    ok = [e for e in elements if e.resourceId == "app:id/ok"]
+    assert len(ok) == 1
+    assert ok[0].bounds == ((100, 200), (300, 260))
@@ -0,0 +1,216 @@
+import struct
+import sys
+import time
+
+import pytest
+
+from phone_agent.adb.frame_stream import FrameServer, H264Decoder, RawFrameDecoder
+
+
+# Fake producer: writes screencap-style raw RGBA frames (16 byte header) to stdout,
+# each frame filled with its own frame number, then exits.
+FAKE_RAW_PRODUCER = """
+import struct, sys, time
+width, height, count = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+out = sys.stdout.buffer
+for i in range(1, count + 1):
+    out.write(struct.pack("<IIII", width, height, 1, 0))
+    out.write(bytes([i % 256]) * (width * height * 4))
+    out.flush()
+    time.sleep(0.01)
+"""
+
+
+def raw_frame(width, height, value, header_size=16):
+    header = struct.pack("<III", width, height, 1)
+    if header_size == 16:
+        header += struct.pack("<I", 0)
+    return header + bytes([value]) * (width * height * 4)
+
+
+def fake_raw_command(width=4, height=3, count=5):
+    return [sys.executable, "-c", FAKE_RAW_PRODUCER, str(width), str(height), str(count)]
+
+
+def test_raw_decoder_handles_split_chunks():
+    decoder = RawFrameDecoder(header_size=12)
+    stream = raw_frame(2, 2, 7, header_size=12) + raw_frame(2, 2, 9, header_size=12)
+
+    frames = []
+    for i in range(0, len(stream), 5):
+        frames.extend(decoder.feed(stream[i:i + 5]))
+
+    assert [f.data[0] for f in frames] == [7, 9]
+    assert all((f.width, f.height, f.mode) == (2, 2, "RGBA") for f in frames)
+
+
+def test_frame_server_keeps_latest_frames():
+    server = FrameServer(fake_raw_command(count=5), RawFrameDecoder, buffer_size=2, restart_delay=60)
+    server.start()
+    try:
+        assert server.wait_for_frame(newer_than=4, timeout=10) is not None
+        latest = server.latest()
+        assert latest.index == 5
+        assert latest.data == bytes([5]) * (4 * 3 * 4)
+        assert [f.index for f in server.frames()] == [4, 5]
+    finally:
+        server.stop()
+    assert not server.is_running
+
+
+def test_frame_server_restarts_exited_producer():
+    server = FrameServer(fake_raw_command(count=2), RawFrameDecoder, restart_delay=0.05)
+    server.start()
+    try:
+        # Indices keep counting across producer runs
+        assert server.wait_for_frame(newer_than=4, timeout=10) is not None
+        assert server.restarts >= 2
+    finally:
+        server.stop()
+
+
+def test_frame_to_png_roundtrip():
+    pytest.importorskip("PIL")
+    from phone_agent.adb.screenshot import read_png_size
+
+    frame = RawFrameDecoder(header_size=12).feed(raw_frame(3, 2, 255, header_size=12))[0]
+    assert read_png_size(frame.to_png()) == (3, 2)
+
+
+def encode_h264_frames(count, step=20, noise=0):
+    """
+    Encode count frames of value i * step without B-frames, one bytes object per frame.
+
+    noise adds up to that much seeded random noise, which makes the frames large.
+    """
+    av = pytest.importorskip("av")
+    np = pytest.importorskip("numpy")
+
+    codec = av.CodecContext.create("libx264", "w")
+    codec.width, codec.height, codec.pix_fmt = 64, 128, "yuv420p"
+    codec.time_base = av.time_base
+    # Like a screenrecord stream: every frame is output as soon as it is encoded
+    codec.options = {"tune": "zerolatency"}
+    encoded = []
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        image = np.full((128, 64, 3), i * step, dtype=np.uint8)
+        if noise:
+            image = image + rng.integers(0, noise, image.shape, dtype=np.uint8)
+        frame = av.VideoFrame.from_ndarray(image, format="rgb24")
+        frame.pts = i
+        encoded.append(b"".join(bytes(packet) for packet in codec.encode(frame)))
+    encoded[-1] += b"".join(bytes(packet) for packet in codec.encode(None))
+    return encoded
+
+
+def test_h264_decoder_returns_each_frame_after_its_own_bytes():
+    encoded = encode_h264_frames(5, step=40)
+    decoder = H264Decoder()
+
+    for i, data in enumerate(encoded):
+        frames = decoder.feed(data) + decoder.flush()
+        assert len(frames) == 1
+        assert abs(frames[0].data[0] - i * 40) <= 4
+
+
+def test_h264_decoder_splits_access_units_in_one_chunk():
+    encoded = encode_h264_frames(3, step=40)
+    decoder = H264Decoder()
+
+    # Frames followed by the next frame's start are complete without a flush
+    stream = b"".join(encoded)
+    frames = []
+    for i in range(0, len(stream), 7):
+        frames.extend(decoder.feed(stream[i:i + 7]))
+    assert len(frames) == 2
+    assert len(decoder.flush()) == 1
+    assert decoder.flush() == []
+
+
+def test_frame_server_publishes_last_frame_of_a_quiet_h264_stream(tmp_path):
+    encoded = encode_h264_frames(3, step=40)
+    paths = []
+    for i, data in enumerate(encoded):
+        path = tmp_path / f"frame{i}.h264"
+        path.write_bytes(data)
+        paths.append(str(path))
+
+    # Producer writes the frames, then stays quiet like screenrecord on a static screen
+    producer = (
+        "import sys, time\n"
+        "for path in sys.argv[1:]:\n"
+        "    sys.stdout.buffer.write(open(path, 'rb').read())\n"
+        "    sys.stdout.buffer.flush()\n"
+        "    time.sleep(0.2)\n"
+        "time.sleep(60)\n"
+    )
+    server = FrameServer([sys.executable, "-c", producer, *paths], H264Decoder, restart_delay=60)
+    server.start()
+    try:
+        # The last frame shows up although no later frame follows it
+        frame = server.wait_for_frame(newer_than=len(encoded) - 1, timeout=10)
+        assert frame is not None
+        assert abs(frame.data[0] - (len(encoded) - 1) * 40) <= 4
+        assert [abs(f.data[0] - i * 40) <= 4 for i, f in enumerate(server.frames())] == [True] * 3
+    finally:
+        server.stop()
+
+
+def test_h264_decoder_drops_undecodable_frames():
+    pytest.importorskip("av")
+    decoder = H264Decoder()
+
+    assert decoder.feed(b"\x00\x00\x01\x65" + b"\xff" * 50) + decoder.flush() == []
+    # The stream goes on after the broken frame
+    frames = decoder.feed(encode_h264_frames(1)[0]) + decoder.flush()
+    assert len(frames) == 1
+
+
+def test_frame_server_waits_for_split_idr_frame(tmp_path):
+    encoded = encode_h264_frames(3, step=40, noise=60)
+    reference = H264Decoder()
+    expected = [f.data for data in encoded for f in reference.feed(data) + reference.flush()]
+    assert len(expected) == 3
+
+    # The IDR frame arrives in two chunks with a gap, like a large frame over adb
+    half = len(encoded[0]) // 2
+    chunks = [encoded[0][:half], encoded[0][half:], *encoded[1:]]
+    paths = []
+    for i, data in enumerate(chunks):
+        path = tmp_path / f"chunk{i}.h264"
+        path.write_bytes(data)
+        paths.append(str(path))
+    producer = (
+        "import sys, time\n"
+        "for path in sys.argv[1:]:\n"
+        "    sys.stdout.buffer.write(open(path, 'rb').read())\n"
+        "    sys.stdout.buffer.flush()\n"
+        "    time.sleep(0.1)\n"
+        "time.sleep(60)\n"
+    )
+    server = FrameServer([sys.executable, "-c", producer, *paths], H264Decoder, restart_delay=60)
+    server.start()
+    try:
+        assert server.wait_for_frame(newer_than=2, timeout=10) is not None
+        time.sleep(0.5)
+        assert [f.data for f in server.frames()] == expected
+        assert server.restarts == 0
+    finally:
+        server.stop()
+
+
+def test_h264_stream_from_recorded_file(tmp_path):
+    # Record a short H.264 elementary stream, then replay it as the producer
+    path = tmp_path / "screen.h264"
+    path.write_bytes(b"".join(encode_h264_frames(10)))
+
+    command = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(open(sys.argv[1], 'rb').read())", str(path)]
+    server = FrameServer(command, H264Decoder, restart_delay=60)
+    server.start()
+    try:
+        frame = server.wait_for_frame(timeout=10)
+        assert frame is not None
+        assert (frame.width, frame.height, frame.mode) == (64, 128, "RGB")
+    finally:
+        server.stop()
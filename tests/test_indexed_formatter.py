@@ -0,0 +1,60 @@
+from phone_agent.portal_cli.formatters import IndexedFormatter
+
+PHONE_STATE = {"currentApp": "Settings", "packageName": "com.android.settings", "focusedElement": None}
+
+
+def node(left, top, right, bottom, *children, **attrs):
+    return {
+        "boundsInScreen": {"left": left, "top": top, "right": right, "bottom": bottom},
+        "children": list(children),
+        **attrs,
+    }
+
+
+def make_formatter(use_normalized=False):
+    formatter = IndexedFormatter()
+    formatter.screen_width = 1080
+    formatter.screen_height = 2400
+    formatter.use_normalized = use_normalized
+    return formatter
+
+
+TREE = node(
+    0, 0, 1080, 2400,
+    node(0, 0, 540, 100, className="android.widget.Button", text="OK", contentDescription="confirm"),
+    node(0, 100, 540, 200, node(0, 100, 100, 200, resourceId="app:id/icon", stateDescription="on")),
+    className="android.widget.FrameLayout",
+)
+
+
+def test_lines_records_and_elements_in_preorder():
+    text, focused, records, _, elements = make_formatter().format_elements(
+        TREE, PHONE_STATE, lambda record: (record["index"], record["rect"])
+    )
+    assert focused == ""
+    assert text.endswith(
+        "A1. FrameLayout: | | | (0,0,1080,2400)\n"
+        'A2. Button: | "OK:confirm" | | (0,0,540,100)\n'
+        "A3. | | | (0,100,540,200)\n"
+        "A4. | app:id/icon | on | (0,100,100,200)"
+    )
+    assert [r["index"] for r in records] == [1, 2, 3, 4]
+    assert records[3]["bounds"] == "0,100,100,200"
+    assert elements == [(1, (0, 0, 1080, 2400)), (2, (0, 0, 540, 100)), (3, (0, 100, 540, 200)), (4, (0, 100, 100, 200))]
+
+
+def test_cached_lines_get_current_index_and_normalization():
+    make_formatter().format(TREE, PHONE_STATE)
+    # Same Button node, now second in a different tree: reuses its cached line with the new index
+    text, _, records, _ = make_formatter().format(node(0, 0, 1080, 2400, TREE["children"][0]), PHONE_STATE)
+    assert 'A2. Button: | "OK:confirm" | | (0,0,540,100)' in text
+
+    _, _, records, _ = make_formatter(use_normalized=True).format(TREE, PHONE_STATE)
+    assert records[1]["bounds"] == "0,0,500,41"
+    assert records[1]["rect"] == (0, 0, 500, 41)
+
+
+def test_empty_tree():
+    text, _, records, _ = make_formatter().format(None, PHONE_STATE)
+    assert records == []
+    assert text.endswith("No UI elements found")
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from phone_agent.adb import keyboard
+from phone_agent.adb.keyboard import ADB_KEYBOARD_IME, PORTAL_KEYBOARD_IME, KeyboardSession
+from phone_agent.config.timing import TIMING_CONFIG
+
+
+class FakePortal:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.inputs = []
+
+    async def ping(self):
+        return {"status": "success"}
+
+    async def input_text(self, text, clear=False):
+        self.inputs.append((text, clear))
+        return self.ok
+
+
+@pytest.fixture
+def shell(monkeypatch):
+    commands = []
+
+    async def adb_shell(command, device_id=None, timeout=None, stderr=False):
+        command = command if isinstance(command, str) else " ".join(command)
+        commands.append(command)
+        if command.startswith("settings get"):
+            return "com.example.ime/.UserIME\n"
+        return ""
+
+    monkeypatch.setattr(keyboard, "adb_shell", adb_shell)
+    monkeypatch.setattr(TIMING_CONFIG.action, "keyboard_switch_delay", 0)
+    return commands
+
+
+def use_portal(monkeypatch, portal):
+    async def get_portal_client(device_id=None):
+        if portal is None:
+            raise RuntimeError("portal not installed")
+        return portal
+
+    monkeypatch.setattr(keyboard, "get_portal_client", get_portal_client)
+
+
+def test_adb_keyboard_switches_once_and_batches(shell, monkeypatch):
+    use_portal(monkeypatch, None)
+
+    async def run():
+        session = KeyboardSession()
+        await session.input_text("hello", enter=True)
+        await session.input_text("again", clear=False)
+        await session.restore()
+
+    asyncio.run(run())
+    assert shell[1] == f"ime enable {ADB_KEYBOARD_IME}; ime set {ADB_KEYBOARD_IME}"
+    assert shell[2] == (
+        "am broadcast -a ADB_CLEAR_TEXT; am broadcast -a ADB_INPUT_B64 --es msg aGVsbG8=; "
+        "input keyevent KEYCODE_ENTER"
+    )
+    assert shell[3] == "am broadcast -a ADB_INPUT_B64 --es msg YWdhaW4="
+    assert shell[4:] == ["ime set com.example.ime/.UserIME"]
+
+
+def test_portal_keyboard(shell, monkeypatch):
+    portal = FakePortal()
+    use_portal(monkeypatch, portal)
+
+    async def run():
+        session = KeyboardSession()
+        await session.input_text("hi")
+        await session.input_text("there", enter=True)
+        assert session.ime == PORTAL_KEYBOARD_IME
+
+    asyncio.run(run())
+    assert portal.inputs == [("hi", True), ("there", True)]
+    assert shell[1:] == [
+        f"ime enable {PORTAL_KEYBOARD_IME}; ime set {PORTAL_KEYBOARD_IME}",
+        "input keyevent KEYCODE_ENTER",
+    ]
+
+
+def test_portal_failure_falls_back_to_adb_keyboard(shell, monkeypatch):
+    use_portal(monkeypatch, FakePortal(ok=False))
+
+    async def run():
+        session = KeyboardSession()
+        await session.input_text("x")
+        assert session.ime == ADB_KEYBOARD_IME
+
+    asyncio.run(run())
+    assert shell[-2:] == [
+        f"ime enable {ADB_KEYBOARD_IME}; ime set {ADB_KEYBOARD_IME}",
+        "am broadcast -a ADB_CLEAR_TEXT; am broadcast -a ADB_INPUT_B64 --es msg eA==",
+    ]
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+import time
+
+from phone_agent.loop_monitor import monitor_event_loop
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+def test_blocking_call_is_reported_with_its_stack(caplog):
+    async def run():
+        with monitor_event_loop(threshold=0.1) as monitor:
+            await asyncio.sleep(0.05)
+            blocking_call()
+            await asyncio.sleep(0.05)
+            return monitor
+
+    with caplog.at_level(logging.WARNING, logger="loop_monitor"):
+        monitor = asyncio.run(run())
+    assert monitor.stalls == 1 and monitor.max_lag >= 0.2
+    assert "blocked for" in caplog.text and "blocking_call" in caplog.text
+
+
+def test_awaiting_does_not_warn(caplog):
+    async def run():
+        with monitor_event_loop(threshold=0.1) as outer:
+            with monitor_event_loop() as inner:
+                assert inner is outer
+            await asyncio.gather(asyncio.sleep(0.2), asyncio.to_thread(time.sleep, 0.2))
+            assert outer.running
+        assert not outer.running
+        return outer
+
+    with caplog.at_level(logging.WARNING, logger="loop_monitor"):
+        monitor = asyncio.run(run())
+    assert monitor.stalls == 0 and not caplog.text
@@ -0,0 +1,37 @@
+import asyncio
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.adb import screenshot as screenshot_module
+
+
+def png_bytes(width=8, height=16):
+    buffered = BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def test_u2_capture_creates_save_dir(tmp_path, monkeypatch):
+    png = png_bytes()
+
+    async def capture_screen(device_id=None, timeout=10, mode=None):
+        return png, None
+
+    with open(os.path.join(os.path.dirname(__file__), "test_ui.xml"), encoding="utf-8") as f:
+        ui_xml = f.read()
+
+    monkeypatch.setattr(screenshot_module, "capture_screen", capture_screen)
+    monkeypatch.setattr(screenshot_module, "dump_emulator_ui_xml", lambda device_id=None: ui_xml)
+
+    save_dir = tmp_path / "new" / "dir"
+    shot = asyncio.run(
+        screenshot_module.get_screenshot("step1", str(save_dir), is_portal=False)
+    )
+
+    assert not shot.is_sensitive
+    assert (shot.width, shot.height) == (8, 16)
+    assert len(shot.elements) > 0
+    assert os.path.exists(save_dir / "tmp_ui.xml")
+    assert os.path.exists(save_dir / "step1_screenshot.png")
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from phone_agent.config.timing import TIMING_CONFIG, SettleTimingConfig
+from phone_agent.settle import get_last_settle, wait_until_stable, wait_until_stable_sync
+
+
+@pytest.fixture(autouse=True)
+def fast_settle(monkeypatch):
+    config = SettleTimingConfig(enabled=True, min_wait=0.01, poll_interval=0.02, stable_samples=3)
+    monkeypatch.setattr(TIMING_CONFIG, "settle", config)
+
+
+def sequence_probe(values):
+    values = iter(values)
+
+    async def probe():
+        return next(values)
+
+    return probe
+
+
+def test_returns_once_samples_agree():
+    result = asyncio.run(
+        wait_until_stable(sequence_probe([1, 2, 3, 3, 3, 4]), 5.0, "tap", "dev")
+    )
+    assert result.stable
+    assert result.samples == 5
+    assert result.elapsed < 1.0
+    assert get_last_settle("dev") is result
+
+
+def test_deadline_when_never_stable():
+    counter = iter(range(1000))
+    result = wait_until_stable_sync(lambda: next(counter), 0.2, "swipe")
+    assert not result.stable
+    assert 0.2 <= result.elapsed < 0.5
+
+
+def test_probe_failure_waits_for_deadline():
+    async def broken():
+        raise RuntimeError("no portal")
+
+    result = asyncio.run(wait_until_stable(broken, 0.1, "back"))
+    assert not result.stable
+    assert result.elapsed >= 0.1
+
+
+def test_sync_variant_shares_the_sampling_logic():
+    values = iter([1, 2, 2, 2])
+    result = wait_until_stable_sync(lambda: next(values), 5.0, "tap", "sync-dev")
+    assert result.stable
+    assert result.samples == 4
+    assert get_last_settle("sync-dev") is result
+
+    def broken():
+        raise RuntimeError("no portal")
+
+    result = wait_until_stable_sync(broken, 0.1, "back")
+    assert not result.stable
+    assert result.elapsed >= 0.1
+
+
+def test_disabled_sleeps_full_delay(monkeypatch):
+    monkeypatch.setattr(TIMING_CONFIG.settle, "enabled", False)
+    result = asyncio.run(wait_until_stable(sequence_probe([1, 1, 1]), 0.1, "home"))
+    assert not result.stable
+    assert result.samples == 0
+    assert result.elapsed >= 0.1
+
+
+def test_select_probe_skips_frame_server_without_frames(monkeypatch):
+    from phone_agent.adb import settle as adb_settle
+    from phone_agent.fingerprint import fingerprints_match
+
+    class IdleServer:
+        def latest(self):
+            return None
+
+    async def no_portal(device_id=None):
+        raise ConnectionError("no portal")
+
+    monkeypatch.setattr(adb_settle, "find_frame_server", lambda device_id=None: IdleServer())
+    monkeypatch.setattr(adb_settle, "get_portal_client", no_portal)
+
+    _, same = asyncio.run(adb_settle.select_probe("dev"))
+    assert same is not fingerprints_match
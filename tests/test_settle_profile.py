@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from act_mem.settle_profile import SettleProfiles
+from phone_agent.config.timing import TIMING_CONFIG, SettleTimingConfig
+from phone_agent.settle import SettleWindow, expected_settle, learned_window, wait_until_stable
+
+
+@pytest.fixture(autouse=True)
+def settle_config(monkeypatch):
+    config = SettleTimingConfig(enabled=True, min_wait=0.01, poll_interval=0.02, stable_samples=3)
+    monkeypatch.setattr(TIMING_CONFIG, "settle", config)
+    return config
+
+
+def test_target_falls_back_to_action_aggregate(tmp_path):
+    profiles = SettleProfiles(str(tmp_path))
+    for elapsed in (0.4, 0.5, 0.6):
+        profiles.record("com.example", "Tap", "com.example:id/ok", elapsed, True)
+    profiles.record("com.example", "Tap", "com.example:id/slow", 2.0, False)
+
+    ok = profiles.stats("com.example", "Tap", "com.example:id/ok", min_samples=3)
+    assert (ok.resource_id, ok.count, ok.p50) == ("com.example:id/ok", 3, 0.5)
+
+    other = profiles.stats("com.example", "Tap", "com.example:id/slow", min_samples=3)
+    assert (other.resource_id, other.count, other.p99) == ("*", 4, 2.0)
+    assert other.deadline_rate == 0.25
+    assert profiles.stats("com.example", "Swipe") is None
+
+
+def test_save_merges_with_other_runs(tmp_path):
+    first = SettleProfiles(str(tmp_path))
+    second = SettleProfiles(str(tmp_path))
+    first.record("pkg", "Back", None, 0.3, True)
+    first.save()
+    second.record("pkg", "Back", None, 0.5, True)
+    second.save()
+
+    loaded = SettleProfiles(str(tmp_path))
+    assert loaded.stats("pkg", "Back").count == 2
+
+
+def test_learned_window(tmp_path, settle_config):
+    profiles = SettleProfiles(str(tmp_path))
+    for _ in range(4):
+        profiles.record("pkg", "Tap", None, 0.5, True)
+    assert learned_window(profiles.stats("pkg", "Tap")) is None  # Too few samples
+
+    profiles.record("pkg", "Tap", None, 1.0, True)
+    window = learned_window(profiles.stats("pkg", "Tap"))
+    assert window.start == pytest.approx(0.5 - 2 * 0.02)
+    assert window.deadline == pytest.approx(1.0 * settle_config.learned_margin)
+
+
+def test_window_replaces_configured_delay():
+    async def probe():
+        return 1
+
+    async def run():
+        with expected_settle(SettleWindow(start=0.15, deadline=1.0)):
+            return await wait_until_stable(probe, 0.05, "tap")
+
+    result = asyncio.run(run())
+    assert result.learned and result.stable
+    assert 0.15 <= result.elapsed < 0.5
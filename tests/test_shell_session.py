@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from phone_agent.adb.shell_session import ShellSession, ShellSessionError, ShellSessionPool
+
+
+# Local stand-in for `adb shell sh`: a plain sh with stdin/stdout pipes
+async def fake_shell():
+    process = await asyncio.create_subprocess_exec(
+        "sh",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    fake_shell.processes.append(process)
+    return process.stdout, process.stdin
+
+
+async def reap():
+    for process in fake_shell.processes:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_shell():
+    fake_shell.processes = []
+
+
+def test_output_and_exit_status():
+    async def run():
+        session = ShellSession(fake_shell)
+        assert await session.run("echo hello") == ("hello\n", 0)
+        assert await session.run("printf no-newline") == ("no-newline", 0)
+        assert await session.run("echo err >&2; false") == ("err\n", 1)
+        assert await session.run("echo a | tr a b && echo c") == ("b\nc\n", 0)
+        assert len(fake_shell.processes) == 1
+        await session.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_large_output():
+    async def run():
+        session = ShellSession(fake_shell, read_size=1024)
+        output, status = await session.run("seq 1 20000")
+        assert status == 0
+        assert output.splitlines()[-1] == "20000"
+        await session.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_timeout_reopens_session():
+    async def run():
+        session = ShellSession(fake_shell)
+        with pytest.raises(asyncio.TimeoutError):
+            await session.run("sleep 1", timeout=0.2)
+        assert await session.run("echo ok") == ("ok\n", 0)
+        assert len(fake_shell.processes) == 2
+        await session.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_shell_exit_during_command():
+    async def run():
+        session = ShellSession(fake_shell)
+        with pytest.raises(ConnectionResetError):
+            await session.run("exit 3")
+        assert await session.run("echo back") == ("back\n", 0)
+        await session.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_open_failure():
+    async def broken():
+        raise OSError("connection refused")
+
+    async def run():
+        with pytest.raises(ShellSessionError):
+            await ShellSession(broken).run("true")
+
+    asyncio.run(run())
+
+
+def test_pool_concurrent_callers():
+    async def run():
+        pool = ShellSessionPool(fake_shell, max_sessions=2)
+        results = await asyncio.gather(
+            *(pool.run(f"sleep 0.0{i % 3}; echo {i}") for i in range(12))
+        )
+        assert [output for output, _ in results] == [f"{i}\n" for i in range(12)]
+        assert len(fake_shell.processes) == 2
+        await pool.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_unterminated_quote_times_out_and_reopens():
+    async def run():
+        session = ShellSession(fake_shell)
+        # The shell waits for the closing quote and never prints the end marker
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(session.run("echo it's", timeout=0.3), 2)
+        assert await session.run("echo ok") == ("ok\n", 0)
+        await session.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_adb_shell_applies_default_timeout(monkeypatch):
+    from phone_agent.adb import transport
+    from phone_agent.config.timing import TIMING_CONFIG
+
+    monkeypatch.setattr(transport, "USE_SHELL_SESSION", True)
+    monkeypatch.setattr(TIMING_CONFIG.connection, "shell_command_timeout", 0.3)
+
+    async def run():
+        pool = ShellSessionPool(fake_shell)
+        monkeypatch.setattr(transport, "get_shell", lambda device_id=None: pool)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(transport.adb_shell("echo it's"), 2)
+        assert await transport.adb_shell("echo ok") == "ok\n"
+        await pool.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_stderr_can_be_discarded():
+    async def run():
+        session = ShellSession(fake_shell)
+        assert await session.run("echo out; echo err >&2", stderr=False) == ("out\n", 0)
+        assert await session.run("echo out; echo err >&2") == ("out\nerr\n", 0)
+        await session.close()
+        await reap()
+
+    asyncio.run(run())
+
+
+def test_adb_shell_raises_when_the_shell_ends(monkeypatch):
+    from phone_agent.adb import transport
+
+    monkeypatch.setattr(transport, "USE_SHELL_SESSION", True)
+
+    async def run():
+        pool = ShellSessionPool(fake_shell)
+        monkeypatch.setattr(transport, "get_shell", lambda device_id=None: pool)
+        # A dropped device must not look like a command with empty output
+        with pytest.raises(ConnectionResetError):
+            await transport.adb_shell("exit 3")
+        assert await transport.adb_shell("echo out; echo err >&2") == "out\n"
+        await pool.close()
+        await reap()
+
+    asyncio.run(run())
@@ -0,0 +1,61 @@
+from phone_agent.observation import Observation
+from phone_agent.ui_diff import content_similarity, diff_elements
+
+
+class FakeScreenshot:
+    def __init__(self, elements):
+        self.elements = elements
+
+
+def elem(content, x, y, checked="", resource_id="", class_name="Button"):
+    return {
+        "resourceId": resource_id,
+        "className": class_name,
+        "content": content,
+        "checked": checked,
+        "bbox": ((x, y), (x + 100, y + 50)),
+    }
+
+
+def test_added_removed_moved_and_state_changed():
+    before = [
+        elem("Wi-Fi", 0, 0, checked="off"),
+        elem("Send", 0, 100),
+        elem("Row", 0, 200),
+        elem("Row", 0, 300),
+        elem("Gone", 0, 400),
+    ]
+    after = [
+        elem("Wi-Fi", 3, 2, checked="on"),  # Same grid cell: state change, not a move
+        elem("Send", 0, 600),
+        elem("Row", 0, 300),
+        elem("Row", 0, 700),
+        elem("New", 0, 800),
+    ]
+    diff = diff_elements(before, after)
+    assert [(b["content"], a["checked"]) for b, a in diff.state_changed] == [("Wi-Fi", "on")]
+    assert [(b["bbox"][0], a["bbox"][0]) for b, a in diff.moved] == [((0, 100), (0, 600)), ((0, 200), (0, 700))]
+    assert [e["content"] for e in diff.removed] == ["Gone"]
+    assert [e["content"] for e in diff.added] == ["New"]
+    assert diff.unchanged_count == 1
+    assert diff.count_diff == 0
+
+
+def test_identical_screens_have_no_changes():
+    elements = [elem("A", 0, 0), elem("A", 0, 0), elem("B", 10, 10, resource_id="app:id/b")]
+    diff = diff_elements(elements, [dict(e) for e in elements])
+    assert not diff.has_changes
+    assert diff.unchanged_count == 3
+
+
+def test_diff_is_cached_on_observation():
+    before = Observation(FakeScreenshot([elem("A", 0, 0)]), "app")
+    after = Observation(FakeScreenshot([elem("B", 0, 0)]), "app")
+    diff = after.ui_diff(before)
+    assert after.ui_diff(before) is diff
+    assert after.ui_diff(after) is not diff
+
+
+def test_content_similarity():
+    assert content_similarity([elem("A", 0, 0), elem("B", 0, 0)], [elem("B", 5, 5), elem("C", 0, 0)]) == 1 / 3
+    assert content_similarity([elem(" ", 0, 0)], [elem("A", 0, 0)]) == 0.0
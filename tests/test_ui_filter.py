@@ -0,0 +1,87 @@
+import xml.etree.ElementTree as ET
+
+from utils.ui_filter import get_semantic_info_from_children, ui_filter, ui_filter_xml
+
+NODE = '<node class="{cls}" enabled="true" {attrs} bounds="{bounds}">{children}</node>'
+
+
+def node(bounds, cls="android.view.View", children="", **attrs):
+    attrs = " ".join(f'{k.replace("_", "-")}="{v}"' for k, v in attrs.items())
+    return NODE.format(cls=cls, attrs=attrs, bounds=bounds, children=children)
+
+
+def write_xml(tmp_path, *nodes):
+    path = tmp_path / "ui.xml"
+    path.write_text(f'<hierarchy>{node("[0,0][1080,2400]", children="".join(nodes))}</hierarchy>')
+    return str(path)
+
+
+def test_order_and_child_semantics(tmp_path):
+    path = write_xml(
+        tmp_path,
+        node("[0,0][100,100]", focusable="true", text="field"),
+        node(
+            "[0,200][500,300]", clickable="true",
+            children=node("[10,210][90,290]", text="Send") + node("[100,210][400,290]", clickable="true", text="ok"),
+        ),
+    )
+    elements = ui_filter(path)
+    # Clickables in document order (outer before inner), then focusables
+    assert [e.raw.get("text", "") for e in elements] == ["", "ok", "field"]
+    assert elements[0].elem_id.endswith("__Send")
+    assert elements[0].ui_path[-1]["text"] == "Send"
+
+
+def test_focusable_dedup_uses_distance_and_semantics(tmp_path):
+    path = write_xml(
+        tmp_path,
+        node("[0,0][100,100]", clickable="true", resource_id="app:id/a"),
+        # Center 25px away from the clickable: duplicate
+        node("[25,0][125,100]", focusable="true"),
+        # Center 25px away, but a different resource-id: kept
+        node("[0,25][100,125]", focusable="true", resource_id="app:id/b"),
+        # Center 40px away, beyond min_dist but in a neighbouring grid cell: kept
+        node("[40,0][140,100]", focusable="true"),
+        # Clickable and focusable: listed once
+        node("[500,500][600,600]", clickable="true", focusable="true", text="both"),
+    )
+    elements = ui_filter(path, min_dist=30)
+    assert [e.bbox for e in elements] == [
+        ((0, 0), (100, 100)),
+        ((500, 500), (600, 600)),
+        ((0, 25), (100, 125)),
+        ((40, 0), (140, 100)),
+    ]
+    assert len(ui_filter(path, min_dist=50)) == 3
+
+
+def test_aggregated_child_semantics_match_subtree_walk(tmp_path):
+    leaf = node("[0,0][1,1]", text="longest text", content_desc="second")
+    path = write_xml(
+        tmp_path,
+        node(
+            "[0,0][100,100]", clickable="true",
+            children=node("[0,0][1,1]", text="short", content_desc="first", children=leaf)
+            + f'<other>{node("[0,0][1,1]", text="outside node children, ignored")}</other>'
+            + node("[0,0][1,1]", clickable="true", text="same length!"),
+        ),
+    )
+    outer, inner = ui_filter(path)
+    outer_xml = ET.parse(path).getroot()[0][0]
+    assert get_semantic_info_from_children(outer_xml) == {
+        "text": "longest text", "content-desc": "first",
+    }
+    assert outer.ui_path[-1] == {"class": "android.view.View", "text": "longest text", "content-desc": "first"}
+    assert outer.elem_id == "android.view.View_1080x2400__longest text_first"
+    assert [step["class"] for step in inner.ui_path] == ["android.view.View"] * 3
+
+
+def test_ui_filter_xml_matches_file(tmp_path):
+    path = write_xml(
+        tmp_path,
+        node("[0,0][100,100]", clickable="true", text="中文"),
+        node("[300,300][400,400]", focusable="true"),
+    )
+    from_file = ui_filter(path)
+    from_str = ui_filter_xml((tmp_path / "ui.xml").read_text())
+    assert [(e.elem_id, e.bbox) for e in from_str] == [(e.elem_id, e.bbox) for e in from_file]
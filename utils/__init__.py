@@ -1,6 +1,6 @@
 from utils.draw_bbox import draw_bbox_multi
-from utils.ui_filter import ui_filter, ui_portal
-from utils.ui_xml import get_emulator_ui_xml, get_state_portal
+from utils.ui_filter import ui_filter, ui_filter_xml, ui_portal
+from utils.ui_xml import dump_emulator_ui_xml, get_emulator_ui_xml, get_state_portal
 from utils.util import print_with_color
 from utils.config import load_config
 from utils.crop_ui_elements import crop_ui_elements
@@ -8,8 +8,10 @@ from utils.extract_json import extract_json
 
 __all__ = [
     "get_emulator_ui_xml",
+    "dump_emulator_ui_xml",
     "get_state_portal",
     "ui_filter",
+    "ui_filter_xml",
     "ui_portal",
     "draw_bbox_multi",
     "print_with_color",
@@ -0,0 +1,184 @@
+"""
+Columnar table of portal UI elements.
+
+Bounds are stored as one int32 (N, 4) NumPy array and the string attributes
+as interned columns. Indexing returns ElementRow views that read from the
+columns and expose the AndroidPortalElement attributes, so code written
+against element objects works unchanged. The dict lists handed to prompts,
+action parsing and memory are built straight from the columns.
+"""
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+
+class ElementRow:
+    """Zero-copy view of one element of an ElementTable"""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "ElementTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def resourceId(self) -> str:
+        return self._table.resource_ids[self._index]
+
+    @property
+    def className(self) -> str:
+        return self._table.class_names[self._index]
+
+    @property
+    def content_desc(self) -> str:
+        return self._table.contents[self._index]
+
+    @property
+    def state_desc(self) -> str:
+        return self._table.states[self._index]
+
+    @property
+    def bounds(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        x1, y1, x2, y2 = self._table.bounds[self._index].tolist()
+        return ((x1, y1), (x2, y2))
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        x1, y1, x2, y2 = self._table.bounds[self._index].tolist()
+        return ((x1 + x2) / 2, (y1 + y2) / 2)
+
+    def __repr__(self) -> str:
+        return f"<UIElem id={self.resourceId}> @ {self.state_desc}"
+
+
+class ElementTable:
+    """
+    Portal UI elements stored column-wise.
+
+    Attributes:
+        bounds: int32 array of shape (N, 4), rows are (x1, y1, x2, y2).
+        resource_ids / class_names / contents / states: Interned string columns.
+    """
+
+    __slots__ = ("bounds", "resource_ids", "class_names", "contents", "states", "_info")
+
+    def __init__(
+        self,
+        bounds: np.ndarray | None = None,
+        resource_ids: List[str] | None = None,
+        class_names: List[str] | None = None,
+        contents: List[str] | None = None,
+        states: List[str] | None = None,
+    ):
+        self.bounds = bounds if bounds is not None else np.zeros((0, 4), dtype=np.int32)
+        self.resource_ids = resource_ids if resource_ids is not None else []
+        self.class_names = class_names if class_names is not None else []
+        self.contents = contents if contents is not None else []
+        self.states = states if states is not None else []
+        self._info: Dict[str, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "ElementTable":
+        """Build from flat IndexedFormatter records ("rect", "resourceId", ...)"""
+        intern = sys.intern
+        bounds = np.array([r["rect"] for r in records], dtype=np.int32).reshape(len(records), 4)
+        return cls(
+            bounds,
+            [intern(r["resourceId"]) for r in records],
+            [intern(r["className"]) for r in records],
+            [intern(r["content_desc"]) for r in records],
+            [intern(r["state_desc"]) for r in records],
+        )
+
+    @classmethod
+    def of(cls, elements: Iterable[Any]) -> "ElementTable":
+        """Return elements if already a table, otherwise build one from element objects"""
+        if isinstance(elements, cls):
+            return elements
+        elements = list(elements)
+        intern = sys.intern
+        bounds = np.array(
+            [(x1, y1, x2, y2) for (x1, y1), (x2, y2) in (e.bounds for e in elements)],
+            dtype=np.int32,
+        ).reshape(len(elements), 4)
+        return cls(
+            bounds,
+            [intern(e.resourceId) for e in elements],
+            [intern(e.className) for e in elements],
+            [intern(e.content_desc) for e in elements],
+            [intern(e.state_desc) for e in elements],
+        )
+
+    def __len__(self) -> int:
+        return len(self.resource_ids)
+
+    def __getitem__(self, index: int | slice) -> "ElementRow | ElementTable":
+        if isinstance(index, slice):
+            # NumPy slicing is a view; the string columns share their (interned) strings
+            return ElementTable(
+                self.bounds[index],
+                self.resource_ids[index],
+                self.class_names[index],
+                self.contents[index],
+                self.states[index],
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("element index out of range")
+        return ElementRow(self, index)
+
+    def __iter__(self) -> Iterator[ElementRow]:
+        for index in range(len(self)):
+            yield ElementRow(self, index)
+
+    def __repr__(self) -> str:
+        return f"<ElementTable {len(self)} elements>"
+
+    @property
+    def centers(self) -> np.ndarray:
+        """Element centers as a float (N, 2) array"""
+        return (self.bounds[:, :2] + self.bounds[:, 2:]) / 2
+
+    def _bboxes(self) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        return [((x1, y1), (x2, y2)) for x1, y1, x2, y2 in self.bounds.tolist()]
+
+    def elements_info(self, id_prefix: str = "A") -> List[Dict[str, Any]]:
+        """
+        Element dicts the model references by id ("A1", "A2", ...), with bbox.
+
+        Built once per table and prefix; the list is shared, so callers must
+        not modify it.
+        """
+        info = self._info.get(id_prefix)
+        if info is None:
+            info = self._info[id_prefix] = [
+                {
+                    "id": f"{id_prefix}{i}",
+                    "resourceId": resource_id,
+                    "className": class_name,
+                    "content": content,
+                    "checked": state,
+                    "bbox": bbox,
+                }
+                for i, (resource_id, class_name, content, state, bbox) in enumerate(
+                    zip(self.resource_ids, self.class_names, self.contents, self.states, self._bboxes()),
+                    1,
+                )
+            ]
+        return info
+
+    def node_elements(self) -> List[Dict[str, Any]]:
+        """Fresh element dicts for a memory WorkNode (no id or bbox)"""
+        return [
+            {
+                "resourceId": resource_id,
+                "className": class_name,
+                "content": content,
+                "checked": state,
+            }
+            for resource_id, class_name, content, state in zip(
+                self.resource_ids, self.class_names, self.contents, self.states
+            )
+        ]
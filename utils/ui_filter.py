@@ -4,13 +4,16 @@ Android UI元素过滤工具模块
 并生成类似HTML XPath的语义路径
 """
 import asyncio
+import io
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, BinaryIO
+from utils.element_table import ElementTable
 from utils.ui_xml import get_state_portal
 from phone_agent.device_factory import DeviceFactory, get_device_factory
 from phone_agent.portal_cli.filters import DetailedFilter
 from phone_agent.portal_cli.formatters import IndexedFormatter
+from phone_agent.portal_cli.portal_client import get_portal_client
 
 logger = logging.getLogger("ui_filter")
 
@@ -154,6 +157,28 @@ def get_semantic_info_from_children(elem: ET.Element) -> Dict[str, str]:
     return semantic_info
 
 
+def get_own_semantic_info(elem: ET.Element) -> Dict[str, str]:
+    """元素自身（不含子元素）的语义信息"""
+    semantic_info = {}
+    for k in ("resource-id", "text", "content-desc"):
+        v = elem.attrib.get(k)
+        if v and v.strip():
+            semantic_info[k] = v.strip()
+    return semantic_info
+
+
+def merge_semantic_info(semantic_info: Dict[str, str], later: Dict[str, str]) -> None:
+    """
+    将文档顺序上更靠后的语义信息合并进semantic_info，规则与
+    get_semantic_info_from_children相同：resource-id和content-desc取第一个，
+    text取最长的（等长时取第一个）
+    """
+    for k, v in later.items():
+        current = semantic_info.get(k)
+        if current is None or (k == "text" and len(v) > len(current)):
+            semantic_info[k] = v
+
+
 def get_u2_element_id_without_children(elem: ET.Element) -> str:
     """生成元素ID，但不从子元素中提取语义信息"""
     parts = []
@@ -171,8 +196,8 @@ def get_u2_element_id_without_children(elem: ET.Element) -> str:
     return "_".join(parts)
 
 
-def get_u2_element_id(elem: ET.Element) -> str:
-    """生成元素ID"""
+def get_u2_element_id(elem: ET.Element, child_semantic: Dict[str, str] | None = None) -> str:
+    """生成元素ID，child_semantic为预先计算的get_semantic_info_from_children(elem)"""
     parts = []
     
     # 首先尝试从当前元素获取语义信息
@@ -183,7 +208,8 @@ def get_u2_element_id(elem: ET.Element) -> str:
     
     # 如果当前元素没有足够的语义信息，从子元素中查找
     if not parts or (len(parts) == 1 and parts[0].startswith("com.")):
-        child_semantic = get_semantic_info_from_children(elem)
+        if child_semantic is None:
+            child_semantic = get_semantic_info_from_children(elem)
         for k in ("text", "content-desc", "resource-id"):
             v = child_semantic.get(k)
             if v and v not in [p.replace("_", "/") for p in parts]:
@@ -196,8 +222,12 @@ def get_u2_element_id(elem: ET.Element) -> str:
     return "_".join(parts)
 
 
-def make_step(elem: ET.Element, is_target_element: bool = False) -> Dict[str, str]:
-    """生成语义路径的一步"""
+def make_step(
+    elem: ET.Element,
+    is_target_element: bool = False,
+    child_semantic: Dict[str, str] | None = None,
+) -> Dict[str, str]:
+    """生成语义路径的一步，child_semantic为预先计算的get_semantic_info_from_children(elem)"""
     step = {"class": elem.attrib.get("class", "node")}
     
     # 首先从当前元素获取属性
@@ -211,7 +241,8 @@ def make_step(elem: ET.Element, is_target_element: bool = False) -> Dict[str, st
     
     # 只有当这是目标元素（可操作元素）且缺少语义信息时，才从子元素中补充
     if is_target_element and not has_semantic_info:
-        child_semantic = get_semantic_info_from_children(elem)
+        if child_semantic is None:
+            child_semantic = get_semantic_info_from_children(elem)
         for k in ("text", "content-desc"):
             if k not in step and child_semantic.get(k):
                 step[k] = child_semantic[k]
@@ -219,37 +250,37 @@ def make_step(elem: ET.Element, is_target_element: bool = False) -> Dict[str, st
     return step
 
 
-def ui_filter(xml_path: str, min_dist: int = 30) -> List[AndroidElement]:
+def ui_filter(xml_path: str | BinaryIO, min_dist: int = 30) -> List[AndroidElement]:
     """
     过滤UI XML中的元素，提取可操作元素，并生成语义路径
-    
+
+    单次遍历XML：节点在start事件时分类并占位（保持文档顺序），在end事件时
+    （子树已完整，可提取子元素语义）生成AndroidElement。
+
     Args:
-        xml_path: XML路径
+        xml_path: XML路径，或二进制文件对象
         min_dist: 去重阈值
-        
+
     Returns:
-        List[AndroidElement]
+        List[AndroidElement]: 先是所有可点击元素，然后是不与可点击元素重复的可聚焦元素
     """
-    clickable_list: List[AndroidElement] = []
-    focusable_list: List[AndroidElement] = []
-    
-    def process_element(elem: ET.Element, path: List[ET.Element]) -> AndroidElement:
-        """处理单个元素，生成AndroidElement对象"""
+    clickable_list: List[AndroidElement | None] = []
+    focusable_list: List[AndroidElement | None] = []
+
+    def process_element(frames: List[_PathFrame], steps: List[Dict[str, str]]) -> AndroidElement:
+        """处理路径末尾的元素（子树已完整），生成AndroidElement对象"""
+        frame = frames[-1]
+        elem = frame.elem
         (x1, y1), (x2, y2), center = parse_bounds(elem)
-        elem_id = get_u2_element_id(elem)
+        elem_id = get_u2_element_id(elem, frame.child_semantic)
 
         # parent context - 但不要让父元素从子元素中提取语义信息
-        if len(path) > 1 and path[-2].tag == "node":
-            parent_id = get_u2_element_id_without_children(path[-2])
-            elem_id = f"{parent_id}__{elem_id}"
-
-        # 生成语义路径
-        ui_path = []
-        for i, e in enumerate(path):
-            if e.tag == "node":
-                # 只有最后一个元素（目标元素）才允许从子元素中提取语义信息
-                is_target = (i == len(path) - 1)
-                ui_path.append(make_step(e, is_target_element=is_target))
+        if len(frames) > 1 and frames[-2].elem.tag == "node":
+            elem_id = f"{frames[-2].plain_id}__{elem_id}"
+
+        # 生成语义路径：祖先的步骤已缓存，只有目标元素允许从子元素中提取语义信息
+        ui_path = steps[:-1]
+        ui_path.append(make_step(elem, is_target_element=True, child_semantic=frame.child_semantic))
         
         checked = "enabled" if elem.attrib.get("checked") == "true" and elem.attrib.get("checkable") == "true" else "disabled"
         focused = "enabled" if elem.attrib.get("focused") == "true" and elem.attrib.get("focusable") == "true" else "disabled"
@@ -266,72 +297,136 @@ def ui_filter(xml_path: str, min_dist: int = 30) -> List[AndroidElement]:
             focused=focused
         )
 
-    # 第一遍：收集所有可点击元素
-    path: List[ET.Element] = []
-    for event, elem in ET.iterparse(xml_path, ["start", "end"]):
-        if event == "start":
-            path.append(elem)
-            if elem.tag == "node" and is_clickable_u2(elem):
-                android_elem = process_element(elem, path.copy())
-                clickable_list.append(android_elem)
-        elif event == "end":
-            path.pop()
-
-    # 第二遍：收集所有可聚焦元素
-    path = []
+    # 单次遍历：frames为当前路径，steps为路径上node元素作为祖先时的语义路径步骤。
+    # 子孙的语义信息在end事件时自底向上合并进父元素，每个元素只访问一次
+    frames: List[_PathFrame] = []
+    steps: List[Dict[str, str]] = []
     for event, elem in ET.iterparse(xml_path, ["start", "end"]):
         if event == "start":
-            path.append(elem)
-            if elem.tag == "node" and is_focusable_u2(elem):
-                android_elem = process_element(elem, path.copy())
-                focusable_list.append(android_elem)
+            slot = None
+            if elem.tag == "node":
+                steps.append(make_step(elem))
+                # 既可点击又可聚焦的元素只作为可点击元素（作为可聚焦元素时必然被去重）
+                if is_clickable_u2(elem):
+                    slot = (clickable_list, len(clickable_list))
+                elif is_focusable_u2(elem):
+                    slot = (focusable_list, len(focusable_list))
+                if slot is not None:
+                    slot[0].append(None)
+            frames.append(_PathFrame(elem, slot))
         elif event == "end":
-            path.pop()
-
-    # 合并列表：先添加所有可点击元素
-    elem_list = clickable_list.copy()
-    
-    # 然后添加不与可点击元素重复的可聚焦元素
-    for focusable_elem in focusable_list:
-        bbox = focusable_elem.bbox
-        center = (bbox[0][0] + bbox[1][0]) // 2, (bbox[0][1] + bbox[1][1]) // 2
-        close = False
-        
+            frame = frames[-1]
+            if frame.slot is not None:
+                frame.slot[0][frame.slot[1]] = process_element(frames, steps)
+            frames.pop()
+            if elem.tag == "node":
+                steps.pop()
+                if frames:
+                    # 子元素自身的语义信息在文档顺序上先于其子孙
+                    parent_semantic = frames[-1].child_semantic
+                    merge_semantic_info(parent_semantic, get_own_semantic_info(elem))
+                    merge_semantic_info(parent_semantic, frame.child_semantic)
+
+    # 合并列表：先添加所有可点击元素，然后添加不与可点击元素重复的可聚焦元素
+    elem_list: List[AndroidElement] = list(clickable_list)
+    if focusable_list:
+        grid = _CenterGrid(min_dist)
         for clickable_elem in clickable_list:
-            clickable_bbox = clickable_elem.bbox
-            clickable_center = (clickable_bbox[0][0] + clickable_bbox[1][0]) // 2, (clickable_bbox[0][1] + clickable_bbox[1][1]) // 2
-            dist = (abs(center[0] - clickable_center[0]) ** 2 + abs(center[1] - clickable_center[1]) ** 2) ** 0.5
-            
-            if dist <= min_dist:
-                # 检查是否有不同的语义信息
-                focusable_resource_id = focusable_elem.raw.get("resource-id", "")
-                focusable_content_desc = focusable_elem.raw.get("content-desc", "")
-                focusable_text = focusable_elem.raw.get("text", "")
-                
-                clickable_resource_id = clickable_elem.raw.get("resource-id", "")
-                clickable_content_desc = clickable_elem.raw.get("content-desc", "")
-                clickable_text = clickable_elem.raw.get("text", "")
-                
-                # 如果有不同的语义标识，则不认为是重复
-                if (focusable_resource_id and clickable_resource_id and focusable_resource_id != clickable_resource_id) or \
-                   (focusable_content_desc and clickable_content_desc and focusable_content_desc != clickable_content_desc) or \
-                   (focusable_text and clickable_text and focusable_text != clickable_text):
-                    continue
-                
-                close = True
-                break
-        
-        if not close:
-            elem_list.append(focusable_elem)
-    
+            grid.add(clickable_elem)
+        for focusable_elem in focusable_list:
+            if not grid.has_duplicate(focusable_elem):
+                elem_list.append(focusable_elem)
+
     return elem_list
 
-async def filter_state_portal(use_normalized: bool=False) -> Tuple[str, str, List[Dict[str, Any]], Dict[str, Any]]:
+
+def ui_filter_xml(xml: str, min_dist: int = 30) -> List[AndroidElement]:
     """
-    Get device state with configurable filtering.
+    与ui_filter相同，但直接处理内存中的XML字符串（如dump_emulator_ui_xml的结果），无需写入文件
+
+    Args:
+        xml: UI XML字符串
+        min_dist: 去重阈值
 
     Returns:
-        Tuple of (formatted_text, focused_text, a11y_tree, phone_state)
+        List[AndroidElement]
+    """
+    return ui_filter(io.BytesIO(xml.encode("utf-8")), min_dist)
+
+
+class _PathFrame:
+    """ui_filter遍历路径上的一个元素"""
+
+    __slots__ = ("elem", "slot", "child_semantic", "_plain_id")
+
+    def __init__(self, elem: ET.Element, slot: Tuple[List[AndroidElement | None], int] | None):
+        self.elem = elem
+        self.slot = slot  # 可操作元素在结果列表中的(列表, 占位下标)
+        self.child_semantic: Dict[str, str] = {}  # 子孙的聚合语义信息，end事件时完整
+        self._plain_id: str | None = None
+
+    @property
+    def plain_id(self) -> str:
+        """不含子元素语义的元素ID（作为父元素上下文时使用），按需计算并缓存"""
+        if self._plain_id is None:
+            self._plain_id = get_u2_element_id_without_children(self.elem)
+        return self._plain_id
+
+
+def _semantic_keys(elem: AndroidElement) -> Tuple[str, str, str]:
+    """(resource-id, content-desc, text)，用于判断两个相近元素是否不同"""
+    raw = elem.raw
+    return raw.get("resource-id", ""), raw.get("content-desc", ""), raw.get("text", "")
+
+
+class _CenterGrid:
+    """
+    按中心点划分的均匀网格，格子边长不小于min_dist，
+    因此距离不超过min_dist的元素只可能在相邻的3x3个格子中。
+    """
+
+    def __init__(self, min_dist: float):
+        self.min_dist = min_dist
+        self.cell = max(min_dist, 1)
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, int, Tuple[str, str, str]]]] = {}
+
+    def add(self, elem: AndroidElement) -> None:
+        x, y = elem.center
+        key = (int(x // self.cell), int(y // self.cell))
+        self.cells.setdefault(key, []).append((x, y, _semantic_keys(elem)))
+
+    def has_duplicate(self, elem: AndroidElement) -> bool:
+        """是否存在距离不超过min_dist、且语义标识不冲突的元素"""
+        if self.min_dist < 0:
+            return False
+        x, y = elem.center
+        cx, cy = int(x // self.cell), int(y // self.cell)
+        keys = _semantic_keys(elem)
+        max_dist_sq = self.min_dist * self.min_dist
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for ox, oy, other in self.cells.get((gx, gy), ()):
+                    if (x - ox) ** 2 + (y - oy) ** 2 > max_dist_sq:
+                        continue
+                    # 如果有不同的语义标识，则不认为是重复
+                    if any(a and b and a != b for a, b in zip(keys, other)):
+                        continue
+                    return True
+        return False
+
+async def fetch_state_portal(device_id: str | None = None) -> Dict[str, Any]:
+    """
+    Fetch the raw portal state (a11y tree, phone state, device context), with retries.
+
+    Uses the device's long-lived PortalClient, so consecutive calls reuse one
+    keep-alive TCP connection and fall back to the content provider only when
+    the forwarded port is unavailable.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+
+    Returns:
+        Combined state dictionary as returned by the portal.
     """
 
     max_retries = 3
@@ -340,8 +435,7 @@ async def filter_state_portal(use_normalized: bool=False) -> Tuple[str, str, Lis
     for attempt in range(max_retries):
         try:
             logger.debug(f"Getting state (attempt {attempt + 1}/{max_retries})")
-            device = await get_device_factory()
-            combined_data = await get_state_portal(device)
+            combined_data = await _get_state(device_id)
 
             if "error" in combined_data:
                 raise Exception(
@@ -355,41 +449,7 @@ async def filter_state_portal(use_normalized: bool=False) -> Tuple[str, str, Lis
             if missing_keys:
                 raise Exception(f"Missing data in state: {', '.join(missing_keys)}")
 
-            # Store screen dimensions for coordinate conversion
-            device_context = combined_data["device_context"]
-            screen_bounds = device_context.get("screen_bounds", {})
-            screen_width = screen_bounds.get("width")
-            screen_height = screen_bounds.get("height")
-
-            raw_tree_cache = combined_data["a11y_tree"]
-
-            tree_filter = DetailedFilter()
-            filtered_tree_cache = tree_filter.filter(
-                raw_tree_cache, combined_data["device_context"]
-            )
-            # print(f"-" * 80)
-            # print(f"{filtered_tree_cache}")
-            # print(f"-" * 80)
-
-            # Set formatter screen dimensions for normalized bounds
-            tree_formatter = IndexedFormatter()
-            tree_formatter.screen_width = screen_width
-            tree_formatter.screen_height = screen_height
-            tree_formatter.use_normalized = use_normalized
-
-            formatted_text, focused_text, a11y_tree, phone_state = (
-                tree_formatter.format(
-                    filtered_tree_cache, combined_data["phone_state"]
-                )
-            )
-
-            clickable_elements_cache = a11y_tree
-
-            # print(f"+" * 80)
-            # print(f"{clickable_elements_cache}")
-            # print(f"+" * 80)
-
-            return (formatted_text, focused_text, a11y_tree, phone_state)
+            return combined_data
 
         except Exception as e:
             last_error = str(e)
@@ -401,41 +461,90 @@ async def filter_state_portal(use_normalized: bool=False) -> Tuple[str, str, Lis
                 error_msg = f"Failed to get state after {max_retries} attempts: {last_error}"
                 logger.error(error_msg)
                 raise Exception(error_msg)
-            
-async def ui_portal() -> Tuple[str, List[AndroidPortalElement]]:
+
+
+async def _get_state(device_id: str | None = None) -> Dict[str, Any]:
+    """Get the portal state through the shared PortalClient (TCP preferred)."""
+    try:
+        client = await get_portal_client(device_id)
+    except Exception as e:
+        # No adb server reachable through async_adbutils: plain content provider query
+        logger.debug(f"Portal client unavailable ({e}), using content provider")
+        device = await get_device_factory()
+        return await get_state_portal(device, device_id)
+    return await client.get_state()
+
+
+def format_state_portal(combined_data: Dict[str, Any], use_normalized: bool=False) -> Tuple[str, str, List[Dict[str, Any]], Dict[str, Any]]:
     """
-    Get device state and return formatted text with AndroidPortalElement list.
+    Filter and format a raw portal state (CPU only, no device access).
 
     Returns:
-        Tuple of (formatted_text, List[AndroidPortalElement])
+        Tuple of (formatted_text, focused_text, a11y_tree, phone_state)
     """
-    formatted_text, _, a11y_tree, _ = (
-        await filter_state_portal()
+    # Store screen dimensions for coordinate conversion
+    device_context = combined_data["device_context"]
+    screen_bounds = device_context.get("screen_bounds", {})
+    screen_width = screen_bounds.get("width")
+    screen_height = screen_bounds.get("height")
+
+    raw_tree_cache = combined_data["a11y_tree"]
+
+    tree_filter = DetailedFilter()
+    filtered_tree_cache = tree_filter.filter(
+        raw_tree_cache, combined_data["device_context"]
     )
-    
-    # Convert a11y_tree to list of AndroidPortalElement objects
-    portal_elements = []
-    for elem in a11y_tree:
-        # Parse bounds string "x1,y1,x2,y2" to tuple format
-        bounds_str = elem.get("bounds", "0,0,0,0")
-        coords = bounds_str.split(",")
-        if len(coords) == 4:
-            x1, y1, x2, y2 = map(int, coords)
-            bounds = ((x1, y1), (x2, y2))
-        else:
-            bounds = ((0, 0), (0, 0))
-        
-        portal_elem = AndroidPortalElement(
-            resourceId=elem.get("resourceId", ""),
-            className=elem.get("className", ""),
-            content_desc=elem.get("content_desc", ""),
-            state_desc=elem.get("state_desc", ""),
-            bounds=bounds,
-        )
-        # print(f"""Portal element: {portal_elem}""")
-        portal_elements.append(portal_elem)
-    
-    return (formatted_text, portal_elements)
+    # print(f"-" * 80)
+    # print(f"{filtered_tree_cache}")
+    # print(f"-" * 80)
+
+    # Set formatter screen dimensions for normalized bounds
+    tree_formatter = IndexedFormatter()
+    tree_formatter.screen_width = screen_width
+    tree_formatter.screen_height = screen_height
+    tree_formatter.use_normalized = use_normalized
+
+    return tree_formatter.format(filtered_tree_cache, combined_data["phone_state"])
+
+
+async def filter_state_portal(use_normalized: bool=False, device_id: str | None = None) -> Tuple[str, str, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Get device state with configurable filtering.
+
+    Args:
+        use_normalized: Format bounds normalized to the screen size.
+        device_id: Optional ADB device ID for multi-device setups.
+
+    Returns:
+        Tuple of (formatted_text, focused_text, a11y_tree, phone_state)
+    """
+    combined_data = await fetch_state_portal(device_id)
+    return format_state_portal(combined_data, use_normalized)
+
+
+def portal_elements_from_state(combined_data: Dict[str, Any]) -> Tuple[str, ElementTable]:
+    """
+    Build formatted text and the element table from a raw portal state.
+
+    Returns:
+        Tuple of (formatted_text, ElementTable)
+    """
+    formatted_text, _, a11y_tree, _ = format_state_portal(combined_data)
+    return (formatted_text, ElementTable.from_records(a11y_tree))
+
+
+async def ui_portal(device_id: str | None = None) -> Tuple[str, ElementTable]:
+    """
+    Get device state and return formatted text with the element table.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+
+    Returns:
+        Tuple of (formatted_text, ElementTable)
+    """
+    combined_data = await fetch_state_portal(device_id)
+    return portal_elements_from_state(combined_data)
 
 
 async def main():
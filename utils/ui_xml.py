@@ -2,25 +2,38 @@ import os
 import json
 # import pkg_resources
 import asyncio
+import threading
 import uiautomator2 as u2
 from typing import Dict, Any, Optional
 from phone_agent.device_factory import DeviceFactory, get_device_factory
 
-def get_emulator_ui_xml(prefix: str, save_dir: str, emulator_device: str = "emulator-5554") -> str:
+# 每个设备复用一个 uiautomator2 会话，只在 dump 失败时检查连接并重连
+_u2_sessions: Dict[Optional[str], "u2.Device"] = {}
+_u2_lock = threading.Lock()
+
+
+def get_u2_device(emulator_device: Optional[str] = "emulator-5554", reconnect: bool = False) -> "u2.Device":
     """
-    连接 Android Studio 模拟器，获取含 View 类型的 UI XML（适配所有 uiautomator2 版本）
-    :param prefix: XML 保存前缀
-    :param save_path: XML 保存路径
-    :param emulator_device: 模拟器设备名（通过 adb devices 查看，默认 emulator-5554）
-    :return: UI XML 文件路径
+    获取设备的 uiautomator2 会话（按设备缓存，首次使用时连接）
+    :param emulator_device: 设备名（adb devices 中的序列号）
+    :param reconnect: 丢弃缓存的会话并重新连接
+    :return: uiautomator2 设备对象
     """
-    # 1. 连接模拟器（核心：指定模拟器设备名）
-    try:
-        d = u2.connect(emulator_device)  # 适配模拟器的连接方式
-    except Exception as e:
-        raise RuntimeError(f"连接模拟器失败：{e}\n请检查：1.模拟器是否启动 2.adb devices 是否能识别模拟器")
-    
-    # 2. 检查模拟器连接状态（适配 uiautomator2 新旧版本）
+    with _u2_lock:
+        if reconnect:
+            _u2_sessions.pop(emulator_device, None)
+        d = _u2_sessions.get(emulator_device)
+        if d is None:
+            try:
+                d = u2.connect(emulator_device)  # 适配模拟器的连接方式
+            except Exception as e:
+                raise RuntimeError(f"连接模拟器失败：{e}\n请检查：1.模拟器是否启动 2.adb devices 是否能识别模拟器")
+            _u2_sessions[emulator_device] = d
+        return d
+
+
+def _check_u2_alive(d: "u2.Device") -> None:
+    """检查模拟器连接状态（适配 uiautomator2 新旧版本），连接失败时抛出 RuntimeError"""
     try:
         # 优先尝试新版方法 is_alive()
         if not d.is_alive():
@@ -36,16 +49,43 @@ def get_emulator_ui_xml(prefix: str, save_dir: str, emulator_device: str = "emul
                 d.device_info  # 调用设备信息，触发连接检查
             except Exception as e:
                 raise RuntimeError(f"设备连接检查失败：{e}")
-    
-    # 3. 获取包含 View 类型的 UI 层级（dump_hierarchy 返回完整 XML，含 class 属性）
+
+
+def dump_emulator_ui_xml(emulator_device: Optional[str] = "emulator-5554") -> str:
+    """
+    获取含 View 类型的 UI XML 字符串，不写文件（可直接交给 ui_filter_xml）
+    复用缓存的会话；dump 失败时才重连并检查连接，然后重试一次
+    :param emulator_device: 模拟器设备名（通过 adb devices 查看，默认 emulator-5554）
+    :return: UI XML 字符串
+    """
+    d = get_u2_device(emulator_device)
+    try:
+        return d.dump_hierarchy()
+    except Exception:
+        # 会话可能已失效（设备重启、ATX 服务被杀），重新连接
+        d = get_u2_device(emulator_device, reconnect=True)
+        _check_u2_alive(d)
+
+    # dump_hierarchy 返回完整 XML，含 class 属性
     try:
-        ui_xml = d.dump_hierarchy()
+        return d.dump_hierarchy()
     except Exception as e:
         raise RuntimeError(f"获取 UI 层级失败：{e}\n可能原因：模拟器未授权 ATX 应用，或 adb 权限不足")
-    
+
+
+def get_emulator_ui_xml(prefix: str, save_dir: str, emulator_device: str = "emulator-5554") -> str:
+    """
+    连接 Android Studio 模拟器，获取含 View 类型的 UI XML（适配所有 uiautomator2 版本）
+    :param prefix: XML 保存前缀
+    :param save_path: XML 保存路径
+    :param emulator_device: 模拟器设备名（通过 adb devices 查看，默认 emulator-5554）
+    :return: UI XML 文件路径
+    """
+    ui_xml = dump_emulator_ui_xml(emulator_device)
+
     save_path = os.path.join(save_dir, f"{prefix}_ui.xml")
     try:
-        # 4. 保存 XML 到本地
+        # 保存 XML 到本地
         with open(save_path, "w", encoding="utf-8") as f:
             f.write(ui_xml)
     except Exception as e:
@@ -106,11 +146,12 @@ def _parse_content_provider_output(
         except json.JSONDecodeError:
             return None
 
-async def get_state_portal(device: DeviceFactory) -> Dict[str, Any]:
+async def get_state_portal(device: DeviceFactory, device_id: str | None = None) -> Dict[str, Any]:
         """Get state via content provider (fallback)."""
         try:
             output = await device.shell(
-                "content query --uri content://com.droidrun.portal/state_full"
+                "content query --uri content://com.droidrun.portal/state_full",
+                device_id,
             )
             state_data = _parse_content_provider_output(output)
 